@@ -0,0 +1,219 @@
+"""
+Registrar allotment-file ingestion.
+
+Registrars publish results as CSV or plain-text files keyed by PAN. The file
+is streamed line by line and each PAN is looked up in an in-memory index of
+the user's applications for the IPO (built from Applicant.pan), so memory
+depends on the user's applications, not on the file. Matched applications
+are then updated set-based (batch.update_applications); PANs that match nothing are counted and a
+sample is returned.
+
+Accepted layouts:
+- a header row with a PAN column and a status column ("Status",
+  "Allotment Status", "Shares Allotted", ...), any of , ; | or tab delimited
+- headerless lines containing a PAN, optionally followed by a status word;
+  a PAN on its own counts as allotted
+
+Run from the command line:
+    python allotment.py <username> "<IPO name>" <file> [--dry-run]
+"""
+
+import codecs
+import csv
+import re
+import sys
+from typing import BinaryIO, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from batch import update_applications
+from models import Applicant, IpoApplication
+
+PAN_PATTERN = re.compile(r"\b([A-Z]{5}[0-9]{4}[A-Z])\b")
+PAN_HEADER = re.compile(r"(?<![a-z])pan(?![a-z])")
+# Status column candidates, most specific first ("Shares Allotted" beats "Shares Applied")
+STATUS_HEADERS = [re.compile(p) for p in (r"status", r"allot", r"result", r"shares")]
+DELIMITERS = ",;|\t"
+
+# Only the first unmatched PANs and bad lines are returned; the rest are counted
+MAX_REPORTED = 100
+
+def normalize_status(value: str) -> str | None:
+    """Map a registrar status or share count to Allotted/Not Allotted"""
+    text = value.strip().lower()
+    if not text:
+        return None
+    if text.replace(",", "").isdigit():
+        return "Allotted" if int(text.replace(",", "")) > 0 else "Not Allotted"
+    if text in ("n", "no") or "not" in text or "non" in text or "reject" in text:
+        return "Not Allotted"
+    if text in ("y", "yes") or "allot" in text or "success" in text:
+        return "Allotted"
+    return None
+
+def _find_column(header: list[str], pattern: re.Pattern) -> int | None:
+    """Index of the first header cell matching pattern"""
+    for index, cell in enumerate(header):
+        if pattern.search(cell.strip().lower()):
+            return index
+    return None
+
+def iter_allotment_lines(stream: BinaryIO) -> Iterator[tuple[int, str | None, str | None]]:
+    """Yield (line number, PAN, status) per non-empty line; PAN/status are None when unreadable"""
+    text = codecs.getreader("utf-8-sig")(stream, errors="replace")
+    lines = iter(text)
+
+    first_line = ""
+    line_number = 0
+    for first_line in lines:
+        line_number += 1
+        if first_line.strip():
+            break
+
+    # Header row: read the rest as delimited columns
+    if PAN_HEADER.search(first_line.lower()) and not PAN_PATTERN.search(first_line.upper()):
+        delimiter = max(DELIMITERS, key=first_line.count)
+        header = next(csv.reader([first_line], delimiter=delimiter))
+        pan_col = _find_column(header, PAN_HEADER)
+        status_col = next(
+            (c for c in (_find_column(header, p) for p in STATUS_HEADERS) if c is not None), None
+        )
+        for cells in csv.reader(lines, delimiter=delimiter):
+            line_number += 1
+            if not any(c.strip() for c in cells):
+                continue
+            pan = cells[pan_col].strip().upper() if pan_col < len(cells) else ""
+            if not PAN_PATTERN.fullmatch(pan):
+                yield line_number, None, None
+                continue
+            if status_col is None:
+                yield line_number, pan, "Allotted"
+            else:
+                cell = cells[status_col] if status_col < len(cells) else ""
+                yield line_number, pan, normalize_status(cell)
+        return
+
+    # Free text: a PAN somewhere on the line, the status (if any) after it
+    def parse_text(number: int, line: str):
+        match = PAN_PATTERN.search(line.upper())
+        if not match:
+            return number, None, None
+        rest = line[match.end():].strip(" \t\r\n,;|:-")
+        return number, match.group(1), normalize_status(rest) if rest else "Allotted"
+
+    if first_line.strip():
+        yield parse_text(line_number, first_line)
+    for line in lines:
+        line_number += 1
+        if line.strip():
+            yield parse_text(line_number, line)
+
+def build_pan_index(db: Session, user_id: int, ipo_name: str) -> dict[str, list[str]]:
+    """PAN -> ids of user_id's applications for the IPO, rows locked for the update"""
+    stmt = (
+        select(Applicant.pan, IpoApplication.id)
+        .join(Applicant, Applicant.id == IpoApplication.user_id)
+        .where(IpoApplication.created_by == user_id, IpoApplication.ipo_name == ipo_name)
+        .with_for_update(of=IpoApplication)
+    )
+    index: dict[str, list[str]] = {}
+    for pan, application_id in db.execute(stmt):
+        if pan:
+            index.setdefault(pan.strip().upper(), []).append(application_id)
+    return index
+
+def ingest_allotment_file(db: Session, user_id: int, ipo_name: str, stream: BinaryIO,
+                          dry_run: bool = False) -> dict:
+    """Apply a registrar file to user_id's applications for ipo_name and return the report"""
+    index = build_pan_index(db, user_id, ipo_name)
+
+    results: dict[str, str] = {}  # application id -> status, last line wins
+    lines = unmatched_count = invalid_count = 0
+    unmatched: list[str] = []
+    invalid: list[dict] = []
+    seen_unmatched: set[str] = set()
+
+    for line_number, pan, status in iter_allotment_lines(stream):
+        lines += 1
+        if pan is None or status is None:
+            invalid_count += 1
+            if len(invalid) < MAX_REPORTED:
+                reason = "No PAN found" if pan is None else "Unrecognised status"
+                invalid.append({"line": line_number, "message": reason})
+            continue
+        application_ids = index.get(pan)
+        if application_ids is None:
+            # The sample keeps the first distinct PANs; the count covers every line
+            unmatched_count += 1
+            if len(unmatched) < MAX_REPORTED and pan not in seen_unmatched:
+                seen_unmatched.add(pan)
+                unmatched.append(pan)
+            continue
+        for application_id in application_ids:
+            results[application_id] = status
+
+    allotted_ids = [i for i, s in results.items() if s == "Allotted"]
+    not_allotted_ids = [i for i, s in results.items() if s != "Allotted"]
+    target_ids = list(results)
+
+    if target_ids and not dry_run:
+        # Two set-based updates, one per status; "Not Allotted" clears money received
+        update_applications(db, user_id, allotted_ids, {"allotment_status": "Allotted"})
+        update_applications(db, user_id, not_allotted_ids, {
+            "allotment_status": "Not Allotted",
+            "money_received": False,
+        })
+        db.commit()
+    else:
+        db.rollback()
+
+    return {
+        "success": True,
+        "dryRun": dry_run,
+        "ipoName": ipo_name,
+        "lines": lines,
+        "matched": len(target_ids),
+        "allotted": len(allotted_ids),
+        "notAllotted": len(target_ids) - len(allotted_ids),
+        "applicationsWithoutResult": sum(len(ids) for ids in index.values()) - len(target_ids),
+        "unmatchedCount": unmatched_count,
+        "unmatchedPans": unmatched,
+        "invalidCount": invalid_count,
+        "invalidLines": invalid
+    }
+
+if __name__ == "__main__":
+    from database import SessionLocal
+    from models import User, IpoName
+
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if len(args) != 3:
+        print('Usage: python allotment.py <username> "<IPO name>" <file> [--dry-run]')
+        sys.exit(2)
+    username, ipo_name, path = args
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            print(f"[ERROR] User '{username}' not found")
+            sys.exit(1)
+        if not db.query(IpoName).filter(IpoName.name == ipo_name).first():
+            print(f"[ERROR] IPO '{ipo_name}' does not exist")
+            sys.exit(1)
+
+        with open(path, "rb") as f:
+            report = ingest_allotment_file(db, user.id, ipo_name, f, dry_run="--dry-run" in sys.argv)
+
+        print(f"\n[OK] {report['lines']} line(s) read{' (dry run, nothing written)' if report['dryRun'] else ''}")
+        print(f"   - Matched applications: {report['matched']} "
+              f"({report['allotted']} allotted, {report['notAllotted']} not allotted)")
+        print(f"   - Applications without a result: {report['applicationsWithoutResult']}")
+        print(f"   - Unmatched PAN lines: {report['unmatchedCount']}")
+        for pan in report["unmatchedPans"][:20]:
+            print(f"      {pan}")
+        if report["invalidCount"]:
+            print(f"   - [WARN] Unreadable lines: {report['invalidCount']}")
+    finally:
+        db.close()
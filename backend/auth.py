@@ -1,14 +1,71 @@
+import asyncio
+import os
 import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import bcrypt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from database import get_db
 from models import User
+from cache import TTLCache
 
 # HTTP Bearer token security
 security = HTTPBearer(auto_error=False)
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """Lightweight authenticated user record, safe to share across sessions"""
+    id: int
+    username: str
+    email: str | None
+    is_verified: bool
+
+# Token -> CurrentUser. Each worker process keeps its own cache, so a token
+# revoked by another process stays valid here for at most AUTH_CACHE_TTL seconds.
+token_cache = TTLCache(
+    maxsize=int(os.environ.get("AUTH_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("AUTH_CACHE_TTL", "60")),
+)
+
+def invalidate_user_tokens(user_id: int) -> None:
+    """Drop every cached token of a user (logout, new login, password reset)"""
+    token_cache.pop_where(lambda token, user: user.id == user_id)
+
+def lookup_token(db: Session, token: str) -> CurrentUser | None:
+    """Resolve a bearer token to a user, using the token cache when possible"""
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    row = db.query(User.id, User.username, User.email, User.is_verified).filter(
+        User.token == token
+    ).first()
+    if not row:
+        return None
+
+    user = CurrentUser(id=row.id, username=row.username, email=row.email,
+                       is_verified=bool(row.is_verified))
+    token_cache.set(token, user)
+    return user
+
+# bcrypt work factor for new hashes; stored hashes with another cost are upgraded on login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+# Hashing runs on its own small pool so a burst of logins cannot starve the
+# event loop or FastAPI's threadpool; beyond BCRYPT_MAX_PENDING callers are refused.
+BCRYPT_WORKERS = int(os.environ.get("BCRYPT_WORKERS", "2"))
+BCRYPT_MAX_PENDING = int(os.environ.get("BCRYPT_MAX_PENDING", "32"))
+
+_hash_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(BCRYPT_MAX_PENDING)
+
+class HashingBusyError(Exception):
+    """Raised when the bcrypt pool already has BCRYPT_MAX_PENDING jobs queued"""
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(
@@ -20,9 +77,47 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(BCRYPT_ROUNDS)
     ).decode('utf-8')
 
+def hash_needs_upgrade(hashed_password: str) -> bool:
+    """Check whether a stored hash was made with a different work factor"""
+    try:
+        # Format: $2b$<cost>$<salt+hash>
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def _run_hashing(func, *args):
+    """Run a bcrypt call on the hashing pool without blocking the event loop"""
+    if not _hash_slots.acquire(blocking=False):
+        raise HashingBusyError("Password hashing queue is full")
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, func, *args)
+    finally:
+        _hash_slots.release()
+
+def _run_hashing_blocking(func, *args):
+    """_run_hashing for sync handlers: waits on the hashing pool from the calling thread"""
+    if not _hash_slots.acquire(blocking=False):
+        raise HashingBusyError("Password hashing queue is full")
+    try:
+        return _hash_pool.submit(func, *args).result()
+    finally:
+        _hash_slots.release()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool"""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await _run_hashing(get_password_hash, password)
+
+def get_password_hash_pooled(password: str) -> str:
+    """Hash a password on the hashing pool from a sync handler"""
+    return _run_hashing_blocking(get_password_hash, password)
+
 def generate_token() -> str:
     """Generate a random token"""
     return secrets.token_urlsafe(32)
@@ -36,10 +131,39 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
         return None
     return user
 
+def _load_login_row(db: Session, username: str):
+    """id, username and hash of a user; the connection goes back to the pool before bcrypt runs"""
+    row = db.execute(
+        select(User.id, User.username, User.hashed_password).where(User.username == username)
+    ).first()
+    db.commit()
+    return row
+
+async def authenticate_user_async(db: Session, username: str, password: str):
+    """Authenticate on the hashing pool; returns (user row, upgraded hash or None) or None"""
+    # The sync session is only used from the threadpool, so neither the lookup nor bcrypt runs on the loop
+    row = await run_in_threadpool(_load_login_row, db, username)
+    if not row:
+        return None
+    if not await verify_password_async(password, row.hashed_password):
+        return None
+    upgraded_hash = None
+    if hash_needs_upgrade(row.hashed_password):
+        upgraded_hash = await get_password_hash_async(password)
+    return row, upgraded_hash
+
+def store_login(db: Session, user_id: int, token: str, hashed_password: str | None = None) -> None:
+    """Save a fresh token for a user, and an upgraded password hash if there is one"""
+    values = {"token": token}
+    if hashed_password:
+        values["hashed_password"] = hashed_password
+    db.execute(update(User).where(User.id == user_id).values(**values))
+    db.commit()
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> CurrentUser:
     """Get current user from token"""
     if not credentials:
         raise HTTPException(
@@ -48,8 +172,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    token = credentials.credentials
-    user = db.query(User).filter(User.token == token).first()
+    user = lookup_token(db, credentials.credentials)
 
     if not user:
         raise HTTPException(
@@ -63,10 +186,9 @@ def get_current_user(
 def get_optional_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User | None:
+) -> CurrentUser | None:
     """Get current user from token (optional - returns None if not authenticated)"""
     if not credentials:
         return None
 
-    token = credentials.credentials
-    return db.query(User).filter(User.token == token).first()
+    return lookup_token(db, credentials.credentials)
@@ -0,0 +1,115 @@
+"""
+Set-based updates and deletes of many applications in one transaction.
+
+Rows are selected by a list of ids or by the dashboard filters, locked, and
+then changed with a single UPDATE or DELETE. The ipo_counters rows are
+adjusted from two GROUP BY tallies (before and after), and updated rows are
+returned with one joined read.
+
+Id lists go to the database in slices of ID_CHUNK_SIZE, one statement per
+slice in the same transaction, so an IN (...) list never exceeds SQLite's
+bound-variable limit.
+"""
+
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import select, update, delete, case, false
+from sqlalchemy.orm import Session
+
+from counters import apply_deltas, merge_deltas, tally_query
+from delta_sync import record_tombstones
+from models import IpoApplication
+from queries import select_applications, apply_application_filters, application_row_to_dict
+
+VALID_STATUSES = ("Pending", "Allotted", "Not Allotted")
+FILTER_KEYS = ("ipoName", "allotmentStatus", "search")
+ID_CHUNK_SIZE = 500
+
+def id_chunks(ids: list) -> Iterator[list]:
+    """ids in slices of at most ID_CHUNK_SIZE"""
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+def parse_patch(data: dict) -> dict:
+    """Map a frontend patch to column values; raises ValueError if it is empty or invalid"""
+    values = {}
+    if "moneySent" in data:
+        values["money_sent"] = bool(data["moneySent"])
+    if "moneyReceived" in data:
+        values["money_received"] = bool(data["moneyReceived"])
+    if "allotmentStatus" in data:
+        if data["allotmentStatus"] not in VALID_STATUSES:
+            raise ValueError(f"Invalid allotmentStatus '{data['allotmentStatus']}'")
+        values["allotment_status"] = data["allotmentStatus"]
+    if not values:
+        raise ValueError("data must set moneySent, moneyReceived or allotmentStatus")
+
+    # Same rule as updateRow: "Not Allotted" never has money received
+    if values.get("allotment_status") == "Not Allotted":
+        values["money_received"] = False
+    elif "money_received" in values and "allotment_status" not in values:
+        values["money_received"] = case(
+            (IpoApplication.allotment_status == "Not Allotted", false()),
+            else_=values["money_received"]
+        )
+    return values
+
+def select_target_ids(db: Session, user_id: int, ids: list | None = None,
+                      filters: dict | None = None) -> list[str]:
+    """Lock and return the ids of user_id's applications matching ids or filters"""
+    if (ids is None) == (filters is None):
+        raise ValueError("Pass either ids or filter")
+
+    stmt = select(IpoApplication.id).where(IpoApplication.created_by == user_id)
+    if ids is not None:
+        if not isinstance(ids, list):
+            raise ValueError("ids must be a list")
+        found = []
+        for chunk in id_chunks(list(dict.fromkeys(ids))):
+            found += db.scalars(stmt.where(IpoApplication.id.in_(chunk)).with_for_update())
+        return found
+
+    filters = {k: filters.get(k) for k in FILTER_KEYS if filters.get(k)}
+    if not filters:
+        raise ValueError(f"filter needs at least one of {', '.join(FILTER_KEYS)}")
+    # search spans applicant columns, so match through the joined select
+    matching = apply_application_filters(
+        select_applications(user_id),
+        filters.get("ipoName"), filters.get("allotmentStatus"), filters.get("search")
+    ).with_only_columns(IpoApplication.id)
+    return list(db.scalars(stmt.where(IpoApplication.id.in_(matching)).with_for_update()))
+
+def update_applications(db: Session, user_id: int, target_ids: list[str], values: dict) -> int:
+    """Apply column values to target_ids and adjust counters (caller commits)"""
+    deltas = []
+    for chunk in id_chunks(target_ids):
+        in_chunk = IpoApplication.id.in_(chunk)
+        deltas.append(tally_query(db, in_chunk, sign=-1))
+        db.execute(
+            update(IpoApplication).where(in_chunk).values(values)
+            .execution_options(synchronize_session=False)
+        )
+        deltas.append(tally_query(db, in_chunk))
+    apply_deltas(db, user_id, merge_deltas(*deltas))
+    return len(target_ids)
+
+def delete_applications(db: Session, user_id: int, target_ids: list[str]) -> int:
+    """Delete target_ids, remove them from the counters and leave tombstones (caller commits)"""
+    deltas = []
+    for chunk in id_chunks(target_ids):
+        in_chunk = IpoApplication.id.in_(chunk)
+        deltas.append(tally_query(db, in_chunk, sign=-1))
+        db.execute(delete(IpoApplication).where(in_chunk).execution_options(synchronize_session=False))
+    apply_deltas(db, user_id, merge_deltas(*deltas))
+    record_tombstones(db, user_id, "application", target_ids)
+    return len(target_ids)
+
+def read_applications(db: Session, user_id: int, target_ids: list[str]) -> list[dict]:
+    """Joined read of the given applications, newest first"""
+    rows = []
+    for chunk in id_chunks(target_ids):
+        rows += db.execute(select_applications(user_id).where(IpoApplication.id.in_(chunk)))
+    # Slices come back separately, so order the union here
+    rows.sort(key=lambda row: (row.created_at or datetime.min, row.id), reverse=True)
+    return [application_row_to_dict(row) for row in rows]
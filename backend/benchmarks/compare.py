@@ -0,0 +1,53 @@
+"""
+Compare two benchmarks.suite result files scenario by scenario.
+
+Prints p50/p95 latency and queries per request for both runs with the
+relative change; latency changes within --threshold percent are shown as
+noise ("~").
+
+Run from the backend directory:
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+"""
+
+import argparse
+import json
+
+def load(path: str) -> dict:
+    """A suite result file"""
+    with open(path) as f:
+        return json.load(f)
+
+def change(before: float, after: float, threshold: float) -> str:
+    """Relative change as a signed percentage, or ~ within threshold"""
+    if not before:
+        return "new" if after else "~"
+    percent = (after - before) * 100 / before
+    return "~" if abs(percent) < threshold else f"{percent:+.0f}%"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent treated as noise")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    for label, run in (("before", before), ("after", after)):
+        meta = run["meta"]
+        print(f"{label:<7} {meta['commit']}  {meta['database']}  {meta['sizes']}  {meta['timestamp']}")
+
+    print(f"\n{'scenario':<30}{'p50 ms':>26}  {'p95 ms':>26}{'queries':>12}")
+    for name, new in after["scenarios"].items():
+        old = before["scenarios"].get(name)
+        if old is None:
+            print(f"{name:<30}{'(not in before)':>18}")
+            continue
+        cells = []
+        for key in ("p50", "p95"):
+            a, b = old["latencyMs"][key], new["latencyMs"][key]
+            cells.append(f"{a:>8.2f} -> {b:<8.2f}{change(a, b, args.threshold):>6}")
+        queries = f"{old['queriesPerRequest']:g} -> {new['queriesPerRequest']:g}"
+        print(f"{name:<30}{cells[0]}  {cells[1]}{queries:>12}")
+
+if __name__ == "__main__":
+    main()
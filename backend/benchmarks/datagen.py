@@ -0,0 +1,172 @@
+"""
+Seeded synthetic data for benchmarks, written straight to the database.
+
+Creates the schema the app expects (startup.prepare_database), then bulk
+inserts N login users (bench0..benchN-1, password "bench", token
+"bench-token-<i>"), M IPOs, K applicants and A applications with Core
+executemany batches - no API round trips, so a million applications load in
+under a minute on SQLite. Applicants are spread round-robin over the
+users and every application is a distinct (applicant, IPO) pair, so A may be
+at most K * M. The same --seed always produces the same rows, ids included,
+which keeps runs on different commits comparable.
+
+Works with any DATABASE_URL the app accepts (SQLite or PostgreSQL).
+
+Run from the backend directory:
+    python -m benchmarks.datagen sqlite:///bench.db [--size large] [--applications 1000000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+# (users, ipos, applicants, applications); any count can be overridden
+SIZES = {
+    "small": (2, 10, 500, 1_000),
+    "medium": (5, 25, 4_000, 10_000),
+    "large": (10, 50, 20_000, 100_000),
+    "xl": (20, 100, 100_000, 1_000_000),
+}
+INSERT_BATCH = 10_000
+BENCH_PASSWORD = "bench"
+STATUSES = ("Pending", "Allotted", "Not Allotted")
+
+def bench_token(user: int) -> str:
+    """Bearer token of generated user n"""
+    return f"bench-token-{user}"
+
+def pan(n: int) -> str:
+    """A valid, unique PAN for applicant n"""
+    letters = ""
+    for _ in range(5):
+        n, digit = divmod(n, 26)
+        letters += chr(ord("A") + digit)
+    return f"{letters}{n % 10000:04d}F"
+
+def insert_batches(engine, table, rows) -> int:
+    """Insert rows in INSERT_BATCH-sized transactions; returns rows inserted"""
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH:
+            with engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        total += len(batch)
+    return total
+
+def generate(engine, users: int, ipos: int, applicants: int, applications: int, seed: int = 42) -> dict:
+    """Create the schema and fill it; returns the counts and the generated user ids"""
+    from auth import get_password_hash
+    from counters import rebuild_counters
+    from models import Applicant, IpoApplication, IpoName, User
+    from startup import prepare_database
+
+    if applications > applicants * ipos:
+        raise ValueError(f"{applications} applications need applicants * ipos >= {applications}")
+    rng = random.Random(seed)
+    prepare_database(engine, sessionmaker(bind=engine))
+
+    with Session(engine) as db:
+        if db.scalar(select(func.count()).select_from(User).where(User.username.like("bench%"))):
+            raise ValueError("Database already has generated data; use a fresh one")
+
+    started = time.perf_counter()
+    base = datetime(2024, 1, 1)
+    hashed = get_password_hash(BENCH_PASSWORD)
+    insert_batches(engine, User.__table__, (
+        {"username": f"bench{u}", "hashed_password": hashed, "token": bench_token(u),
+         "is_verified": True, "created_at": base}
+        for u in range(users)
+    ))
+    with Session(engine) as db:
+        user_ids = list(db.scalars(
+            select(User.id).where(User.username.in_([f"bench{u}" for u in range(users)])).order_by(User.id)
+        ))
+
+    ipo_names = [f"Bench IPO {i:04d}" for i in range(ipos)]
+    amounts = [rng.choice((14000, 14500, 14800, 15000, 15200)) for _ in range(ipos)]
+    insert_batches(engine, IpoName.__table__, (
+        {"name": name, "amount": amount, "created_at": base, "updated_at": base}
+        for name, amount in zip(ipo_names, amounts)
+    ))
+
+    insert_batches(engine, Applicant.__table__, (
+        {"id": f"user-{a:026d}", "name": f"Applicant {a}", "phone": f"9{rng.randrange(10**9):09d}",
+         "pan": pan(a), "created_by": user_ids[a % users],
+         "created_at": base + timedelta(minutes=a), "updated_at": base + timedelta(minutes=a)}
+        for a in range(applicants)
+    ))
+
+    def application_rows():
+        for n in range(applications):
+            applicant, ipo = n % applicants, n // applicants
+            status = rng.choices(STATUSES, weights=(6, 2, 2))[0]
+            sent = rng.random() < 0.7
+            created_at = base + timedelta(days=ipo * 3, seconds=applicant)
+            yield {
+                "id": f"app-{n:026d}", "ipo_name": ipo_names[ipo], "user_id": f"user-{applicant:026d}",
+                "money_sent": sent, "money_received": sent and status == "Not Allotted" and rng.random() < 0.5,
+                "allotment_status": status, "created_by": user_ids[applicant % users],
+                "created_at": created_at, "updated_at": created_at,
+            }
+    insert_batches(engine, IpoApplication.__table__, application_rows())
+
+    with Session(engine) as db:
+        rebuild_counters(db)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+
+    seconds = time.perf_counter() - started
+    print(f"[OK] Generated {users} users, {ipos} IPOs, {applicants} applicants, "
+          f"{applications} applications in {seconds:.1f}s ({applications / max(seconds, 1e-9):,.0f} rows/s)")
+    return {
+        "users": users, "ipos": ipos, "applicants": applicants, "applications": applications,
+        "seed": seed, "userIds": user_ids, "ipoNames": ipo_names, "seconds": seconds,
+    }
+
+def add_size_arguments(parser: argparse.ArgumentParser) -> None:
+    """--size preset plus per-count overrides and --seed"""
+    parser.add_argument("--size", choices=SIZES, default="medium")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--ipos", type=int)
+    parser.add_argument("--applicants", type=int)
+    parser.add_argument("--applications", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+
+def sizes_from_args(args) -> dict:
+    """Counts chosen by --size and the explicit overrides"""
+    users, ipos, applicants, applications = SIZES[args.size]
+    return {
+        "users": args.users or users,
+        "ipos": args.ipos or ipos,
+        "applicants": args.applicants or applicants,
+        "applications": args.applications if args.applications is not None else applications,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("url", help="database URL, e.g. sqlite:///bench.db")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    from database import create_configured_engine
+
+    try:
+        generate(create_configured_engine(args.url), seed=args.seed, **sizes_from_args(args))
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Concurrent read/write throughput of SQLite with the old engine defaults
+(rollback journal, synchronous=FULL) versus the tuned settings in database.py
+(WAL, synchronous=NORMAL, busy_timeout, larger cache).
+
+Each run uses a fresh database file with an ipo_applications-like table,
+then runs reader and writer threads against it for a fixed time.
+
+Run from the backend directory:
+    python -m benchmarks.engine_concurrency [--seconds 5] [--readers 8] [--writers 2]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+
+from database import create_configured_engine, POOL_SETTINGS, SQLITE_PRAGMAS
+
+CONFIGS = {
+    # What create_engine(url) gave us before: no pragmas, default pool
+    "default": {"pool": {}, "pragmas": {}},
+    "tuned": {"pool": POOL_SETTINGS, "pragmas": SQLITE_PRAGMAS},
+}
+
+SEED_ROWS = 20000
+
+def seed(engine) -> None:
+    """Create and fill the benchmark table"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE apps (id INTEGER PRIMARY KEY, created_by INTEGER, "
+            "ipo_name TEXT, status TEXT, money_sent INTEGER)"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_apps_created_by ON apps (created_by, ipo_name)")
+        conn.execute(
+            text("INSERT INTO apps (created_by, ipo_name, status, money_sent) VALUES (:u, :i, 'Pending', 0)"),
+            [{"u": n % 50, "i": f"IPO {n % 20}"} for n in range(SEED_ROWS)]
+        )
+
+def run_config(name: str, seconds: float, readers: int, writers: int) -> dict:
+    """Run readers and writers against a fresh database; returns counts and rates"""
+    path = os.path.join(tempfile.mkdtemp(prefix="engine-bench-"), "bench.db")
+    config = CONFIGS[name]
+    engine = create_configured_engine(f"sqlite:///{path}", pool=config["pool"], pragmas=config["pragmas"])
+    seed(engine)
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader() -> None:
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT status, count(*) FROM apps WHERE created_by = :u GROUP BY status"),
+                        {"u": random.randrange(50)}
+                    ).all()
+                done += 1
+            except Exception:
+                errors += 1
+        with lock:
+            counts["reads"] += done
+            counts["errors"] += errors
+
+    def writer() -> None:
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("UPDATE apps SET status = 'Allotted', money_sent = 1 WHERE id = :id"),
+                        {"id": random.randrange(1, SEED_ROWS)}
+                    )
+                    conn.execute(
+                        text("INSERT INTO apps (created_by, ipo_name, status, money_sent) "
+                             "VALUES (:u, 'IPO new', 'Pending', 0)"),
+                        {"u": random.randrange(50)}
+                    )
+                done += 1
+            except Exception:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with engine.connect() as conn:
+        journal = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+
+    return {
+        "config": name,
+        "journal": journal,
+        **counts,
+        "reads_per_s": counts["reads"] / seconds,
+        "writes_per_s": counts["writes"] / seconds,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"[BENCH] {args.readers} readers, {args.writers} writers, {args.seconds:g}s per config")
+    results = [run_config(name, args.seconds, args.readers, args.writers) for name in CONFIGS]
+
+    print(f"\n{'config':<10}{'journal':<10}{'reads/s':>12}{'writes/s':>12}{'errors':>10}")
+    for r in results:
+        print(f"{r['config']:<10}{r['journal']:<10}{r['reads_per_s']:>12,.0f}"
+              f"{r['writes_per_s']:>12,.0f}{r['errors']:>10}")
+
+if __name__ == "__main__":
+    main()
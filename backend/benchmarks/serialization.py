@@ -0,0 +1,172 @@
+"""
+Serialization time and bytes on the wire for GET /api?action=list.
+
+Seeds a scratch SQLite database through the API, then measures:
+- encoding the full list the old way (dict per row, jsonable_encoder, stdlib
+  json) against serialization.encode_applications, best of --repeat runs
+- the size and compression time of that body as identity, gzip and brotli
+- the same for format=columnar
+- the whole request through httpx's ASGITransport per Accept-Encoding, with
+  the bytes actually sent
+
+Run from the backend directory:
+    python -m benchmarks.serialization [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.datagen import pan
+
+async def login(client) -> dict:
+    """Auth header for the default admin"""
+    response = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+async def seed(rows: int) -> dict:
+    """Fill a fresh database with applicants and applications through the API"""
+    import httpx
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = await login(client)
+            for n in range(5):
+                await client.post("/api", json={"action": "addIpo", "ipoName": f"IPO {n}", "amount": 15000},
+                                  headers=headers)
+            users = rows // 5
+            lines = ["Name,PAN,IPO Name"] + [f"Applicant {i},{pan(i)},IPO 0" for i in range(users)]
+            response = await client.post("/api/import", files={"file": ("seed.csv", "\n".join(lines).encode())},
+                                         headers=headers)
+            response.raise_for_status()
+            ids = [u["id"] for u in (await client.get("/api?action=listUsers", headers=headers)).json()]
+            for n in range(1, 5):
+                await client.post("/api", json={"action": "addBulkApplications", "ipoName": f"IPO {n}",
+                                                "userIds": ids}, headers=headers)
+            total = len((await client.get("/api?action=list", headers=headers)).json())
+    return {"applications": total}
+
+def best_of(repeat: int, fn) -> tuple[float, object]:
+    """Fastest of repeat calls in seconds, and the last result"""
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def encode_old(rows) -> bytes:
+    """The pre-serialization.py path: dicts, jsonable_encoder, then JSONResponse's json.dumps"""
+    from fastapi.encoders import jsonable_encoder
+    from queries import application_row_to_dict
+
+    content = jsonable_encoder([application_row_to_dict(row) for row in rows])
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def measure_encoding(rows, repeat: int) -> bytes:
+    """Print old vs fast encoding time; returns the encoded body"""
+    from serialization import encode_applications, orjson
+
+    old_seconds, old_body = best_of(repeat, lambda: encode_old(rows))
+    new_seconds, new_body = best_of(repeat, lambda: encode_applications(rows))
+    print(f"\n[BENCH] Encoding {len(rows)} rows ({'orjson' if orjson else 'stdlib json'} fast path)")
+    print(f"{'path':<22}{'ms':>10}{'rows/s':>14}")
+    for name, seconds in (("dict+jsonable+json", old_seconds), ("encode_applications", new_seconds)):
+        print(f"{name:<22}{seconds * 1000:>10.1f}{len(rows) / seconds:>14,.0f}")
+    print(f"speedup {old_seconds / new_seconds:.1f}x, identical output: {old_body == new_body}")
+    return new_body
+
+def measure_compression(body: bytes, repeat: int) -> None:
+    """Print size and compression time of body per encoding"""
+    from compression import ENCODERS
+
+    print(f"\n[BENCH] Compressing the {len(body):,} byte body")
+    print(f"{'encoding':<10}{'bytes':>14}{'ratio':>8}{'ms':>10}")
+    print(f"{'identity':<10}{len(body):>14,}{1:>8.1f}{0:>10.1f}")
+    for name, encoder in ENCODERS.items():
+        seconds, compressed = best_of(repeat, lambda: encoder().finish(body))
+        print(f"{name:<10}{len(compressed):>14,}{len(body) / len(compressed):>8.1f}{seconds * 1000:>10.1f}")
+
+def measure_columnar(rows, body: bytes, repeat: int) -> None:
+    """Print encode time and size of format=columnar next to the row format"""
+    from compression import ENCODERS
+    from serialization import columnar_applications, dumps
+
+    seconds, columnar = best_of(repeat, lambda: dumps(columnar_applications(rows)))
+    print(f"\n[BENCH] format=columnar: encoded in {seconds * 1000:.1f}ms")
+    print(f"{'encoding':<10}{'rows bytes':>14}{'columnar':>14}{'smaller':>9}")
+    print(f"{'identity':<10}{len(body):>14,}{len(columnar):>14,}{len(body) / len(columnar):>8.1f}x")
+    for name, encoder in ENCODERS.items():
+        plain, packed = len(encoder().finish(body)), len(encoder().finish(columnar))
+        print(f"{name:<10}{plain:>14,}{packed:>14,}{plain / packed:>8.1f}x")
+
+async def measure_requests(repeat: int) -> None:
+    """Print request time and wire bytes of the full list per Accept-Encoding"""
+    import httpx
+    import main
+    from compression import ENCODERS
+
+    print(f"\n[BENCH] GET /api?action=list through the app")
+    print(f"{'format':<10}{'accept-encoding':<18}{'wire bytes':>14}{'p50 ms':>10}{'min ms':>10}")
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+            token = response.json()["token"]
+            for fmt, path in (("rows", "/api?action=list"), ("columnar", "/api?action=list&format=columnar")):
+                for encoding in ("identity", *ENCODERS):
+                    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": encoding}
+                    timings, wire = [], 0
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        response = await client.get(path, headers=headers)
+                        await response.aread()
+                        timings.append(time.perf_counter() - start)
+                        wire = response.num_bytes_downloaded
+                    print(f"{fmt:<10}{encoding:<18}{wire:>14,}{statistics.median(timings) * 1000:>10.1f}"
+                          f"{min(timings) * 1000:>10.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # database.py reads these at import time, so set them before any app import
+    workdir = tempfile.mkdtemp(prefix="serialization-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("EMAIL_SINK", "stdout")
+
+    from sqlalchemy import select
+    from database import SessionLocal
+    from models import IpoApplication, User
+    from queries import select_applications
+
+    seeded = asyncio.run(seed(args.rows))
+    print(f"[BENCH] {seeded['applications']} applications")
+
+    db = SessionLocal()
+    try:
+        admin_id = db.execute(select(User.id).where(User.username == "admin")).scalar()
+        rows = db.execute(
+            select_applications(admin_id).order_by(IpoApplication.created_at.desc())
+        ).all()
+    finally:
+        db.close()
+
+    body = measure_encoding(rows, args.repeat)
+    measure_compression(body, args.repeat)
+    measure_columnar(rows, body, args.repeat)
+    asyncio.run(measure_requests(args.repeat))
+    shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
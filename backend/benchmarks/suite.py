@@ -0,0 +1,388 @@
+"""
+Latency and queries per request for every GET/POST /api action, /auth/login
+and get_current_user, run in-process against the ASGI app.
+
+The database is filled by benchmarks.datagen (a fresh SQLite file unless
+--url points elsewhere), then each scenario sends its requests one at a time
+through httpx's ASGITransport as the first generated user. SQL statements
+are counted with cursor-execute events, but only those issued from the
+request's own context (a ContextVar the events read), so the email and OTP
+workers running in the background do not skew the numbers.
+
+Read scenarios get one unmeasured warm-up request; write scenarios build on
+each other in order (addUser creates the applicants deleteUser removes,
+addIpo/addBulkApplications create the rows deleteRow/deleteRows remove), so
+a run leaves the generated data as it found it apart from updated flags.
+
+Results are written as JSON (latency percentiles, queries and query time per
+request, response bytes) for comparison across commits:
+    python -m benchmarks.suite --size large --out before.json
+    python -m benchmarks.suite --size large --out after.json
+    python -m benchmarks.compare before.json after.json
+
+Run from the backend directory.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from contextvars import ContextVar
+from datetime import datetime
+
+from benchmarks.datagen import add_size_arguments, sizes_from_args, bench_token
+
+# ==================== Query counting ====================
+
+class QueryCounter:
+    """SQL statements and their time, attributed to whichever scenario set `current`"""
+
+    def __init__(self):
+        self.current: ContextVar[list | None] = ContextVar("bench_queries", default=None)
+
+    def install(self, engine) -> None:
+        """Listen to a sync engine's cursor executions"""
+        from sqlalchemy import event
+
+        event.listen(engine, "before_cursor_execute", self.before)
+        event.listen(engine, "after_cursor_execute", self.after)
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        if self.current.get() is not None:
+            conn.info.setdefault("bench_started", []).append(time.perf_counter())
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        stats = self.current.get()
+        if stats is not None and conn.info.get("bench_started"):
+            stats[0] += 1
+            stats[1] += time.perf_counter() - conn.info["bench_started"].pop()
+
+query_counter = QueryCounter()
+
+# ==================== Scenarios ====================
+
+class Scenario:
+    """Requests of one kind; path/body/headers may be callables of (i, state)"""
+
+    def __init__(self, name: str, method: str, path, body=None, headers=None,
+                 scale: float = 1.0, warmup: bool = False, setup=None, before_each=None,
+                 on_response=None, expect: int = 200):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers
+        self.scale = scale
+        self.warmup = warmup
+        self.setup = setup
+        self.before_each = before_each
+        self.on_response = on_response
+        self.expect = expect
+
+def resolve(value, i: int, state: dict):
+    """value(i, state) if callable, else value"""
+    return value(i, state) if callable(value) else value
+
+def pick(items: list, i: int) -> str:
+    """items[i], wrapping around; a missing id if an earlier scenario was skipped"""
+    return items[i % len(items)] if items else "missing"
+
+def chunk(items: list, i: int, size: int) -> list:
+    """The i-th size-long slice of items, wrapping around"""
+    if not items:
+        return []
+    start = (i * size) % len(items)
+    return (items + items)[start:start + size]
+
+def get(name: str, query: str, **kwargs) -> Scenario:
+    """A GET /api scenario with a warm-up request"""
+    return Scenario(name, "GET", lambda i, s: f"/api?{resolve(query, i, s)}", warmup=True, **kwargs)
+
+def post(name: str, body, **kwargs) -> Scenario:
+    """A POST /api scenario"""
+    return Scenario(name, "POST", "/api", body=body, **kwargs)
+
+def load_state(state: dict) -> None:
+    """Ids of the benchmark user's data, for the scenarios to pick from"""
+    from sqlalchemy import select
+    from database import SessionLocal
+    from models import Applicant, IpoApplication, IpoName
+
+    db = SessionLocal()
+    try:
+        user_id = state["user_id"]
+        state["ipo_names"] = list(db.scalars(select(IpoName.name).order_by(IpoName.name)))
+        state["applicant_ids"] = list(db.scalars(
+            select(Applicant.id).where(Applicant.created_by == user_id).order_by(Applicant.id).limit(5000)
+        ))
+        state["application_ids"] = list(db.scalars(
+            select(IpoApplication.id).where(IpoApplication.created_by == user_id)
+            .order_by(IpoApplication.id).limit(5000)
+        ))
+    finally:
+        db.close()
+
+async def first_page_cursor(client, state: dict) -> None:
+    """Cursor of the first list page and its ETag, for the cursor and 304 scenarios"""
+    response = await client.get("/api?action=list&pageSize=100", headers=state["auth"])
+    state["cursor"] = response.json()["nextCursor"]
+    state["page_etag"] = response.headers.get("etag")
+
+async def bench_applications(client, state: dict) -> None:
+    """Applications addBulkApplications created under this run's IPOs"""
+    from sqlalchemy import select
+    from database import SessionLocal
+    from models import IpoApplication
+
+    db = SessionLocal()
+    try:
+        state["bench_application_ids"] = list(db.scalars(
+            select(IpoApplication.id).where(IpoApplication.ipo_name.in_(state["run_ipos"]))
+        ))
+    finally:
+        db.close()
+
+def clear_token_cache() -> None:
+    from auth import token_cache
+    token_cache.clear()
+
+def remember_applicant(response, state: dict) -> None:
+    state["new_applicants"].append(response.json()["id"])
+
+def add_user(i: int, state: dict) -> dict:
+    return {"action": "addUser", "data": {"name": f"Run {state['tag']} {i}", "phone": "9000000000",
+                                          "pan": "ABCDE1234F"}}
+
+def add_ipo(i: int, state: dict) -> dict:
+    name = f"Run {state['tag']} IPO {i}"
+    state["run_ipos"].append(name)
+    return {"action": "addIpo", "ipoName": name, "amount": 15000}
+
+def add_bulk(i: int, state: dict) -> dict:
+    return {"action": "addBulkApplications", "ipoName": pick(state["run_ipos"], i),
+            "userIds": chunk(state["applicant_ids"], i // max(len(state["run_ipos"]), 1), 100)}
+
+def delete_row(i: int, state: dict) -> dict:
+    ids = state["bench_application_ids"]
+    return {"action": "deleteRow", "id": ids.pop() if ids else "missing"}
+
+SCENARIOS = [
+    get("list (full)", "action=list", scale=0.1),
+    get("list (full, columnar)", "action=list&format=columnar", scale=0.1),
+    get("list (page)", "action=list&pageSize=100"),
+    get("list (page, columnar)", "action=list&pageSize=100&format=columnar"),
+    get("list (page, filtered)", lambda i, s: f"action=list&pageSize=100&ipoName={s['ipo_names'][0]}&search=Applicant%201"),
+    get("list (page, sorted by name)", "action=list&pageSize=100&sortField=userName&sortDir=asc"),
+    get("list (next page)", lambda i, s: f"action=list&pageSize=100&cursor={s['cursor']}", setup=first_page_cursor),
+    get("list (page, 304)", "action=list&pageSize=100", headers=lambda i, s: {"If-None-Match": s["page_etag"]},
+        setup=first_page_cursor, expect=304),
+    get("summary", "action=summary"),
+    get("summary (one IPO)", lambda i, s: f"action=summary&ipoName={s['ipo_names'][i % len(s['ipo_names'])]}"),
+    get("listIpos", "action=listIpos"),
+    get("listUsers", "action=listUsers", scale=0.2),
+    get("getAppliedUsers", lambda i, s: f"action=getAppliedUsers&ipoName={s['ipo_names'][i % len(s['ipo_names'])]}"),
+    get("changesSince", lambda i, s: f"action=changesSince&version={s['version']}"),
+    # As admin: logging in replaces the user's token, and the other scenarios use bench0's
+    Scenario("/auth/login", "POST", "/auth/login", body={"username": "admin", "password": "admin123"}, scale=0.2),
+    Scenario("get_current_user (cached)", "GET", "/auth/verify", warmup=True),
+    Scenario("get_current_user (uncached)", "GET", "/auth/verify", before_each=clear_token_cache),
+    post("addUser", add_user, on_response=remember_applicant),
+    post("updateUser", lambda i, s: {"action": "updateUser", "id": pick(s["new_applicants"], i),
+                                     "data": {"phone": f"9{i:09d}"}}),
+    post("addIpo", add_ipo),
+    post("addBulkApplications", add_bulk),
+    post("updateRow", lambda i, s: {"action": "updateRow", "id": pick(s["application_ids"], i),
+                                    "data": {"moneySent": i % 2 == 0}}),
+    post("updateRows", lambda i, s: {"action": "updateRows", "ids": chunk(s["application_ids"], i, 100),
+                                     "data": {"moneyReceived": i % 2 == 0}}),
+    post("deleteRow", delete_row, setup=bench_applications),
+    post("deleteRows", lambda i, s: {"action": "deleteRows", "filter": {"ipoName": pick(s["run_ipos"], i)}}),
+    post("deleteUser", lambda i, s: {"action": "deleteUser", "id": pick(s["new_applicants"], i)}),
+]
+
+# ==================== Runner ====================
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p90/p95/p99/max/mean of samples (seconds), in milliseconds"""
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "p50": round(cuts[49] * 1000, 3),
+        "p90": round(cuts[89] * 1000, 3),
+        "p95": round(cuts[94] * 1000, 3),
+        "p99": round(cuts[98] * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+async def run_scenario(client, scenario: Scenario, requests: int, state: dict) -> dict:
+    """Send the scenario's requests one at a time; returns its result record"""
+    if scenario.setup:
+        await scenario.setup(client, state)
+    count = max(1, round(requests * scenario.scale))
+
+    async def send(i: int):
+        headers = {**state["auth"], **(resolve(scenario.headers, i, state) or {})}
+        body = resolve(scenario.body, i, state)
+        return await client.request(scenario.method, resolve(scenario.path, i, state),
+                                    json=body, headers=headers)
+
+    if scenario.warmup:
+        await send(0)
+
+    latencies, errors, size, wire = [], 0, 0, 0
+    stats = [0, 0.0]
+    for i in range(count):
+        if scenario.before_each:
+            scenario.before_each()
+        token = query_counter.current.set(stats)
+        try:
+            start = time.perf_counter()
+            response = await send(i)
+            await response.aread()
+            latencies.append(time.perf_counter() - start)
+        finally:
+            query_counter.current.reset(token)
+        if response.status_code != scenario.expect:
+            errors += 1
+            if errors == 1:
+                print(f"   [WARN] {scenario.name}: HTTP {response.status_code} {response.text[:200]}")
+        elif scenario.on_response:
+            scenario.on_response(response, state)
+        size += len(response.content)
+        wire += response.num_bytes_downloaded
+
+    return {
+        "requests": count,
+        "errors": errors,
+        "latencyMs": percentiles(latencies),
+        "queriesPerRequest": round(stats[0] / count, 2),
+        "queryMsPerRequest": round(stats[1] * 1000 / count, 3),
+        "bytesPerResponse": size // count,
+        "wireBytesPerResponse": wire // count,
+    }
+
+async def run_suite(requests: int, only: list[str] | None) -> dict:
+    """Run every (or every matching) scenario against the app; returns results by name"""
+    import httpx
+    import main
+    from sqlalchemy import select
+    from database import engine, SessionLocal
+    from delta_sync import current_version
+    from models import User
+
+    query_counter.install(engine)
+
+    db = SessionLocal()
+    try:
+        user_id = db.scalar(select(User.id).where(User.username == "bench0"))
+    finally:
+        db.close()
+    state = {
+        "user_id": user_id,
+        "auth": {"Authorization": f"Bearer {bench_token(0)}"},
+        "tag": f"{time.time_ns():x}",
+        "version": current_version() - 3600 * 1_000_000,
+        "new_applicants": [],
+        "run_ipos": [],
+    }
+    load_state(state)
+
+    results = {}
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"\n{'scenario':<30}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+                  f"{'wire bytes':>12}{'errors':>7}")
+            for scenario in SCENARIOS:
+                if only and not any(term in scenario.name for term in only):
+                    continue
+                result = await run_scenario(client, scenario, requests, state)
+                results[scenario.name] = result
+                latency = result["latencyMs"]
+                print(f"{scenario.name:<30}{result['requests']:>6}{latency['p50']:>10.2f}{latency['p95']:>10.2f}"
+                      f"{latency['p99']:>10.2f}{result['queriesPerRequest']:>9.1f}"
+                      f"{result['wireBytesPerResponse']:>12,}{result['errors']:>7}")
+    return results
+
+def count_rows(engine) -> dict:
+    """Sizes of the data already in the database (for --reuse)"""
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+    from models import Applicant, IpoApplication, IpoName, User
+
+    with Session(engine) as db:
+        count = lambda model, *where: db.scalar(select(func.count()).select_from(model).where(*where))
+        return {
+            "users": count(User, User.username.like("bench%")),
+            "ipos": count(IpoName),
+            "applicants": count(Applicant),
+            "applications": count(IpoApplication),
+        }
+
+def git_commit() -> str | None:
+    """Short hash of HEAD, with -dirty if the tree has changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="database URL (default: a fresh SQLite file)")
+    parser.add_argument("--reuse", action="store_true", help="use the data already in --url")
+    add_size_arguments(parser)
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario (scaled down for heavy ones)")
+    parser.add_argument("--only", nargs="*", help="run scenarios whose name contains any of these")
+    parser.add_argument("--out", help="JSON results file (default: bench-<commit>-<applications>.json)")
+    args = parser.parse_args()
+    sizes = sizes_from_args(args)
+
+    # database.py reads these at import time, so set them before any app import
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-suite-'), 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("EMAIL_SINK", "stdout")
+
+    from database import engine
+    from benchmarks.datagen import generate
+
+    generated = None
+    if args.reuse:
+        sizes = count_rows(engine)
+        print(f"[INFO] Reusing {sizes}")
+    else:
+        generated = generate(engine, seed=args.seed, **sizes)
+
+    results = asyncio.run(run_suite(args.requests, args.only))
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "sizes": sizes,
+            "seed": None if args.reuse else args.seed,
+            "requestsPerScenario": args.requests,
+            "generateSeconds": round(generated["seconds"], 2) if generated else None,
+        },
+        "scenarios": results,
+    }
+    out = args.out or f"bench-{commit or 'unknown'}-{sizes['applications']}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] Results written to {out}")
+
+if __name__ == "__main__":
+    main()
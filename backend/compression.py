@@ -0,0 +1,169 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+The full application list is tens of megabytes of very repetitive JSON, so
+it compresses by an order of magnitude. Brotli is preferred when the client
+accepts it and the brotli package is installed, otherwise gzip. Bodies under
+COMPRESSION_MIN_SIZE bytes, non-text content types, responses that are
+already encoded and 204/304 replies are passed through untouched.
+
+Streamed bodies are compressed chunk by chunk with a sync flush after each,
+so the client still receives rows as they are read instead of after the
+last one. A compressed body has a different byte representation, so a
+strong ETag is sent as weak (W/"...") - data_versions.etag_matches already
+compares weakly, and If-None-Match keeps working across encodings.
+"""
+
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+# Quality 4-5 is the usual choice for dynamic responses; 11 is for static assets
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+SKIP_STATUSES = {204, 206, 304}
+
+# ==================== Encoders ====================
+
+class GzipEncoder:
+    """Incremental gzip stream"""
+    name = "gzip"
+
+    def __init__(self, level: int = GZIP_LEVEL):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compressed bytes for data, flushed so the client can decode them now"""
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compressed bytes for data plus the end of the stream"""
+        return self.compressor.compress(data) + self.compressor.flush()
+
+class BrotliEncoder:
+    """Incremental brotli stream"""
+    name = "br"
+
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compressed bytes for data, flushed so the client can decode them now"""
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compressed bytes for data plus the end of the stream"""
+        return self.compressor.process(data) + self.compressor.finish()
+
+ENCODERS = {"br": BrotliEncoder, "gzip": GzipEncoder} if brotli is not None else {"gzip": GzipEncoder}
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best encoding in ENCODERS the client accepts, by q-value then our preference order"""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for name in ENCODERS:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+def is_compressible(status: int, headers: Headers) -> bool:
+    """Whether a response with this status and headers may be compressed"""
+    if status < 200 or status in SKIP_STATUSES or "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", ""):
+        return False
+    return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+# ==================== Middleware ====================
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with the client's preferred encoding"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder
+            message_type = message["type"]
+
+            # Headers wait for the first body chunk, which decides whether to compress
+            if message_type == "http.response.start":
+                start_message = message
+                return
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                if message_type != "http.response.body" or not is_compressible(start["status"], headers):
+                    await send(start)
+                    await send(message)
+                    return
+
+                # Compressible type: caches must key on Accept-Encoding even when this body is small
+                headers.add_vary_header("Accept-Encoding")
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    return
+
+                encoder = ENCODERS[encoding]()
+                headers["Content-Encoding"] = encoder.name
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                    body = encoder.compress(body)
+                else:
+                    body = encoder.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if encoder is not None and message_type == "http.response.body":
+                more_body = message.get("more_body", False)
+                data = message.get("body", b"")
+                body = encoder.compress(data) if more_body else encoder.finish(data)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,207 @@
+"""
+Per-user, per-IPO application counters (the ipo_counters table).
+
+Every write to ipo_applications adjusts the matching counter row in the same
+transaction: the old state of a changed row is subtracted and its new state
+added, via an upsert that increments in place. The dashboard summary then
+reads one row per IPO instead of aggregating every application.
+
+Rebuild from scratch (one GROUP BY pass) or verify against a full recount:
+    python counters.py rebuild
+    python counters.py check
+"""
+
+import sys
+from typing import Iterable
+
+from sqlalchemy import select, func, case, delete, insert
+from sqlalchemy.orm import Session
+
+from models import IpoApplication, IpoCounter
+from queries import dialect_insert
+
+COUNTER_FIELDS = (
+    "applications", "pending", "allotted",
+    "not_allotted", "money_sent", "pending_refund"
+)
+
+# ipo name -> {counter field: change}
+Deltas = dict[str, dict[str, int]]
+
+def state_counts(status: str, money_sent: bool, money_received: bool) -> dict[str, int]:
+    """What one application with this state contributes to its counter row"""
+    return {
+        "applications": 1,
+        "pending": int(status == "Pending"),
+        "allotted": int(status == "Allotted"),
+        "not_allotted": int(status == "Not Allotted"),
+        "money_sent": int(bool(money_sent)),
+        "pending_refund": int(status == "Not Allotted" and not money_received),
+    }
+
+def add_state(deltas: Deltas, ipo_name: str, status: str, money_sent: bool,
+              money_received: bool, sign: int = 1) -> Deltas:
+    """Add (sign=1) or subtract (sign=-1) one application's state"""
+    totals = deltas.setdefault(ipo_name, dict.fromkeys(COUNTER_FIELDS, 0))
+    for field, value in state_counts(status, money_sent, money_received).items():
+        totals[field] += sign * value
+    return deltas
+
+def tally_rows(rows: Iterable[dict], sign: int = 1) -> Deltas:
+    """Deltas for application rows given as insert dicts"""
+    deltas: Deltas = {}
+    for row in rows:
+        add_state(deltas, row["ipo_name"], row["allotment_status"],
+                  row["money_sent"], row["money_received"], sign)
+    return deltas
+
+def _aggregate_columns():
+    """SUM expressions over ipo_applications matching COUNTER_FIELDS"""
+    status = IpoApplication.allotment_status
+
+    def count_where(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    return [
+        func.count(IpoApplication.id),
+        count_where(status == "Pending"),
+        count_where(status == "Allotted"),
+        count_where(status == "Not Allotted"),
+        count_where(IpoApplication.money_sent.is_(True)),
+        count_where((status == "Not Allotted") & IpoApplication.money_received.isnot(True)),
+    ]
+
+def tally_query(db: Session, *criteria, sign: int = 1) -> Deltas:
+    """Deltas for every application matching criteria, aggregated in SQL (for set-based writes)"""
+    stmt = (
+        select(IpoApplication.ipo_name, *_aggregate_columns())
+        .where(*criteria)
+        .group_by(IpoApplication.ipo_name)
+    )
+    return {
+        ipo_name: {field: sign * (value or 0) for field, value in zip(COUNTER_FIELDS, values)}
+        for ipo_name, *values in db.execute(stmt)
+    }
+
+def merge_deltas(*parts: Deltas) -> Deltas:
+    """Sum several deltas, e.g. the subtracted old and added new states of an update"""
+    merged: Deltas = {}
+    for part in parts:
+        for ipo_name, changes in part.items():
+            totals = merged.setdefault(ipo_name, dict.fromkeys(COUNTER_FIELDS, 0))
+            for field, value in changes.items():
+                totals[field] += value
+    return merged
+
+def apply_deltas(db: Session, user_id: int, deltas: Deltas) -> None:
+    """Increment user_id's counter rows in the current transaction (caller commits)"""
+    rows = [
+        {"created_by": user_id, "ipo_name": ipo_name, **changes}
+        for ipo_name, changes in deltas.items()
+        if any(changes.values())
+    ]
+    if not rows:
+        return
+
+    stmt = dialect_insert(db, IpoCounter)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["created_by", "ipo_name"],
+        set_={field: getattr(IpoCounter, field) + getattr(stmt.excluded, field)
+              for field in COUNTER_FIELDS}
+    )
+    # Sorted so concurrent writers take row locks in the same order
+    for row in sorted(rows, key=lambda r: r["ipo_name"]):
+        db.execute(stmt, row)
+
+def read_counters(db: Session, user_id: int) -> dict[str, dict[str, int]]:
+    """user_id's counters by IPO name"""
+    stmt = select(IpoCounter).where(IpoCounter.created_by == user_id)
+    return {
+        counter.ipo_name: {field: getattr(counter, field) for field in COUNTER_FIELDS}
+        for counter in db.scalars(stmt)
+    }
+
+def rebuild_counters(db: Session, user_id: int | None = None) -> int:
+    """Recompute counters from ipo_applications in one pass; returns counter rows written"""
+    recount = (
+        select(IpoApplication.created_by, IpoApplication.ipo_name, *_aggregate_columns())
+        .where(IpoApplication.created_by.isnot(None))
+        .group_by(IpoApplication.created_by, IpoApplication.ipo_name)
+    )
+    clear = delete(IpoCounter)
+    if user_id is not None:
+        recount = recount.where(IpoApplication.created_by == user_id)
+        clear = clear.where(IpoCounter.created_by == user_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(IpoCounter).from_select(["created_by", "ipo_name", *COUNTER_FIELDS], recount)
+    )
+    db.commit()
+    return result.rowcount
+
+def ensure_counters(db: Session) -> None:
+    """Build the counters once for databases that predate the table"""
+    has_counters = db.execute(select(IpoCounter.created_by).limit(1)).first() is not None
+    has_applications = db.execute(
+        select(IpoApplication.id).where(IpoApplication.created_by.isnot(None)).limit(1)
+    ).first() is not None
+    if has_applications and not has_counters:
+        rows = rebuild_counters(db)
+        print(f"[INFO] Built {rows} IPO counter rows from existing applications")
+
+def check_counters(db: Session) -> list[dict]:
+    """Compare every counter with a full recount; returns the mismatches"""
+    recount = {
+        (created_by, ipo_name): dict(zip(COUNTER_FIELDS, (v or 0 for v in values)))
+        for created_by, ipo_name, *values in db.execute(
+            select(IpoApplication.created_by, IpoApplication.ipo_name, *_aggregate_columns())
+            .where(IpoApplication.created_by.isnot(None))
+            .group_by(IpoApplication.created_by, IpoApplication.ipo_name)
+        )
+    }
+    stored = {
+        (c.created_by, c.ipo_name): {field: getattr(c, field) for field in COUNTER_FIELDS}
+        for c in db.scalars(select(IpoCounter))
+    }
+
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    mismatches = []
+    for key in sorted(recount.keys() | stored.keys(), key=str):
+        expected = recount.get(key, empty)
+        actual = stored.get(key, empty)
+        if expected != actual:
+            mismatches.append({
+                "createdBy": key[0],
+                "ipoName": key[1],
+                "expected": expected,
+                "actual": actual
+            })
+    return mismatches
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine, Base
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command not in ("rebuild", "check"):
+        print("Usage: python counters.py [rebuild|check]")
+        sys.exit(2)
+
+    Base.metadata.create_all(bind=engine, tables=[IpoCounter.__table__])
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            rows = rebuild_counters(db)
+            print(f"[OK] Rebuilt {rows} counter rows")
+        else:
+            mismatches = check_counters(db)
+            if mismatches:
+                for m in mismatches:
+                    print(f"[ERROR] user {m['createdBy']}, IPO '{m['ipoName']}': "
+                          f"expected {m['expected']}, found {m['actual']}")
+                print(f"\n[ERROR] {len(mismatches)} counter row(s) out of sync; "
+                      f"run: python counters.py rebuild")
+                sys.exit(1)
+            print("[OK] All counters match a full recount")
+    finally:
+        db.close()
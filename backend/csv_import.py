@@ -0,0 +1,243 @@
+"""
+Server-side CSV import of applicants and IPO applications.
+
+The upload is read row by row and written in batches, so memory stays flat no
+matter how large the file is. Each batch:
+- upserts applicants by PAN (one select, one multi-row insert, one bulk update)
+- inserts applications with ON CONFLICT DO NOTHING on (ipo_name, user_id)
+- adds the inserted applications to the ipo_counters rows
+- commits
+
+Expected header (case-insensitive, extra columns are ignored):
+    Name, PAN, Phone, IPO Name, Allotment Status, Money Sent, Money Received
+"""
+
+import codecs
+import csv
+import re
+from datetime import datetime
+from typing import BinaryIO
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from batch import VALID_STATUSES
+from ids import new_id
+from models import Applicant, IpoName, IpoApplication
+from counters import apply_deltas, tally_rows
+from queries import insert_ignoring_conflicts
+
+PAN_PATTERN = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]$")
+TRUE_VALUES = ("yes", "y", "true", "1")
+FALSE_VALUES = ("no", "n", "false", "0", "")
+
+REQUIRED_COLUMNS = ("name", "pan", "ipo name")
+OPTIONAL_COLUMNS = ("phone", "allotment status", "money sent", "money received")
+
+# Only the first errors are returned in full; the rest are counted
+MAX_REPORTED_ERRORS = 1000
+
+class ImportReport:
+    """Running totals and per-row errors for one import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.skipped = 0
+        self.applicants_created = 0
+        self.applicants_updated = 0
+        self.error_count = 0
+        self.errors: list[dict] = []
+
+    def error(self, row: int, field: str, message: str) -> None:
+        """Record an error against a CSV line"""
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "field": field, "message": message})
+
+    def to_dict(self) -> dict:
+        """Response body for the import endpoint"""
+        return {
+            "success": self.error_count == 0,
+            "rows": self.rows,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "applicantsCreated": self.applicants_created,
+            "applicantsUpdated": self.applicants_updated,
+            "errorCount": self.error_count,
+            "errors": self.errors
+        }
+
+def parse_bool(value: str) -> bool | None:
+    """Parse a yes/no style cell, returning None if it is not recognised"""
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+def parse_row(cells: list[str], columns: dict[str, int], ipo_names: set[str],
+              line: int, report: ImportReport) -> dict | None:
+    """Validate one CSV row, recording errors in the report; returns None if invalid"""
+    def cell(column: str) -> str:
+        index = columns.get(column)
+        return cells[index].strip() if index is not None and index < len(cells) else ""
+
+    name = cell("name")
+    pan = cell("pan").upper()
+    ipo_name = cell("ipo name")
+    status = cell("allotment status") or "Pending"
+    money_sent = parse_bool(cell("money sent"))
+    money_received = parse_bool(cell("money received"))
+
+    valid = True
+    if not name:
+        report.error(line, "Name", "Name is required")
+        valid = False
+    if not PAN_PATTERN.match(pan):
+        report.error(line, "PAN", "Invalid PAN format")
+        valid = False
+    if ipo_name not in ipo_names:
+        report.error(line, "IPO Name", f"IPO '{ipo_name}' does not exist")
+        valid = False
+    if status not in VALID_STATUSES:
+        report.error(line, "Allotment Status", f"Invalid status '{status}'")
+        valid = False
+    if money_sent is None:
+        report.error(line, "Money Sent", "Expected yes or no")
+        valid = False
+    if money_received is None:
+        report.error(line, "Money Received", "Expected yes or no")
+        valid = False
+    if not valid:
+        return None
+
+    return {
+        "name": name,
+        "pan": pan,
+        "phone": cell("phone"),
+        "ipo_name": ipo_name,
+        "allotment_status": status,
+        "money_sent": money_sent,
+        # Same rule as updateRow: "Not Allotted" never has money received
+        "money_received": money_received and status != "Not Allotted"
+    }
+
+def upsert_applicants(db: Session, user_id: int, rows: list[dict], report: ImportReport) -> dict[str, str]:
+    """Create or update the batch's applicants by PAN; returns PAN -> applicant id"""
+    latest: dict[str, dict] = {}
+    for row in rows:
+        latest[row["pan"]] = row
+
+    existing = db.execute(
+        select(Applicant.pan, Applicant.id, Applicant.name, Applicant.phone)
+        .where(Applicant.created_by == user_id, Applicant.pan.in_(latest.keys()))
+        .order_by(Applicant.created_at)
+    ).all()
+
+    ids: dict[str, str] = {}
+    changed = []
+    for pan, applicant_id, name, phone in existing:
+        if pan in ids:
+            continue
+        ids[pan] = applicant_id
+        row = latest[pan]
+        new_phone = row["phone"] or phone or ""
+        if row["name"] != name or new_phone != (phone or ""):
+            changed.append({"id": applicant_id, "name": row["name"], "phone": new_phone})
+
+    if changed:
+        # ORM bulk UPDATE by primary key: one executemany
+        db.execute(update(Applicant), changed)
+        report.applicants_updated += len(changed)
+
+    now = datetime.utcnow()
+    new_applicants = []
+    for pan, row in latest.items():
+        if pan in ids:
+            continue
+        ids[pan] = new_id("user")
+        new_applicants.append({
+            "id": ids[pan],
+            "name": row["name"],
+            "phone": row["phone"],
+            "pan": pan,
+            "created_by": user_id,
+            "created_at": now
+        })
+    if new_applicants:
+        db.execute(Applicant.__table__.insert(), new_applicants)
+        report.applicants_created += len(new_applicants)
+
+    return ids
+
+def flush_batch(db: Session, user_id: int, rows: list[dict], report: ImportReport) -> None:
+    """Write one batch of validated rows in its own transaction"""
+    applicant_ids = upsert_applicants(db, user_id, rows, report)
+
+    now = datetime.utcnow()
+    applications = {}
+    for row in rows:
+        applicant_id = applicant_ids[row["pan"]]
+        # Repeated (IPO, PAN) pairs inside the file collapse to the last one
+        applications[(row["ipo_name"], applicant_id)] = {
+            "id": new_id("app"),
+            "ipo_name": row["ipo_name"],
+            "user_id": applicant_id,
+            "money_sent": row["money_sent"],
+            "money_received": row["money_received"],
+            "allotment_status": row["allotment_status"],
+            "created_by": user_id,
+            "created_at": now
+        }
+
+    inserted = set(insert_ignoring_conflicts(
+        db, IpoApplication, list(applications.values()), ["ipo_name", "user_id"]
+    ))
+    apply_deltas(db, user_id, tally_rows(a for a in applications.values() if a["id"] in inserted))
+    db.commit()
+    report.imported += len(inserted)
+    report.skipped += len(rows) - len(inserted)
+
+def import_applications_csv(db: Session, user_id: int, stream: BinaryIO, batch_size: int = 500) -> dict:
+    """Import a CSV upload for user_id and return the import report"""
+    report = ImportReport()
+    text = codecs.getreader("utf-8-sig")(stream)
+    reader = csv.reader(text)
+
+    try:
+        header = next(reader, None)
+        if not header:
+            report.error(1, "File", "CSV file is empty")
+            return report.to_dict()
+
+        columns = {h.strip().lower(): i for i, h in enumerate(header)}
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            report.error(1, "Header", f"Missing column(s): {', '.join(missing)}")
+            return report.to_dict()
+
+        ipo_names = set(db.scalars(select(IpoName.name)))
+
+        batch: list[dict] = []
+        for cells in reader:
+            line = reader.line_num
+            if not any(c.strip() for c in cells):
+                continue
+            report.rows += 1
+            row = parse_row(cells, columns, ipo_names, line, report)
+            if row is None:
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush_batch(db, user_id, batch, report)
+                batch = []
+
+        if batch:
+            flush_batch(db, user_id, batch, report)
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        report.error(max(reader.line_num, 1), "File", f"Could not read CSV: {e}")
+
+    return report.to_dict()
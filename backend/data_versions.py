@@ -0,0 +1,73 @@
+"""
+Data-version counters behind the ETags of GET /api.
+
+Every POST write bumps the writer's 'user:<id>' version, and IPO changes
+also bump the global 'ipos' version. A GET's ETag is built from the versions
+its action depends on, so a client that sends If-None-Match with the tag it
+already holds gets a 304 after one primary-key read, without the action's
+query or serialization running.
+
+Versions are bumped after the write commits. A GET that races a write can
+at worst pair new data with the old tag, which only costs one extra full
+response on the next request.
+"""
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import DataVersion
+from queries import dialect_insert
+
+IPOS_SCOPE = "ipos"
+# POST actions that change the shared IPO list
+IPO_ACTIONS = {"addIpo"}
+# GET actions whose result only depends on the IPO list
+IPO_ONLY_ACTIONS = {"listIpos"}
+# GET actions that are never served from a client's ETag cache
+UNCACHED_ACTIONS = {"changesSince"}
+
+def user_scope(user_id: int) -> str:
+    """Version scope of one user's applicants and applications"""
+    return f"user:{user_id}"
+
+def bump_data_versions(db: Session, user_id: int, ipos: bool = False) -> None:
+    """Increment the user's version (and the IPO version) in a transaction of its own"""
+    # The action has committed or failed; either way start clean
+    db.rollback()
+    stmt = dialect_insert(db, DataVersion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scope"],
+        set_={"version": DataVersion.version + 1}
+    )
+    scopes = [IPOS_SCOPE, user_scope(user_id)] if ipos else [user_scope(user_id)]
+    for scope in scopes:
+        db.execute(stmt, {"scope": scope, "version": 1})
+    db.commit()
+
+def read_versions(db: Session, scopes: list[str]) -> dict[str, int]:
+    """Current version of each scope (0 if never written)"""
+    stored = dict(db.execute(
+        select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(scopes))
+    ).all())
+    return {scope: stored.get(scope, 0) for scope in scopes}
+
+def etag_for(db: Session, user_id: int, action: str | None, variant: str | None = None) -> str:
+    """ETag of a GET /api action for user_id; variant tells apart other encodings of the same data"""
+    suffix = f".{variant}" if variant else ""
+    if action in IPO_ONLY_ACTIONS:
+        return f'"ipos.{read_versions(db, [IPOS_SCOPE])[IPOS_SCOPE]}{suffix}"'
+    versions = read_versions(db, [user_scope(user_id), IPOS_SCOPE])
+    return f'"u{user_id}.{versions[user_scope(user_id)]}.{versions[IPOS_SCOPE]}{suffix}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header value covers etag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" matches "x"
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 for a matching If-None-Match"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
@@ -1,6 +1,73 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+import time
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a true/false environment variable"""
+    return os.environ.get(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+# Connection pool (QueuePool for both PostgreSQL and file-based SQLite)
+POOL_SETTINGS = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+    # Neon and most proxies drop idle connections after ~5 minutes
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "280")),
+    "pool_pre_ping": env_bool("DB_POOL_PRE_PING", True),
+}
+
+# SQLite pragmas applied to every new connection. WAL lets readers run while
+# a write is in progress; synchronous=NORMAL is durable across app crashes in
+# WAL mode (only an OS crash can lose the last commits).
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    # Negative cache_size is in KiB
+    "cache_size": -int(os.environ.get("SQLITE_CACHE_SIZE_KB", "20000")),
+}
+
+def create_configured_engine(url: str, pool: dict | None = None, pragmas: dict | None = None):
+    """Create an engine with the pool settings and, for SQLite, the connect pragmas"""
+    pool = POOL_SETTINGS if pool is None else pool
+    if not url.startswith("sqlite"):
+        return create_engine(url, **pool)
+
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    # sqlite3's own lock wait, in seconds; the busy_timeout pragma overrides it per connection
+    timeout = pragmas.get("busy_timeout", 5000) / 1000
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": timeout},
+        **pool
+    )
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+def describe_engine(engine) -> str:
+    """One-line summary of the effective pool settings and SQLite pragmas"""
+    parts = [f"{name}={value}" for name, value in POOL_SETTINGS.items()]
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size"):
+                parts.append(f"{name}={conn.exec_driver_sql(f'PRAGMA {name}').scalar()}")
+    return ", ".join(parts)
+
+def ping_database(engine) -> float:
+    """Milliseconds to check out a connection and run SELECT 1"""
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+    return (time.perf_counter() - started) * 1000
 
 # Get DATABASE_URL from environment or use SQLite for local development
 DATABASE_URL = os.environ.get("DATABASE_URL", "")
@@ -13,21 +80,22 @@ if DATABASE_URL and DATABASE_URL.startswith(("postgresql", "postgres")):
         # PostgreSQL (Neon) - fix for SQLAlchemy compatibility
         if DATABASE_URL.startswith("postgres://"):
             DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-        engine = create_engine(DATABASE_URL)
+        engine = create_configured_engine(DATABASE_URL)
         print("Using PostgreSQL database")
     except ImportError:
         # psycopg2 not available, fall back to SQLite
         print("PostgreSQL not available, falling back to SQLite")
         DATABASE_URL = None
 
-if not DATABASE_URL or not DATABASE_URL.startswith("postgresql"):
+if DATABASE_URL and DATABASE_URL.startswith("sqlite"):
+    # Explicit SQLite file (benchmarks, scratch copies)
+    engine = create_configured_engine(DATABASE_URL)
+    print(f"Using SQLite database: {make_url(DATABASE_URL).database}")
+elif not DATABASE_URL or not DATABASE_URL.startswith("postgresql"):
     # Local development - SQLite
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'ipo_data.db')}"
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
+    engine = create_configured_engine(DATABASE_URL)
     print(f"Using SQLite database: {os.path.join(BASE_DIR, 'ipo_data.db')}")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
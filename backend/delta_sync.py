@@ -0,0 +1,89 @@
+"""
+Incremental sync for clients that keep the full application list.
+
+A sync version is a server timestamp in microseconds. Every GET /api reply
+carries the current one in X-Data-Version; `action=changesSince&version=V`
+returns the rows created or changed after V (by updated_at) and the ids
+deleted after V (from tombstones), plus a new version for the next call.
+
+Because updated_at is set before a transaction commits, a slow writer can
+commit a row stamped slightly before a version a reader already got. Each
+sync therefore looks back SYNC_OVERLAP_SECONDS further than V; merging is
+by id, so rows seen twice are harmless. Tombstones are kept for
+TOMBSTONE_RETENTION_DAYS; a client whose version is older than that is told
+to reload in full.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, or_
+from sqlalchemy.orm import Session
+
+from models import Applicant, IpoApplication, IpoName, Tombstone
+from queries import select_applications
+
+SYNC_OVERLAP_SECONDS = float(os.environ.get("SYNC_OVERLAP_SECONDS", "30"))
+TOMBSTONE_RETENTION_DAYS = float(os.environ.get("TOMBSTONE_RETENTION_DAYS", "30"))
+
+def current_version() -> int:
+    """Sync version for 'now'"""
+    return time.time_ns() // 1000
+
+def version_to_datetime(version: int) -> datetime:
+    """Naive UTC datetime of a sync version, comparable with updated_at"""
+    return datetime(1970, 1, 1) + timedelta(microseconds=version)
+
+def record_tombstones(db: Session, user_id: int, entity: str, ids: list[str]) -> None:
+    """Remember deleted ids in the caller's transaction (caller commits)"""
+    if ids:
+        now = datetime.utcnow()
+        db.execute(Tombstone.__table__.insert(), [
+            {"entity": entity, "entity_id": entity_id, "created_by": user_id, "deleted_at": now}
+            for entity_id in ids
+        ])
+
+def purge_tombstones(retention_days: float = TOMBSTONE_RETENTION_DAYS) -> int:
+    """Delete tombstones past the retention window; returns rows deleted"""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        result = db.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff))
+        db.commit()
+        return result.rowcount
+    finally:
+        db.close()
+
+def needs_full_reload(version: int) -> bool:
+    """Whether tombstones from after version may already be purged"""
+    oldest_kept = datetime.utcnow() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    return version_to_datetime(version) < oldest_kept
+
+def changed_since(db: Session, user_id: int, version: int) -> dict:
+    """Application rows, applicants and IPOs changed after version, and deleted ids by entity"""
+    since = version_to_datetime(version) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+
+    # An applicant or IPO change alters the joined fields of its application rows
+    applications = db.execute(
+        select_applications(user_id).where(or_(
+            IpoApplication.updated_at > since,
+            Applicant.updated_at > since,
+            IpoName.updated_at > since,
+        ))
+    ).all()
+    applicants = db.query(Applicant).filter(
+        Applicant.created_by == user_id, Applicant.updated_at > since
+    ).all()
+    ipos = db.query(IpoName).filter(IpoName.updated_at > since).all()
+
+    deleted = {"applications": [], "applicants": []}
+    for entity, entity_id in db.execute(
+        select(Tombstone.entity, Tombstone.entity_id)
+        .where(Tombstone.created_by == user_id, Tombstone.deleted_at > since)
+    ):
+        deleted[f"{entity}s"].append(entity_id)
+
+    return {"applications": applications, "applicants": applicants, "ipos": ipos, "deleted": deleted}
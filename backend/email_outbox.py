@@ -0,0 +1,321 @@
+"""
+Persistent email outbox and the background worker that delivers it.
+
+Endpoints only insert a row into email_outbox (enqueue_email) and return.
+The worker polls for due rows, claims each one by pushing its next_attempt_at
+forward by a lease (a conditional UPDATE, so several processes can share the
+table), and delivers up to EMAIL_CONCURRENCY messages at once through a sink:
+
+- resend: Resend HTTP API through one pooled httpx.AsyncClient (default)
+- stdout: print the message, for local development
+- file:   append JSON lines to EMAIL_OUTBOX_FILE, for tests and offline use
+
+Failures are retried with exponential backoff; 4xx responses other than 429
+and the last allowed attempt mark the row failed. A crashed worker's claims
+expire with the lease and are picked up again.
+
+Bodies carry OTPs and temporary passwords, so html_body is blanked as soon
+as a row is sent or fails for good, and purge_finished_emails (run by the
+OTP sweeper) deletes sent and failed rows after EMAIL_RETENTION_DAYS.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, delete, event
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import EmailOutbox
+
+EMAIL_SINK = os.environ.get("EMAIL_SINK", "resend")
+EMAIL_OUTBOX_FILE = os.environ.get("EMAIL_OUTBOX_FILE", "email_outbox.jsonl")
+EMAIL_CONCURRENCY = int(os.environ.get("EMAIL_CONCURRENCY", "4"))
+EMAIL_POLL_INTERVAL = float(os.environ.get("EMAIL_POLL_INTERVAL", "5"))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "8"))
+EMAIL_BACKOFF_BASE = float(os.environ.get("EMAIL_BACKOFF_BASE", "5"))
+EMAIL_BACKOFF_MAX = float(os.environ.get("EMAIL_BACKOFF_MAX", "900"))
+EMAIL_TIMEOUT = float(os.environ.get("EMAIL_TIMEOUT", "10"))
+EMAIL_RETENTION_DAYS = float(os.environ.get("EMAIL_RETENTION_DAYS", "7"))
+
+# A claimed row is retried by anyone once this passes without a result
+CLAIM_LEASE = timedelta(seconds=EMAIL_TIMEOUT * 3 + 30)
+BATCH_SIZE = 50
+
+class PermanentEmailError(Exception):
+    """Delivery failed in a way retrying cannot fix"""
+
+# ==================== Enqueue ====================
+
+def enqueue_email(db: Session, to_email: str, subject: str, html_body: str) -> None:
+    """Queue an email in the caller's transaction (caller commits) and wake the worker"""
+    db.add(EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    ))
+    event.listen(db, "after_commit", lambda session: worker.notify(), once=True)
+
+# ==================== Sinks ====================
+
+class ResendSink:
+    """Deliver through the Resend HTTP API"""
+
+    def __init__(self, api_key: str, sender: str):
+        import httpx
+        self.api_key = api_key
+        self.sender = sender
+        self.client = httpx.AsyncClient(
+            base_url="https://api.resend.com",
+            timeout=EMAIL_TIMEOUT,
+            limits=httpx.Limits(max_connections=EMAIL_CONCURRENCY,
+                                max_keepalive_connections=EMAIL_CONCURRENCY),
+            headers={"Authorization": f"Bearer {api_key}"}
+        )
+
+    async def send(self, message: dict) -> None:
+        """POST one message; raises on failure"""
+        response = await self.client.post("/emails", json={
+            "from": f"IPO Allotment <{self.sender}>",
+            "to": [message["to"]],
+            "subject": message["subject"],
+            "html": message["html"]
+        })
+        if response.status_code >= 400:
+            error = f"Email API error {response.status_code}: {response.text[:500]}"
+            if response.status_code < 500 and response.status_code != 429:
+                raise PermanentEmailError(error)
+            raise RuntimeError(error)
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        await self.client.aclose()
+
+class StdoutSink:
+    """Print messages instead of sending them"""
+
+    async def send(self, message: dict) -> None:
+        """Print one message"""
+        print(f"[EMAIL] to={message['to']} subject={message['subject']!r}")
+        sys.stdout.flush()
+
+    async def close(self) -> None:
+        """Nothing to release"""
+
+class FileSink:
+    """Append messages as JSON lines to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def send(self, message: dict) -> None:
+        """Append one message"""
+        line = json.dumps(message, ensure_ascii=False) + "\n"
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str) -> None:
+        """Blocking append, run off the event loop"""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    async def close(self) -> None:
+        """Nothing to release"""
+
+def create_sink(name: str = EMAIL_SINK):
+    """Build the sink selected by EMAIL_SINK"""
+    if name == "stdout":
+        return StdoutSink()
+    if name == "file":
+        return FileSink(EMAIL_OUTBOX_FILE)
+    if name == "resend":
+        from email_service import RESEND_API_KEY, SENDER_EMAIL
+        return ResendSink(RESEND_API_KEY, SENDER_EMAIL)
+    raise ValueError(f"Unknown EMAIL_SINK '{name}' (expected resend, stdout or file)")
+
+# ==================== Worker ====================
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds before the next try after `attempts` failures, with jitter"""
+    delay = min(EMAIL_BACKOFF_BASE * 2 ** (attempts - 1), EMAIL_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+def claim_due(limit: int = BATCH_SIZE) -> list[dict]:
+    """Claim up to limit due messages by leasing them; returns the claimed messages"""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        due = db.execute(
+            select(EmailOutbox.id, EmailOutbox.next_attempt_at, EmailOutbox.to_email,
+                   EmailOutbox.subject, EmailOutbox.html_body, EmailOutbox.attempts)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+        ).all()
+
+        claimed = []
+        for row in due:
+            # Only one worker can move next_attempt_at away from the value it read
+            result = db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == row.id, EmailOutbox.status == "pending",
+                       EmailOutbox.next_attempt_at == row.next_attempt_at)
+                .values(next_attempt_at=now + CLAIM_LEASE)
+            )
+            if result.rowcount == 1:
+                claimed.append({
+                    "id": row.id, "to": row.to_email, "subject": row.subject,
+                    "html": row.html_body, "attempts": row.attempts
+                })
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+def record_result(message_id: int, attempts: int, error: str | None, permanent: bool = False) -> str:
+    """Store the outcome of one delivery attempt; returns the new status"""
+    now = datetime.utcnow()
+    if error is None:
+        values = {"status": "sent", "attempts": attempts, "sent_at": now,
+                  "last_error": None, "html_body": ""}
+    elif permanent or attempts >= EMAIL_MAX_ATTEMPTS:
+        values = {"status": "failed", "attempts": attempts, "last_error": error, "html_body": ""}
+    else:
+        values = {"status": "pending", "attempts": attempts, "last_error": error,
+                  "next_attempt_at": now + timedelta(seconds=backoff_delay(attempts))}
+
+    db = SessionLocal()
+    try:
+        db.execute(update(EmailOutbox).where(EmailOutbox.id == message_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+    return values["status"]
+
+def purge_finished_emails(batch_size: int = 1000) -> int:
+    """Delete sent and failed rows older than EMAIL_RETENTION_DAYS in batches; returns rows deleted"""
+    cutoff = datetime.utcnow() - timedelta(days=EMAIL_RETENTION_DAYS)
+    purged = 0
+    db = SessionLocal()
+    try:
+        # Rows that failed before bodies were blanked on failure
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.status == "failed", EmailOutbox.html_body != "")
+            .values(html_body="")
+        )
+        db.commit()
+        while True:
+            batch = (
+                select(EmailOutbox.id)
+                .where(EmailOutbox.status.in_(("sent", "failed")), EmailOutbox.created_at < cutoff)
+                .limit(batch_size)
+            )
+            result = db.execute(delete(EmailOutbox).where(EmailOutbox.id.in_(batch.scalar_subquery())))
+            db.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                return purged
+    finally:
+        db.close()
+
+class EmailWorker:
+    """Background task that drains the outbox"""
+
+    def __init__(self):
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.sink = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    async def start(self, sink=None) -> None:
+        """Start draining on the running event loop"""
+        if self._task is not None:
+            return
+        self.sink = sink or create_sink()
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(EMAIL_CONCURRENCY)
+        self._task = asyncio.create_task(self._run())
+        print(f"[INFO] Email worker started (sink={type(self.sink).__name__}, "
+              f"concurrency={EMAIL_CONCURRENCY})")
+
+    async def stop(self) -> None:
+        """Stop the loop and close the sink; unsent rows stay queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.sink.close()
+
+    def notify(self) -> None:
+        """Wake the worker now instead of at the next poll (safe from any thread)"""
+        if self._loop is not None and self._wake is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def drain_once(self) -> int:
+        """Deliver every currently due message; returns how many were attempted"""
+        attempted = 0
+        while True:
+            batch = await asyncio.to_thread(claim_due)
+            if not batch:
+                return attempted
+            attempted += len(batch)
+            await asyncio.gather(*(self._deliver(m) for m in batch))
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.drain_once()
+            except Exception as e:
+                print(f"[ERROR] Email worker: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=EMAIL_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, message: dict) -> None:
+        async with self._slots:
+            attempts = message["attempts"] + 1
+            try:
+                await self.sink.send(message)
+                error, permanent = None, False
+            except PermanentEmailError as e:
+                error, permanent = str(e), True
+            except Exception as e:
+                error, permanent = f"{type(e).__name__}: {e}", False
+
+        status = await asyncio.to_thread(record_result, message["id"], attempts, error, permanent)
+        if status == "sent":
+            self.sent += 1
+        elif status == "failed":
+            self.failed += 1
+            print(f"[ERROR] Email {message['id']} to {message['to']} failed: {error}")
+        else:
+            self.retried += 1
+
+    def stats(self) -> dict:
+        """Delivery counters for this process"""
+        return {
+            "running": self._task is not None,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+worker = EmailWorker()
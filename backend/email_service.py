@@ -2,9 +2,8 @@ import random
 import string
 from datetime import datetime, timedelta
 import os
-import urllib.request
-import urllib.error
-import json
+
+from email_outbox import enqueue_email
 
 # Resend API configuration (free 100 emails/day)
 # Get your API key from https://resend.com
@@ -68,46 +67,15 @@ def verify_otp(db, email: str, otp: str, purpose: str = "verification") -> bool:
     db.commit()
     return True
 
-def send_email(to_email: str, subject: str, html_body: str) -> tuple[bool, str]:
-    """Send email using Resend API (HTTP-based, works on Render free tier)"""
-    try:
-        url = "https://api.resend.com/emails"
-
-        data = {
-            "from": f"IPO Allotment <{SENDER_EMAIL}>",
-            "to": [to_email],
-            "subject": subject,
-            "html": html_body
-        }
-
-        headers = {
-            "Authorization": f"Bearer {RESEND_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        req = urllib.request.Request(
-            url,
-            data=json.dumps(data).encode('utf-8'),
-            headers=headers,
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            return True, "Email sent successfully"
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        return False, f"Email API error: {error_body}"
-    except urllib.error.URLError as e:
-        return False, f"Network error: {str(e)}"
-    except Exception as e:
-        return False, f"Failed to send email: {str(e)}"
+def send_email(db, to_email: str, subject: str, html_body: str) -> tuple[bool, str]:
+    """Queue an email for the background worker (email_outbox.py) and commit"""
+    enqueue_email(db, to_email, subject, html_body)
+    db.commit()
+    return True, "Email queued"
 
 def send_verification_otp(db, email: str, username: str) -> tuple[bool, str]:
     """Send verification OTP for registration"""
     otp = generate_otp()
-    store_otp(db, email, otp, purpose="registration")
 
     html_body = f"""
     <html>
@@ -128,13 +96,14 @@ def send_verification_otp(db, email: str, username: str) -> tuple[bool, str]:
     </html>
     """
 
-    success, message = send_email(email, "IPO Allotment - Verify Your Email", html_body)
-    return success, message if not success else otp
+    # store_otp commits the OTP and the queued email together
+    enqueue_email(db, email, "IPO Allotment - Verify Your Email", html_body)
+    store_otp(db, email, otp, purpose="registration")
+    return True, otp
 
 def send_password_recovery_otp(db, email: str) -> tuple[bool, str]:
     """Send OTP for password recovery"""
     otp = generate_otp()
-    store_otp(db, email, otp, purpose="recovery")
 
     html_body = f"""
     <html>
@@ -155,9 +124,12 @@ def send_password_recovery_otp(db, email: str) -> tuple[bool, str]:
     </html>
     """
 
-    return send_email(email, "IPO Allotment - Password Recovery OTP", html_body)
+    # store_otp commits the OTP and the queued email together
+    enqueue_email(db, email, "IPO Allotment - Password Recovery OTP", html_body)
+    store_otp(db, email, otp, purpose="recovery")
+    return True, "Email queued"
 
-def send_new_password(email: str, username: str, new_password: str) -> tuple[bool, str]:
+def send_new_password(db, email: str, username: str, new_password: str) -> tuple[bool, str]:
     """Send new password after recovery verification"""
     html_body = f"""
     <html>
@@ -179,4 +151,4 @@ def send_new_password(email: str, username: str, new_password: str) -> tuple[boo
     </html>
     """
 
-    return send_email(email, "IPO Allotment - Your New Password", html_body)
+    return send_email(db, email, "IPO Allotment - Your New Password", html_body)
@@ -0,0 +1,156 @@
+"""
+Streaming CSV and XLSX encoders for application exports.
+
+Both take the rows of a select_applications() query as they arrive from a
+server-side cursor and yield the file in chunks, so memory stays constant and
+the download starts with the first rows. XLSX is written as a minimal
+workbook (one sheet, inline strings) through zipfile on an unseekable sink.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from queries import application_row_to_dict
+
+EXPORT_HEADERS = [
+    "Name", "PAN", "Phone", "IPO Name", "Amount",
+    "Allotment Status", "Money Sent", "Money Received", "Created At"
+]
+
+def export_row(row) -> list:
+    """Cells for one exported application, matching EXPORT_HEADERS"""
+    app = application_row_to_dict(row)
+    return [
+        app["userName"],
+        app["userPan"],
+        app["userPhone"],
+        app["ipoName"],
+        app["ipoAmount"],
+        app["allotmentStatus"],
+        "yes" if app["moneySent"] else "no",
+        "yes" if app["moneyReceived"] else "no",
+        app["createdAt"]
+    ]
+
+def iter_csv(rows: Iterable, chunk_size: int = 500) -> Iterator[str]:
+    """Encode rows as CSV, yielding one chunk per chunk_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    count = 0
+    for row in rows:
+        writer.writerow(export_row(row))
+        count += 1
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+# ==================== XLSX ====================
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Applications" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file that collects bytes until drained"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        """Tell zipfile this stream accepts writes"""
+        return True
+
+    def write(self, data) -> int:
+        """Buffer a block written by zipfile"""
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def _xlsx_cell(value) -> str:
+    """One inline cell; numbers stay numeric"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_INVALID_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _xlsx_row(values: list) -> str:
+    """One sheet row"""
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+def iter_xlsx(rows: Iterable, chunk_size: int = 500) -> Iterator[bytes]:
+    """Encode rows as an XLSX workbook, yielding compressed bytes as they are produced"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            parts = [_SHEET_START, _xlsx_row(EXPORT_HEADERS)]
+            for row in rows:
+                parts.append(_xlsx_row(export_row(row)))
+                if len(parts) >= chunk_size:
+                    sheet.write("".join(parts).encode("utf-8"))
+                    parts = []
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            parts.append(_SHEET_END)
+            sheet.write("".join(parts).encode("utf-8"))
+    yield sink.drain()
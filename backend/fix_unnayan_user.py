@@ -1,14 +1,21 @@
 """
 Fix Unnayan User - Ensure Unnayan user exists with password 1234
 Run this script to create or reset Unnayan's account
+
+Pending migrations (migrations.py) are applied first, so the account ends up
+owning any data from before user isolation.
 """
 
-from database import get_db
+from database import get_db, engine, Base
 from models import User
 from auth import get_password_hash
+from migrations import run_migrations, set_meta
+from startup import UNNAYAN_HASH_KEY
 
 def fix_unnayan_user():
     """Create or reset Unnayan user with password 1234"""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     db = next(get_db())
 
     try:
@@ -31,6 +38,8 @@ def fix_unnayan_user():
             unnayan.hashed_password = get_password_hash("1234")
             unnayan.is_verified = True
             unnayan.token = None  # Clear any old tokens
+            # Startup leaves a hash it recorded alone
+            set_meta(db, UNNAYAN_HASH_KEY, unnayan.hashed_password)
             db.commit()
             print("[OK] Password reset successfully!")
 
@@ -44,6 +53,7 @@ def fix_unnayan_user():
                 is_verified=True
             )
             db.add(new_user)
+            set_meta(db, UNNAYAN_HASH_KEY, new_user.hashed_password)
             db.commit()
             db.refresh(new_user)
 
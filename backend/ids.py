@@ -0,0 +1,89 @@
+"""
+Time-ordered, collision-free ids for applicants and applications.
+
+Ids are ULIDs (48-bit millisecond timestamp + 80 random bits, Crockford base32)
+behind the existing "user-"/"app-" prefixes, so they sort by creation time and
+coexist with the older millisecond ids. Within one millisecond the random part
+is incremented instead of redrawn, which keeps ids strictly increasing per
+process without sleeping.
+
+Run this module to benchmark throughput:
+    python ids.py
+"""
+
+import os
+import threading
+import time
+
+# Crockford base32 (no I, L, O, U)
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+def _encode(value: int, length: int) -> str:
+    """Encode an integer as fixed-width Crockford base32"""
+    chars = []
+    for _ in range(length):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def new_ulid() -> str:
+    """Generate a 26-character ULID, strictly increasing within this process"""
+    global _last_ms, _last_random
+    with _lock:
+        now_ms = int(time.time() * 1000)
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        else:
+            # Same millisecond (or the clock stepped back): keep the last
+            # timestamp and bump the random part so ordering still holds
+            _last_random += 1
+            if _last_random > _RANDOM_MAX:
+                _last_ms += 1
+                _last_random = int.from_bytes(os.urandom(10), "big")
+        return _encode(_last_ms, 10) + _encode(_last_random, 16)
+
+def new_id(prefix: str) -> str:
+    """Generate a prefixed id, e.g. new_id("app") -> "app-01HV3K..." """
+    return f"{prefix}-{new_ulid()}"
+
+def new_ids(prefix: str, count: int) -> list[str]:
+    """Generate count prefixed ids in increasing order"""
+    return [new_id(prefix) for _ in range(count)]
+
+def run_benchmark(count: int = 200_000, threads: int = 4) -> None:
+    """Print single- and multi-threaded id throughput and check uniqueness/order"""
+    start = time.perf_counter()
+    ids = new_ids("app", count)
+    elapsed = time.perf_counter() - start
+    print(f"[BENCH] single thread: {count:,} ids in {elapsed:.3f}s "
+          f"({count / elapsed:,.0f} ids/s)")
+    print(f"   - unique: {len(set(ids)) == count}, sorted: {ids == sorted(ids)}")
+
+    results: list[list[str]] = [[] for _ in range(threads)]
+    per_thread = count // threads
+
+    def worker(index: int) -> None:
+        results[index] = new_ids("app", per_thread)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    merged = [i for chunk in results for i in chunk]
+    print(f"[BENCH] {threads} threads: {len(merged):,} ids in {elapsed:.3f}s "
+          f"({len(merged) / elapsed:,.0f} ids/s)")
+    print(f"   - unique: {len(set(merged)) == len(merged)}, "
+          f"each thread sorted: {all(chunk == sorted(chunk) for chunk in results)}")
+
+if __name__ == "__main__":
+    run_benchmark()
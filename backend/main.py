@@ -1,33 +1,67 @@
-from fastapi import FastAPI, Query, Body, Depends, HTTPException
+from fastapi import FastAPI, Query, Body, Header, Depends, HTTPException, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
-import time
 
-from database import engine, get_db, Base
+from database import engine, get_db, SessionLocal, describe_engine, ping_database
 from models import User, IpoName, Applicant, IpoApplication, OtpStorage
 from auth import (
-    get_password_hash, authenticate_user, generate_token,
-    get_current_user, get_optional_user
+    get_password_hash_async, get_password_hash_pooled, authenticate_user_async, store_login,
+    HashingBusyError, generate_token,
+    get_current_user, get_optional_user, CurrentUser,
+    invalidate_user_tokens, token_cache
+)
+from ids import new_id
+from queries import (
+    select_applications, apply_application_filters, order_applications, paginate_applications,
+    encode_cursor, insert_ignoring_conflicts,
+    APPLICATION_COLUMNS, SORT_COLUMNS, MAX_PAGE_SIZE
+)
+from serialization import (
+    FastJSONResponse, application_dicts, iter_applications_json, columnar_applications
+)
+from compression import CompressionMiddleware
+from metrics import (
+    MetricsMiddleware, instrument_engine, record_action, render_metrics, METRICS_TOKEN
+)
+from csv_import import import_applications_csv
+from exporters import iter_csv, iter_xlsx
+from allotment import ingest_allotment_file
+from batch import (
+    parse_patch, select_target_ids, update_applications, delete_applications, read_applications
+)
+from counters import apply_deltas, add_state, tally_rows
+from summary import get_summary, invalidate_summary, summary_cache
+from data_versions import (
+    bump_data_versions, etag_for, etag_matches, not_modified, IPO_ACTIONS, UNCACHED_ACTIONS
+)
+from delta_sync import current_version, changed_since, needs_full_reload, record_tombstones
+from email_outbox import worker as email_worker
+from otp_sweeper import otp_sweeper
+from startup import prepare_database, startup_timer
+from ratelimit import (
+    enforce_otp_limits, otp_limit_stats, otp_send_limiter, otp_verify_limiter
 )
 from email_service import (
     send_verification_otp, send_password_recovery_otp,
     send_new_password, verify_otp, generate_temp_password
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="IPO Allotment API",
     description="Backend API for IPO Allotment tracking",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware - allow frontend to connect
 import os
+import secrets
 CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "http://localhost:5173,http://localhost:5174,http://localhost:5175,http://localhost:3000,http://localhost:9000,https://ipo-allotment-frontend-02gb.onrender.com").split(",")
 app.add_middleware(
     CORSMiddleware,
@@ -35,7 +69,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read the tag it sends back as If-None-Match and its sync version
+    expose_headers=["ETag", "X-Data-Version"],
 )
+# gzip/brotli for bodies over COMPRESSION_MIN_SIZE; added after CORS so it wraps it
+app.add_middleware(CompressionMiddleware)
+# Outermost, so latency and response size cover everything else (see metrics.py)
+app.add_middleware(MetricsMiddleware)
+
+# Engines whose statements are counted per request and whose pools /metrics reports
+METRIC_ENGINES = {"sync": engine}
+for metric_engine in METRIC_ENGINES.values():
+    instrument_engine(metric_engine)
 
 # Pydantic models for request/response
 class LoginRequest(BaseModel):
@@ -79,94 +124,71 @@ class GenericResponse(BaseModel):
 # Temporary storage for pending registrations (in production use Redis)
 pending_registrations: dict[str, dict] = {}
 
-# Initialize default users on startup
 @app.on_event("startup")
-def create_default_users():
-    db = next(get_db())
-    try:
-        # Create/update admin user
-        admin = db.query(User).filter(User.username == "admin").first()
-        if not admin:
-            admin = User(
-                username="admin",
-                hashed_password=get_password_hash("admin123"),
-                is_verified=True
-            )
-            db.add(admin)
-            print("Default admin user created (username: admin, password: admin123)")
-
-        # Create/update Unnayan user - ALWAYS ensure this user exists with correct password
-        unnayan = db.query(User).filter(User.username == "Unnayan").first()
-        if not unnayan:
-            unnayan = User(
-                username="Unnayan",
-                hashed_password=get_password_hash("1234"),
-                is_verified=True
-            )
-            db.add(unnayan)
-            db.commit()
-            db.refresh(unnayan)
-            print("Unnayan user created (username: Unnayan, password: 1234)")
-        else:
-            # Reset password to ensure it's always 1234
-            unnayan.hashed_password = get_password_hash("1234")
-            unnayan.is_verified = True
-            print("Unnayan user password reset to 1234")
-
-        # CRITICAL: Migrate all Unnayan's old data to current user ID
-        # This ensures all applicants and applications created by Unnayan are linked to him
-        print(f"Migrating Unnayan's data to user ID: {unnayan.id}")
-
-        # Get all user IDs that might be old Unnayan accounts
-        old_unnayan_ids = [user.id for user in db.query(User).filter(User.username == "Unnayan").all()]
-
-        # Update applicants - link NULL or old Unnayan IDs to current Unnayan
-        applicants_updated = db.query(Applicant).filter(
-            (Applicant.created_by == None) | (Applicant.created_by.in_(old_unnayan_ids))
-        ).update({"created_by": unnayan.id}, synchronize_session=False)
-
-        # Update applications - link NULL or old Unnayan IDs to current Unnayan
-        applications_updated = db.query(IpoApplication).filter(
-            (IpoApplication.created_by == None) | (IpoApplication.created_by.in_(old_unnayan_ids))
-        ).update({"created_by": unnayan.id}, synchronize_session=False)
-
-        if applicants_updated > 0 or applications_updated > 0:
-            print(f"Migrated {applicants_updated} applicants and {applications_updated} applications to Unnayan")
+def log_engine_settings():
+    print(f"[INFO] Database engine ({engine.dialect.name}): {describe_engine(engine)}")
 
-        db.commit()
-    finally:
-        db.close()
+# Schema, default users and one-time data fixes (see startup.py)
+@app.on_event("startup")
+def initialize_database():
+    prepare_database(engine, SessionLocal)
+
+# Background tasks: email delivery (endpoints only enqueue) and expired OTP cleanup
+@app.on_event("startup")
+async def start_background_tasks():
+    await email_worker.start()
+    await otp_sweeper.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await email_worker.stop()
+    await otp_sweeper.stop()
 
 # Auth routes
+def hashing_busy() -> HTTPException:
+    """503 for when the bcrypt pool is saturated"""
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please try again",
+        headers={"Retry-After": "1"},
+    )
+
 @app.post("/auth/login", response_model=LoginResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: Session = Depends(get_db)):
     """Login and get authentication token"""
-    user = authenticate_user(db, request.username, request.password)
-    if not user:
+    try:
+        result = await authenticate_user_async(db, request.username, request.password)
+    except HashingBusyError:
+        raise hashing_busy()
+    if not result:
         return LoginResponse(success=False, error="Invalid username or password")
 
+    user, upgraded_hash = result
     token = generate_token()
-    user.token = token
-    db.commit()
+    await run_in_threadpool(store_login, db, user.id, token, upgraded_hash)
+    invalidate_user_tokens(user.id)
 
     return LoginResponse(success=True, token=token, username=user.username)
 
 @app.post("/auth/logout")
-def logout(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def logout(current_user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
     """Logout and invalidate token"""
-    current_user.token = None
+    db.query(User).filter(User.id == current_user.id).update({"token": None})
     db.commit()
+    invalidate_user_tokens(current_user.id)
     return {"success": True}
 
 @app.get("/auth/verify")
-def verify_token(current_user: User = Depends(get_current_user)):
+def verify_token(current_user: CurrentUser = Depends(get_current_user)):
     """Verify if token is valid"""
     return {"success": True, "username": current_user.username}
 
 # Registration endpoints
 @app.post("/auth/register/send-otp", response_model=GenericResponse)
-def register_send_otp(request: SendOtpRequest, db: Session = Depends(get_db)):
+def register_send_otp(request: SendOtpRequest, http_request: Request, db: Session = Depends(get_db)):
     """Send OTP for email verification during registration"""
+    enforce_otp_limits(http_request, request.email, otp_send_limiter)
+
     # Check if username already exists
     existing_user = db.query(User).filter(User.username == request.username).first()
     if existing_user:
@@ -185,8 +207,16 @@ def register_send_otp(request: SendOtpRequest, db: Session = Depends(get_db)):
         return GenericResponse(success=False, error=result)
 
 @app.post("/auth/register/verify-otp", response_model=GenericResponse)
-def register_verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)):
+def register_verify_otp(request: VerifyOtpRequest, http_request: Request, db: Session = Depends(get_db)):
     """Verify OTP and complete registration"""
+    enforce_otp_limits(http_request, request.email, otp_verify_limiter)
+
+    # Hash first: a busy hashing pool must not use up the OTP
+    try:
+        hashed_password = get_password_hash_pooled(request.password)
+    except HashingBusyError:
+        raise hashing_busy()
+
     # Verify OTP
     if not verify_otp(db, request.email, request.otp, purpose="registration"):
         return GenericResponse(success=False, error="Invalid or expired OTP")
@@ -204,7 +234,7 @@ def register_verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)
     new_user = User(
         username=request.username,
         email=request.email,
-        hashed_password=get_password_hash(request.password),
+        hashed_password=hashed_password,
         is_verified=True
     )
     db.add(new_user)
@@ -214,8 +244,10 @@ def register_verify_otp(request: VerifyOtpRequest, db: Session = Depends(get_db)
 
 # Password recovery endpoints
 @app.post("/auth/forgot-password/send-otp", response_model=GenericResponse)
-def forgot_password_send_otp(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password_send_otp(request: ForgotPasswordRequest, http_request: Request, db: Session = Depends(get_db)):
     """Send OTP for password recovery"""
+    enforce_otp_limits(http_request, request.email, otp_send_limiter)
+
     # Find user by email
     user = db.query(User).filter(User.email == request.email).first()
     if not user:
@@ -230,28 +262,35 @@ def forgot_password_send_otp(request: ForgotPasswordRequest, db: Session = Depen
         return GenericResponse(success=False, error=result)
 
 @app.post("/auth/forgot-password/verify-otp", response_model=GenericResponse)
-def forgot_password_verify_otp(request: ResetPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password_verify_otp(request: ResetPasswordRequest, http_request: Request, db: Session = Depends(get_db)):
     """Verify OTP and send new password"""
+    enforce_otp_limits(http_request, request.email, otp_verify_limiter)
+
     # Find user by email
     user = db.query(User).filter(User.email == request.email).first()
     if not user:
         return GenericResponse(success=False, error="Email not found")
 
+    # Generate and hash the new password first: a busy hashing pool must not use up the OTP
+    new_password = generate_temp_password()
+    try:
+        hashed_password = get_password_hash_pooled(new_password)
+    except HashingBusyError:
+        raise hashing_busy()
+
     # Verify OTP
     if not verify_otp(db, request.email, request.otp, purpose="recovery"):
         return GenericResponse(success=False, error="Invalid or expired OTP")
 
-    # Generate new password
-    new_password = generate_temp_password()
-
     # Update user password
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = hashed_password
     db.commit()
+    invalidate_user_tokens(user.id)
 
     # Send new password via email
-    success, result = send_new_password(request.email, user.username, new_password)
+    success, result = send_new_password(db, request.email, user.username, new_password)
     if success:
-        return GenericResponse(success=True, message="New password has been sent to your email")
+        return GenericResponse(success=True, message="New password will be sent to your email")
     else:
         return GenericResponse(success=False, error="Password reset successful but failed to send email. Contact support.")
 
@@ -289,39 +328,180 @@ def application_to_dict(app: IpoApplication, applicant: Applicant, ipo: IpoName)
         "createdAt": app.created_at.isoformat() if app.created_at else datetime.utcnow().isoformat()
     }
 
-# GET endpoints
+def stream_query(stmt, encode):
+    """Run a select on its own session and stream the encoded rows as they arrive"""
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=500))
+        yield from encode(result)
+    finally:
+        db.close()
+
+def validate_sort(sort_field: str, sort_dir: str) -> None:
+    """Reject sort parameters the application queries cannot handle"""
+    if sort_field not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort_field}'")
+    if sort_dir not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="sortDir must be 'asc' or 'desc'")
+
+# /api endpoints
+class ApiGetParams:
+    """Query parameters of GET /api"""
+
+    def __init__(
+        self,
+        action: str = Query(...),
+        ipoName: Optional[str] = Query(None),
+        allotmentStatus: Optional[str] = Query(None),
+        search: Optional[str] = Query(None),
+        sortField: str = Query("createdAt"),
+        sortDir: str = Query("desc"),
+        pageSize: Optional[int] = Query(None, ge=1),
+        cursor: Optional[str] = Query(None),
+        version: Optional[int] = Query(None, ge=0),
+        format: Optional[str] = Query(None)
+    ):
+        self.action = action
+        self.ipoName = ipoName
+        self.allotmentStatus = allotmentStatus
+        self.search = search
+        self.sortField = sortField
+        self.sortDir = sortDir
+        self.pageSize = pageSize
+        self.cursor = cursor
+        self.version = version
+        self.format = format
+
+def conditional_get(
+    db: Session, params: ApiGetParams, current_user: CurrentUser,
+    if_none_match: Optional[str], response: Response
+):
+    """dispatch_get behind an ETag: 304 if the client's copy is current"""
+    # Taken before the read, so changes made during it are picked up by the next changesSince
+    data_version = str(current_version())
+    etag = None
+    if params.action not in UNCACHED_ACTIONS:
+        etag = etag_for(db, current_user.id, params.action, params.format)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    result = dispatch_get(db, params, current_user)
+    # Streamed results are their own Response; others get headers via the injected one
+    target = result if isinstance(result, Response) else response
+    target.headers["X-Data-Version"] = data_version
+    if etag:
+        target.headers["ETag"] = etag
+        target.headers["Cache-Control"] = "private, no-cache"
+    return result
+
+def finish_write(db: Session, user_id: int, action: Optional[str] = None) -> None:
+    """After a successful write: drop the cached summary and bump the ETag versions"""
+    invalidate_summary(user_id)
+    bump_data_versions(db, user_id, ipos=action in IPO_ACTIONS)
+
+def finish_partial_write(db: Session, user_id: int) -> None:
+    """finish_write for a handler that failed after committing some batches; never raises"""
+    try:
+        db.rollback()
+        finish_write(db, user_id)
+    except Exception as e:
+        # The caller re-raises the original error; this one must not replace it
+        print(f"[WARN] Could not invalidate caches after a failed write: {e}")
+
 @app.get("/api")
 def handle_get(
-    action: str = Query(...),
-    ipoName: Optional[str] = Query(None),
+    response: Response,
+    params: ApiGetParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Handle GET requests with action parameter"""
+    return conditional_get(db, params, current_user, if_none_match, response)
+
+@app.post("/api")
+def handle_post(
+    payload: dict = Body(...),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Handle POST requests with action in body"""
+    result = dispatch_post(db, payload, current_user)
+    # Every POST action may change the figures behind the summary and the ETags.
+    # A failed one rolls back, so there is nothing to invalidate and the error passes through.
+    finish_write(db, current_user.id, payload.get("action"))
+    return result
+
+# GET actions
+def dispatch_get(db: Session, params: ApiGetParams, current_user: CurrentUser):
+    """Run one GET action for current_user"""
+    action, ipoName, allotmentStatus, search = (
+        params.action, params.ipoName, params.allotmentStatus, params.search
+    )
+    sortField, sortDir, pageSize, cursor = (
+        params.sortField, params.sortDir, params.pageSize, params.cursor
+    )
 
     # List all applications with joined user/IPO data (filtered by current user)
     if action == "list":
-        applications = db.query(IpoApplication).filter(
-            IpoApplication.created_by == current_user.id
-        ).order_by(IpoApplication.created_at.desc()).all()
-        result = []
-        for app in applications:
-            applicant = db.query(Applicant).filter(Applicant.id == app.user_id).first()
-            ipo = db.query(IpoName).filter(IpoName.name == app.ipo_name).first()
-            result.append(application_to_dict(app, applicant, ipo))
-        return result
+        # format=columnar: per-field arrays with dictionary-encoded values (serialization.py)
+        if params.format not in (None, "columnar"):
+            raise HTTPException(status_code=400, detail="format must be 'columnar' if given")
+        columnar = params.format == "columnar"
+        stmt = apply_application_filters(
+            select_applications(current_user.id), ipoName, allotmentStatus, search
+        )
+
+        # Without pageSize return the whole history as a plain array (legacy shape)
+        if pageSize is None:
+            stmt = stmt.order_by(IpoApplication.created_at.desc())
+            if columnar:
+                # Dictionaries need every row, so this one is built whole rather than streamed;
+                # clients opt in (VITE_COLUMNAR_LIST), the streamed row format stays the default
+                return FastJSONResponse(columnar_applications(db.execute(stmt)))
+            return StreamingResponse(stream_query(stmt, iter_applications_json), media_type="application/json")
+
+        validate_sort(sortField, sortDir)
+        page_size = min(pageSize, MAX_PAGE_SIZE)
+
+        # Total is only counted for the first page; later pages reuse the client's copy
+        total = None
+        if not cursor:
+            total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+
+        try:
+            page_stmt = paginate_applications(stmt, sortField, sortDir, page_size, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rows = db.execute(page_stmt).all()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(sortField, sortDir, list(rows[-1][len(APPLICATION_COLUMNS):]))
+
+        # Returned as a Response so FastAPI skips jsonable_encoder on the rows
+        return FastJSONResponse({
+            "items": columnar_applications(rows) if columnar else application_dicts(rows),
+            "nextCursor": next_cursor,
+            "total": total
+        })
+
+    # Dashboard totals for one IPO (ipoName) or all of them
+    elif action == "summary":
+        return get_summary(db, current_user.id, ipoName)
 
     # List all IPOs with amounts
     elif action == "listIpos":
         ipos = db.query(IpoName).order_by(IpoName.name).all()
-        return [ipo_to_dict(ipo) for ipo in ipos]
+        return FastJSONResponse([ipo_to_dict(ipo) for ipo in ipos])
 
     # List all applicants/users (filtered by current user)
     elif action == "listUsers":
         applicants = db.query(Applicant).filter(
             Applicant.created_by == current_user.id
         ).order_by(Applicant.name).all()
-        return [applicant_to_dict(a) for a in applicants]
+        return FastJSONResponse([applicant_to_dict(a) for a in applicants])
 
     # Get users already applied to a specific IPO (filtered by current user)
     elif action == "getAppliedUsers":
@@ -333,22 +513,36 @@ def handle_get(
         ).all()
         return [app.user_id for app in applications]
 
+    # Rows created, changed or deleted after a sync version (X-Data-Version of an earlier reply)
+    elif action == "changesSince":
+        if params.version is None:
+            raise HTTPException(status_code=400, detail="version is required")
+        version = current_version()
+        if needs_full_reload(params.version):
+            return {"version": version, "full": True}
+
+        changes = changed_since(db, current_user.id, params.version)
+        return FastJSONResponse({
+            "version": version,
+            "full": False,
+            "applications": application_dicts(changes["applications"]),
+            "applicants": [applicant_to_dict(a) for a in changes["applicants"]],
+            "ipos": [ipo_to_dict(ipo) for ipo in changes["ipos"]],
+            "deleted": changes["deleted"]
+        })
+
     raise HTTPException(status_code=400, detail="Invalid action")
 
-# POST endpoints
-@app.post("/api")
-def handle_post(
-    payload: dict = Body(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Handle POST requests with action in body"""
+# POST actions
+def dispatch_post(db: Session, payload: dict, current_user: CurrentUser):
+    """Run one POST action for current_user"""
     action = payload.get("action")
+    record_action(action)
 
     # Add new applicant/user
     if action == "addUser":
         data = payload.get("data", {})
-        user_id = f"user-{int(time.time() * 1000)}"
+        user_id = new_id("user")
 
         name = data.get("name", "").strip()
         if not name:
@@ -405,6 +599,7 @@ def handle_post(
             raise HTTPException(status_code=400, detail="Cannot delete user with existing applications")
 
         db.delete(applicant)
+        record_tombstones(db, current_user.id, "applicant", [applicant.id])
         db.commit()
         return {"success": True}
 
@@ -444,41 +639,41 @@ def handle_post(
         if not ipo:
             raise HTTPException(status_code=400, detail=f"IPO '{ipo_name}' does not exist")
 
-        created = []
-        for user_id in user_ids:
-            # Check if user exists AND belongs to current user
-            applicant = db.query(Applicant).filter(
-                Applicant.id == user_id,
-                Applicant.created_by == current_user.id
-            ).first()
-            if not applicant:
-                continue
-
-            # Check if already applied
-            existing = db.query(IpoApplication).filter(
-                IpoApplication.ipo_name == ipo_name,
-                IpoApplication.user_id == user_id
-            ).first()
-            if existing:
-                continue
-
-            app_id = f"app-{int(time.time() * 1000)}-{user_id[-4:]}"
-            new_app = IpoApplication(
-                id=app_id,
-                ipo_name=ipo_name,
-                user_id=user_id,
-                money_sent=False,
-                money_received=False,
-                allotment_status="Pending",
-                created_by=current_user.id,  # Track who created this application
-                created_at=datetime.utcnow()
-            )
-            db.add(new_app)
-            created.append(app_id)
-            time.sleep(0.001)  # Ensure unique IDs
+        user_ids = list(dict.fromkeys(user_ids))
 
+        # One query for the applicants in the batch that belong to the current user
+        owned = set(db.scalars(select(Applicant.id).where(
+            Applicant.id.in_(user_ids),
+            Applicant.created_by == current_user.id
+        )))
+
+        # One query for the ones that already applied to this IPO
+        existing = set(db.scalars(select(IpoApplication.user_id).where(
+            IpoApplication.ipo_name == ipo_name,
+            IpoApplication.user_id.in_(owned)
+        )))
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": new_id("app"),
+                "ipo_name": ipo_name,
+                "user_id": user_id,
+                "money_sent": False,
+                "money_received": False,
+                "allotment_status": "Pending",
+                "created_by": current_user.id,  # Track who created this application
+                "created_at": now
+            }
+            for user_id in user_ids
+            if user_id in owned and user_id not in existing
+        ]
+
+        # unique_user_ipo still guards against a concurrent request inserting the same pair
+        inserted = set(insert_ignoring_conflicts(db, IpoApplication, rows, ["ipo_name", "user_id"]))
+        apply_deltas(db, current_user.id, tally_rows(r for r in rows if r["id"] in inserted))
         db.commit()
-        return {"success": True, "created": len(created)}
+        return {"success": True, "created": len(inserted)}
 
     # Update application (status and money fields only)
     elif action == "updateRow":
@@ -488,10 +683,13 @@ def handle_post(
         app = db.query(IpoApplication).filter(
             IpoApplication.id == row_id,
             IpoApplication.created_by == current_user.id  # Only allow updating own applications
-        ).first()
+        ).with_for_update().first()
         if not app:
             raise HTTPException(status_code=404, detail="Application not found or access denied")
 
+        # Counters: subtract the old state, add the new one, in the same transaction
+        deltas = add_state({}, app.ipo_name, app.allotment_status, app.money_sent, app.money_received, -1)
+
         if "moneySent" in data:
             app.money_sent = bool(data["moneySent"])
         if "moneyReceived" in data:
@@ -502,6 +700,8 @@ def handle_post(
             if data["allotmentStatus"] == "Not Allotted":
                 app.money_received = False
 
+        add_state(deltas, app.ipo_name, app.allotment_status, app.money_sent, app.money_received)
+        apply_deltas(db, current_user.id, deltas)
         db.commit()
         db.refresh(app)
 
@@ -516,16 +716,118 @@ def handle_post(
         app = db.query(IpoApplication).filter(
             IpoApplication.id == row_id,
             IpoApplication.created_by == current_user.id  # Only allow deleting own applications
-        ).first()
+        ).with_for_update().first()
         if not app:
             raise HTTPException(status_code=404, detail="Application not found or access denied")
 
+        apply_deltas(db, current_user.id, add_state(
+            {}, app.ipo_name, app.allotment_status, app.money_sent, app.money_received, -1
+        ))
         db.delete(app)
+        record_tombstones(db, current_user.id, "application", [app.id])
         db.commit()
         return {"success": True}
 
+    # Update many applications at once: {"ids": [...]} or {"filter": {...}}, plus "data"
+    elif action == "updateRows":
+        try:
+            values = parse_patch(payload.get("data") or {})
+            target_ids = select_target_ids(db, current_user.id, payload.get("ids"), payload.get("filter"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        updated = update_applications(db, current_user.id, target_ids, values)
+        db.commit()
+        return {"success": True, "updated": updated, "rows": read_applications(db, current_user.id, target_ids)}
+
+    # Delete many applications at once: {"ids": [...]} or {"filter": {...}}
+    elif action == "deleteRows":
+        try:
+            target_ids = select_target_ids(db, current_user.id, payload.get("ids"), payload.get("filter"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        deleted = delete_applications(db, current_user.id, target_ids)
+        db.commit()
+        return {"success": True, "deleted": deleted, "ids": target_ids}
+
     raise HTTPException(status_code=400, detail="Invalid action")
 
+# Export (streamed from a server-side cursor, same filters as action=list)
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "xlsx": (iter_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+@app.get("/api/export")
+def export_applications(
+    format: str = Query("csv"),
+    ipoName: Optional[str] = Query(None),
+    allotmentStatus: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    sortField: str = Query("createdAt"),
+    sortDir: str = Query("desc"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Download the current user's applications as CSV or XLSX"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'xlsx'")
+    validate_sort(sortField, sortDir)
+
+    stmt = apply_application_filters(
+        select_applications(current_user.id), ipoName, allotmentStatus, search
+    )
+    stmt = order_applications(stmt, sortField, sortDir)
+
+    encode, media_type = EXPORT_FORMATS[format]
+    filename = f"ipo-applications-{datetime.utcnow().date().isoformat()}.{format}"
+    return StreamingResponse(
+        stream_query(stmt, encode),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# CSV import (multipart upload, parsed and written in batches on the server)
+@app.post("/api/import")
+def import_csv(
+    file: UploadFile = File(...),
+    batchSize: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Import applicants and applications from an uploaded CSV file"""
+    try:
+        result = import_applications_csv(db, current_user.id, file.file, batchSize)
+    except Exception:
+        # Batches before the failure are already committed
+        finish_partial_write(db, current_user.id)
+        raise
+    finish_write(db, current_user.id)
+    return result
+
+# Registrar allotment file (streamed, matched by PAN, applied as one UPDATE per
+# status in id chunks, all in one transaction)
+@app.post("/api/allotment")
+def import_allotment(
+    file: UploadFile = File(...),
+    ipoName: str = Query(...),
+    dryRun: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Set allotment status from a registrar's PAN-keyed results file"""
+    if not db.query(IpoName).filter(IpoName.name == ipoName).first():
+        raise HTTPException(status_code=400, detail=f"IPO '{ipoName}' does not exist")
+    try:
+        result = ingest_allotment_file(db, current_user.id, ipoName, file.file, dryRun)
+    except Exception:
+        # Same cleanup as /api/import, in case a failure leaves anything committed
+        finish_partial_write(db, current_user.id)
+        raise
+    if not dryRun:
+        finish_write(db, current_user.id)
+    return result
+
 # Admin endpoints (simple register and password reset)
 class AdminRegisterRequest(BaseModel):
     username: str
@@ -535,44 +837,87 @@ class AdminResetPasswordRequest(BaseModel):
     username: str
     new_password: str
 
-@app.post("/admin/register", response_model=GenericResponse)
-def admin_register(request: AdminRegisterRequest, db: Session = Depends(get_db)):
-    """Simple registration - username and password only"""
+def create_admin_user(db: Session, username: str, hashed_password: str) -> GenericResponse:
+    """Insert a verified user unless the username is taken"""
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == request.username).first()
+    existing_user = db.query(User).filter(User.username == username).first()
     if existing_user:
         return GenericResponse(success=False, error="Username already exists")
 
     # Create user
     new_user = User(
-        username=request.username,
-        hashed_password=get_password_hash(request.password),
+        username=username,
+        hashed_password=hashed_password,
         is_verified=True
     )
     db.add(new_user)
     db.commit()
 
-    return GenericResponse(success=True, message=f"User '{request.username}' registered successfully")
+    return GenericResponse(success=True, message=f"User '{username}' registered successfully")
 
-@app.post("/admin/reset-password", response_model=GenericResponse)
-def admin_reset_password(request: AdminResetPasswordRequest, db: Session = Depends(get_db)):
-    """Simple password reset - just username and new password"""
+def set_user_password(db: Session, username: str, hashed_password: str) -> GenericResponse:
+    """Replace a user's password hash and drop their cached tokens"""
     # Find user by username
-    user = db.query(User).filter(User.username == request.username).first()
+    user = db.query(User).filter(User.username == username).first()
     if not user:
         return GenericResponse(success=False, error="Username not found")
 
     # Update password
-    user.hashed_password = get_password_hash(request.new_password)
+    user_id = user.id
+    user.hashed_password = hashed_password
     db.commit()
+    invalidate_user_tokens(user_id)
 
-    return GenericResponse(success=True, message=f"Password for '{request.username}' has been reset")
+    return GenericResponse(success=True, message=f"Password for '{username}' has been reset")
+
+@app.post("/admin/register", response_model=GenericResponse)
+async def admin_register(request: AdminRegisterRequest, db: Session = Depends(get_db)):
+    """Simple registration - username and password only"""
+    # Hash before touching the database so no connection is held while bcrypt runs
+    try:
+        hashed_password = await get_password_hash_async(request.password)
+    except HashingBusyError:
+        raise hashing_busy()
+    return await run_in_threadpool(create_admin_user, db, request.username, hashed_password)
+
+@app.post("/admin/reset-password", response_model=GenericResponse)
+async def admin_reset_password(request: AdminResetPasswordRequest, db: Session = Depends(get_db)):
+    """Simple password reset - just username and new password"""
+    # Hash before touching the database so no connection is held while bcrypt runs
+    try:
+        hashed_password = await get_password_hash_async(request.new_password)
+    except HashingBusyError:
+        raise hashing_busy()
+    return await run_in_threadpool(set_user_password, db, request.username, hashed_password)
 
 # Health check endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(None)):
+    """Request and connection pool metrics in Prometheus text format"""
+    if METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(render_metrics(METRIC_ENGINES), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    try:
+        db_ping = {"ok": True, "latencyMs": round(ping_database(engine), 2)}
+    except Exception as e:
+        # /health is public: keep driver and DSN details in the server log
+        print(f"[ERROR] Health check database ping failed: {e}")
+        db_ping = {"ok": False, "error": "database unavailable"}
+    return {
+        "status": "healthy" if db_ping["ok"] else "degraded",
+        "timestamp": datetime.utcnow().isoformat(),
+        "dbPing": db_ping,
+        "authCache": token_cache.stats(),
+        "summaryCache": summary_cache.stats(),
+        "emailWorker": email_worker.stats(),
+        "otpRateLimit": otp_limit_stats(),
+        "otpSweeper": otp_sweeper.stats(),
+        "startup": startup_timer.stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
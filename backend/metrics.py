@@ -0,0 +1,250 @@
+"""
+Per-request metrics in Prometheus text format.
+
+MetricsMiddleware wraps the whole app. For every HTTP request it records,
+labelled by route template, method and /api action:
+- latency (to the last body byte, so streamed responses count in full)
+- SQL statements issued and the time spent in them
+- response bytes as sent (after compression)
+- requests in flight, and a request counter that also has the status code
+
+The request being served is a RequestStats object in a ContextVar. FastAPI
+copies the context into the threadpool, so SQLAlchemy's cursor events and
+the /api dispatchers (record_action) update the right request without any
+locking; only the final aggregation into the shared series takes a lock. Background workers
+run outside any request and are not counted.
+
+Labels are bounded: unmatched paths share route="unmatched", and once
+METRICS_MAX_SERIES label sets exist new actions are recorded as "other".
+GET /metrics serves everything plus connection pool gauges; set
+METRICS_TOKEN to require it as a bearer token.
+"""
+
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_MAX_SERIES = int(os.environ.get("METRICS_MAX_SERIES", "500"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_ACTION_PATTERN = re.compile(r"^[A-Za-z]{1,40}$")
+
+# ==================== Request state ====================
+
+class RequestStats:
+    """What one request did so far"""
+    __slots__ = ("action", "queries", "db_seconds", "query_started")
+
+    def __init__(self):
+        self.action = ""
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.query_started = 0.0
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+def _label_action(stats: RequestStats, action) -> None:
+    """Set stats.action if action looks like an action name (keeps label values bounded)"""
+    if isinstance(action, str) and _ACTION_PATTERN.match(action):
+        stats.action = action
+
+def record_action(action) -> None:
+    """Label the current request with its /api action"""
+    stats = _current.get()
+    if stats is not None:
+        _label_action(stats, action)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - stats.query_started
+
+def instrument_engine(engine) -> None:
+    """Count a sync engine's statements (for an AsyncEngine pass .sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# ==================== Series ====================
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: tuple, value: float) -> None:
+        """Add one observation (caller holds the registry lock)"""
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, label_names: tuple) -> list[str]:
+        """Exposition lines"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in self.series.items():
+            base = format_labels(label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+def escape_label(value: str) -> str:
+    """Label value escaped for the text format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names: tuple, values: tuple) -> str:
+    """name="value",... for a label set"""
+    return ",".join(f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values))
+
+class RequestMetrics:
+    """All request series, behind one lock"""
+
+    LABELS = ("route", "method", "action")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.requests: dict[tuple, int] = {}  # (route, method, action, status) -> count
+        self.db_seconds: dict[tuple, float] = {}
+        self.latency = Histogram("ipo_http_request_duration_seconds",
+                                 "Time from request start to the last response byte", LATENCY_BUCKETS)
+        self.queries = Histogram("ipo_http_request_db_queries",
+                                 "SQL statements issued while serving a request", QUERY_BUCKETS)
+        self.sizes = Histogram("ipo_http_response_size_bytes",
+                               "Response body bytes as sent", SIZE_BUCKETS)
+
+    def observe(self, route: str, method: str, stats: RequestStats, status: int,
+                seconds: float, size: int) -> None:
+        """Fold one finished request into the series"""
+        with self.lock:
+            labels = (route, method, stats.action)
+            if labels not in self.db_seconds and len(self.db_seconds) >= METRICS_MAX_SERIES:
+                labels = (route, method, "other")
+            self.requests[labels + (status,)] = self.requests.get(labels + (status,), 0) + 1
+            self.db_seconds[labels] = self.db_seconds.get(labels, 0.0) + stats.db_seconds
+            self.latency.observe(labels, seconds)
+            self.queries.observe(labels, stats.queries)
+            self.sizes.observe(labels, size)
+
+    def render(self) -> list[str]:
+        """Exposition lines for the request series"""
+        with self.lock:
+            lines = [
+                "# HELP ipo_http_requests_in_flight Requests being served",
+                "# TYPE ipo_http_requests_in_flight gauge",
+                f"ipo_http_requests_in_flight {self.in_flight}",
+                "# HELP ipo_http_requests_total Requests served, by status code",
+                "# TYPE ipo_http_requests_total counter",
+            ]
+            for labels, count in self.requests.items():
+                lines.append(f"ipo_http_requests_total{{{format_labels(self.LABELS + ('status',), labels)}}} {count}")
+            lines += [
+                "# HELP ipo_http_request_db_seconds_total Time spent in SQL statements while serving requests",
+                "# TYPE ipo_http_request_db_seconds_total counter",
+            ]
+            for labels, seconds in self.db_seconds.items():
+                lines.append(f"ipo_http_request_db_seconds_total{{{format_labels(self.LABELS, labels)}}} {seconds:.6f}")
+            for histogram in (self.latency, self.queries, self.sizes):
+                lines += histogram.render(self.LABELS)
+        return lines
+
+request_metrics = RequestMetrics()
+
+# ==================== Pool gauges ====================
+
+def pool_lines(engines: dict) -> list[str]:
+    """Connection pool gauges for {label: engine}"""
+    gauges = {
+        "size": ("ipo_db_pool_size", "Connections the pool keeps open"),
+        "checkedin": ("ipo_db_pool_checked_in", "Idle connections in the pool"),
+        "checkedout": ("ipo_db_pool_checked_out", "Connections in use"),
+        "overflow": ("ipo_db_pool_overflow", "Connections open beyond the pool size"),
+    }
+    lines = []
+    for method, (name, help_text) in gauges.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for label, engine in engines.items():
+            read = getattr(engine.pool, method, None)
+            if read is not None:
+                # overflow() is negative while the pool is not full
+                lines.append(f'{name}{{engine="{label}"}} {max(read(), 0)}')
+    return lines
+
+def render_metrics(engines: dict) -> str:
+    """The full /metrics body"""
+    return "\n".join(request_metrics.render() + pool_lines(engines)) + "\n"
+
+# ==================== Middleware ====================
+
+class MetricsMiddleware:
+    """ASGI middleware feeding request_metrics"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        if scope["path"] == "/api" and scope["method"] == "GET":
+            # POST /api actions are in the body; dispatch_post records those
+            for pair in scope.get("query_string", b"").decode("latin-1").split("&"):
+                if pair.startswith("action="):
+                    _label_action(stats, pair[7:])
+        token = _current.set(stats)
+        status = 500
+        size = 0
+
+        async def send_counting(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        with request_metrics.lock:
+            request_metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            seconds = time.perf_counter() - started
+            _current.reset(token)
+            with request_metrics.lock:
+                request_metrics.in_flight -= 1
+            route = scope.get("route")
+            request_metrics.observe(
+                route.path if route is not None else "unmatched",
+                scope["method"], stats, status, seconds, size
+            )
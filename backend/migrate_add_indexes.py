@@ -0,0 +1,20 @@
+"""
+Add the indexes used by the hot query paths.
+
+Kept for existing instructions; this is now migration 2 in migrations.py
+(CREATE INDEX CONCURRENTLY on PostgreSQL) and runs with every other pending
+migration:
+    python migrate_add_indexes.py    (same as: python migrations.py up)
+"""
+
+import sys
+from database import engine, Base
+from migrations import run_migrations
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    try:
+        run_migrations(engine)
+    except Exception as e:
+        print(f"\n[ERROR] Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,281 @@
+"""
+Versioned schema and data migrations.
+
+Each migration has a version number and runs once; applied versions are
+recorded in schema_migrations. Steps are written to be safe on databases
+that already have the change (fresh databases get the full schema from
+create_all, older ones are brought up to it here).
+
+Data backfills walk the table in primary-key order, updating BACKFILL_BATCH
+rows per short transaction, and store their position in app_meta after each
+batch. An interrupted backfill resumes from that checkpoint on the next run
+instead of starting over, and no single statement locks the whole table.
+
+    python migrations.py status
+    python migrations.py up [--to VERSION]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import select, delete, inspect, text, bindparam, DateTime
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import AppMeta, SchemaMigration, User
+
+BACKFILL_BATCH = int(os.environ.get("BACKFILL_BATCH", "1000"))
+# Optional pause between batches (seconds) to leave room for live traffic
+BACKFILL_PAUSE = float(os.environ.get("BACKFILL_PAUSE", "0"))
+
+# ==================== app_meta ====================
+
+def get_meta(db: Session, key: str) -> str | None:
+    """Value stored under key, or None"""
+    return db.execute(select(AppMeta.value).where(AppMeta.key == key)).scalar()
+
+def set_meta(db: Session, key: str, value: str) -> None:
+    """Store value under key (caller commits)"""
+    db.merge(AppMeta(key=key, value=value))
+
+# ==================== Registry ====================
+
+class Migration:
+    """One versioned migration step"""
+
+    def __init__(self, version: int, name: str, apply: Callable):
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+MIGRATIONS: list[Migration] = []
+
+def migration(version: int, name: str):
+    """Register fn(engine) as migration `version`"""
+    def register(fn: Callable) -> Callable:
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append(Migration(version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+# ==================== Helpers ====================
+
+def add_column_if_missing(engine, table: str, column: str, ddl_type: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN unless the column exists; returns True if added"""
+    if column in {c["name"] for c in inspect(engine).get_columns(table)}:
+        print(f"   [OK] {table}.{column} already exists")
+        return False
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+    print(f"   [OK] Added {table}.{column}")
+    return True
+
+def drop_invalid_postgres_index(conn, name: str) -> None:
+    """Drop an index left INVALID by an interrupted CREATE INDEX CONCURRENTLY"""
+    row = conn.execute(text("""
+        SELECT i.indisvalid FROM pg_class c
+        JOIN pg_index i ON i.indexrelid = c.oid
+        WHERE c.relname = :name
+    """), {"name": name}).fetchone()
+    if row is not None and not row[0]:
+        print(f"   [WARN] {name} is invalid from an earlier run, rebuilding")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+def create_indexes(engine, indexes: list[tuple[str, str, str]]) -> None:
+    """Create (name, table, columns) indexes without blocking writers on PostgreSQL"""
+    is_postgres = engine.dialect.name == "postgresql"
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name, table, columns in indexes:
+            if is_postgres:
+                drop_invalid_postgres_index(conn, name)
+                conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
+            else:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+            print(f"   [OK] {name} on {table} ({columns})")
+        # Refresh planner statistics so the new indexes get picked up
+        conn.execute(text("ANALYZE"))
+
+def backfill(engine, version: int, name: str, table: str, set_sql: str, where_sql: str,
+             params: dict | None = None, key: str = "id", batch_size: int | None = None) -> int:
+    """UPDATE table SET set_sql WHERE where_sql in keyset-ordered batches, resumable; returns rows updated"""
+    # Plain SQL rather than the models: a migration must not depend on columns
+    # that later migrations add (e.g. the models' updated_at onupdate)
+    batch_size = batch_size or BACKFILL_BATCH
+    params = params or {}
+    checkpoint = f"checkpoint:{version}:{name}"
+    def pending(last, columns: str, suffix: str = ""):
+        """SELECT columns of the matching rows after the checkpoint"""
+        after = f" AND {key} > :last" if last is not None else ""
+        return text(f"SELECT {columns} FROM {table} WHERE ({where_sql}){after}{suffix}")
+
+    update_batch = text(
+        f"UPDATE {table} SET {set_sql} WHERE {key} IN :ids AND ({where_sql})"
+    ).bindparams(bindparam("ids", expanding=True))
+
+    with Session(engine) as db:
+        state = json.loads(get_meta(db, checkpoint) or '{"last": null, "rows": 0}')
+        last, done = state["last"], state["rows"]
+        if last is not None:
+            print(f"   [INFO] {name}: resuming after {key}={last!r} ({done} rows already done)")
+
+        total = done + db.scalar(pending(last, "count(*)"), {**params, "last": last})
+        started = time.perf_counter()
+
+        while True:
+            ids = db.scalars(
+                pending(last, key, f" ORDER BY {key} LIMIT :limit"),
+                {**params, "last": last, "limit": batch_size}
+            ).all()
+            if not ids:
+                break
+            result = db.execute(update_batch, {**params, "ids": ids})
+            last, done = ids[-1], done + result.rowcount
+            set_meta(db, checkpoint, json.dumps({"last": last, "rows": done}))
+            db.commit()
+
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            print(f"   [INFO] {name}: {done}/{total} rows ({done * 100 // max(total, 1)}%, {rate:,.0f} rows/s)")
+            if BACKFILL_PAUSE:
+                time.sleep(BACKFILL_PAUSE)
+
+        db.execute(delete(AppMeta).where(AppMeta.key == checkpoint))
+        db.commit()
+    print(f"   [OK] {name}: {done} rows updated")
+    return done
+
+# ==================== Migrations ====================
+
+@migration(1, "add created_by columns")
+def add_created_by_columns(engine) -> None:
+    """User isolation: applicants and applications belong to the user who created them"""
+    add_column_if_missing(engine, "applicants", "created_by", "INTEGER")
+    add_column_if_missing(engine, "ipo_applications", "created_by", "INTEGER")
+
+# (index name, table, columns) - must match the Index/index=True definitions in models.py
+HOT_PATH_INDEXES = [
+    ("ix_users_token", "users", "token"),
+    ("ix_ipo_applications_created_by_created_at", "ipo_applications", "created_by, created_at"),
+    ("ix_ipo_applications_created_by_ipo_name", "ipo_applications", "created_by, ipo_name"),
+    ("ix_ipo_applications_user_id", "ipo_applications", "user_id"),
+    ("ix_applicants_created_by_name", "applicants", "created_by, name"),
+    ("ix_applicants_created_by_pan", "applicants", "created_by, pan"),
+    ("ix_otp_storage_email_purpose", "otp_storage", "email, purpose"),
+    ("ix_otp_storage_expires_at", "otp_storage", "expires_at"),
+]
+
+@migration(2, "hot-path indexes")
+def add_hot_path_indexes(engine) -> None:
+    """Indexes behind the list, summary, token and OTP queries"""
+    create_indexes(engine, HOT_PATH_INDEXES)
+
+@migration(3, "link orphaned data to Unnayan")
+def link_orphans_to_unnayan(engine) -> None:
+    """Applicants and applications from before user isolation belong to Unnayan"""
+    from auth import get_password_hash
+    from counters import rebuild_counters
+
+    with Session(engine) as db:
+        unnayan_id = db.execute(select(User.id).where(User.username == "Unnayan")).scalar()
+        if unnayan_id is None:
+            user = User(username="Unnayan", hashed_password=get_password_hash("1234"), is_verified=True)
+            db.add(user)
+            db.commit()
+            unnayan_id = user.id
+            print(f"   [OK] Created Unnayan user (ID: {unnayan_id})")
+
+    backfill(engine, 3, "applicants.created_by", "applicants",
+             "created_by = :user_id", "created_by IS NULL", {"user_id": unnayan_id})
+    applications = backfill(engine, 3, "ipo_applications.created_by", "ipo_applications",
+                            "created_by = :user_id", "created_by IS NULL", {"user_id": unnayan_id})
+
+    # Reassigned applications move into Unnayan's counters
+    if applications:
+        with Session(engine) as db:
+            rows = rebuild_counters(db)
+        print(f"   [OK] Rebuilt {rows} counter rows")
+
+# (index name, table, columns) for changesSince
+UPDATED_AT_INDEXES = [
+    ("ix_applicants_created_by_updated_at", "applicants", "created_by, updated_at"),
+    ("ix_ipo_applications_created_by_updated_at", "ipo_applications", "created_by, updated_at"),
+    ("ix_ipo_names_updated_at", "ipo_names", "updated_at"),
+]
+
+@migration(4, "updated_at columns for delta sync")
+def add_updated_at_columns(engine) -> None:
+    """updated_at on applicants, applications and IPOs, backfilled from created_at"""
+    datetime_type = DateTime().compile(dialect=engine.dialect)
+    for table in ("applicants", "ipo_applications", "ipo_names"):
+        add_column_if_missing(engine, table, "updated_at", datetime_type)
+    for table in ("applicants", "ipo_applications", "ipo_names"):
+        backfill(engine, 4, f"{table}.updated_at", table,
+                 "updated_at = COALESCE(created_at, :epoch)", "updated_at IS NULL",
+                 {"epoch": datetime(2000, 1, 1)})
+    create_indexes(engine, UPDATED_AT_INDEXES)
+
+# ==================== Runner ====================
+
+def applied_versions(engine) -> set[int]:
+    """Versions recorded in schema_migrations"""
+    Base.metadata.create_all(bind=engine, tables=[SchemaMigration.__table__, AppMeta.__table__])
+    with engine.connect() as conn:
+        return set(conn.scalars(select(SchemaMigration.version)))
+
+def pending_migrations(engine, target: int | None = None) -> list[Migration]:
+    """Unapplied migrations up to target, in version order"""
+    applied = applied_versions(engine)
+    return [m for m in MIGRATIONS
+            if m.version not in applied and (target is None or m.version <= target)]
+
+def run_migrations(engine, target: int | None = None) -> list[int]:
+    """Apply pending migrations in order; returns the versions applied"""
+    applied = []
+    for m in pending_migrations(engine, target):
+        print(f"[INFO] Migration {m.version}: {m.name}")
+        started = time.perf_counter()
+        m.apply(engine)
+        duration_ms = (time.perf_counter() - started) * 1000
+        with Session(engine) as db:
+            db.add(SchemaMigration(version=m.version, name=m.name, duration_ms=duration_ms))
+            db.commit()
+        print(f"[OK] Migration {m.version} applied in {duration_ms:.0f}ms")
+        applied.append(m.version)
+    return applied
+
+def print_status(engine) -> None:
+    """List every migration with its applied time"""
+    applied_versions(engine)
+    with engine.connect() as conn:
+        applied = {row.version: row for row in conn.execute(select(SchemaMigration))}
+    for m in MIGRATIONS:
+        row = applied.get(m.version)
+        state = f"applied {row.applied_at:%Y-%m-%d %H:%M}" if row else "pending"
+        print(f"  {m.version:>4}  {m.name:<40} {state}")
+
+if __name__ == "__main__":
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Apply or list versioned migrations")
+    parser.add_argument("command", nargs="?", default="status", choices=["status", "up"])
+    parser.add_argument("--to", type=int, default=None, help="stop after this version")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print_status(engine)
+        sys.exit(0)
+
+    try:
+        versions = run_migrations(engine, args.to)
+    except Exception as e:
+        print(f"\n[ERROR] Migration failed: {e}")
+        print("Completed backfill batches are kept; rerun to resume.")
+        sys.exit(1)
+    print(f"[OK] Applied {len(versions)} migration(s)" if versions else "[OK] Database is up to date")
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, UniqueConstraint
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, UniqueConstraint, Index
 from sqlalchemy.sql import func
+from datetime import datetime
 from database import Base
 
 class User(Base):
@@ -10,7 +11,7 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=True, index=True)
     hashed_password = Column(String(255), nullable=False)
-    token = Column(String(255), nullable=True)
+    token = Column(String(255), nullable=True, index=True)  # Looked up on every request
     is_verified = Column(Boolean, default=False)
     created_at = Column(DateTime, server_default=func.now())
 
@@ -24,6 +25,16 @@ class Applicant(Base):
     pan = Column(String(10), nullable=True)
     created_by = Column(Integer, nullable=True)  # Foreign key to users.id
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Delta sync
+
+    __table_args__ = (
+        # listUsers: created_by = ? ORDER BY name
+        Index('ix_applicants_created_by_name', 'created_by', 'name'),
+        # changesSince: created_by = ? AND updated_at > ?
+        Index('ix_applicants_created_by_updated_at', 'created_by', 'updated_at'),
+        # CSV import upserts by PAN: created_by = ? AND pan IN (...)
+        Index('ix_applicants_created_by_pan', 'created_by', 'pan'),
+    )
 
 class IpoName(Base):
     """IPO names table with amount"""
@@ -33,6 +44,7 @@ class IpoName(Base):
     name = Column(String(255), unique=True, nullable=False, index=True)
     amount = Column(Float, nullable=False, default=0)
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
 
 class IpoApplication(Base):
     """IPO application records - links applicants to IPOs"""
@@ -40,18 +52,38 @@ class IpoApplication(Base):
 
     id = Column(String(50), primary_key=True)
     ipo_name = Column(String(255), nullable=False)
-    user_id = Column(String(50), nullable=False)  # Reference to applicants.id
+    user_id = Column(String(50), nullable=False, index=True)  # Reference to applicants.id
     money_sent = Column(Boolean, default=False)
     money_received = Column(Boolean, default=False)
     allotment_status = Column(String(20), default='Pending')  # Pending/Allotted/Not Allotted
     created_by = Column(Integer, nullable=True)  # Foreign key to users.id
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Delta sync
 
     # Unique constraint: user can only apply once per IPO
     __table_args__ = (
         UniqueConstraint('ipo_name', 'user_id', name='unique_user_ipo'),
+        # list: created_by = ? ORDER BY created_at
+        Index('ix_ipo_applications_created_by_created_at', 'created_by', 'created_at'),
+        # getAppliedUsers and IPO filters: created_by = ? AND ipo_name = ?
+        Index('ix_ipo_applications_created_by_ipo_name', 'created_by', 'ipo_name'),
+        # changesSince: created_by = ? AND updated_at > ?
+        Index('ix_ipo_applications_created_by_updated_at', 'created_by', 'updated_at'),
     )
 
+class IpoCounter(Base):
+    """Application counts per user and IPO, kept in step with ipo_applications (see counters.py)"""
+    __tablename__ = "ipo_counters"
+
+    created_by = Column(Integer, primary_key=True)
+    ipo_name = Column(String(255), primary_key=True)
+    applications = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    allotted = Column(Integer, nullable=False, default=0)
+    not_allotted = Column(Integer, nullable=False, default=0)
+    money_sent = Column(Integer, nullable=False, default=0)
+    pending_refund = Column(Integer, nullable=False, default=0)
+
 class OtpStorage(Base):
     """OTP storage for email verification and password recovery"""
     __tablename__ = "otp_storage"
@@ -60,5 +92,70 @@ class OtpStorage(Base):
     email = Column(String(255), nullable=False, index=True)
     otp = Column(String(10), nullable=False)
     purpose = Column(String(20), nullable=False)  # registration/recovery
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Expiry sweep
+    created_at = Column(DateTime, server_default=func.now())
+
+    # store_otp/verify_otp: email = ? AND purpose = ?
+    __table_args__ = (
+        Index('ix_otp_storage_email_purpose', 'email', 'purpose'),
+    )
+
+class EmailOutbox(Base):
+    """Queued outgoing email, delivered by the background worker in email_outbox.py"""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_body = Column(Text, nullable=False)  # Cleared once sent or failed
+    status = Column(String(20), nullable=False, default='pending')  # pending/sent/failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)  # Also the claim lease while sending
+    last_error = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+
+    # Worker poll: status = 'pending' AND next_attempt_at <= now
+    __table_args__ = (
+        Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+class AppMeta(Base):
+    """Key/value store for schema fingerprints and applied one-time data fixes (see startup.py)"""
+    __tablename__ = "app_meta"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(Text, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class SchemaMigration(Base):
+    """Versioned migrations applied to this database (see migrations.py)"""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, server_default=func.now())
+    duration_ms = Column(Float, nullable=True)
+
+class DataVersion(Base):
+    """Change counter per scope ('user:<id>' or 'ipos'), behind the /api ETags (see data_versions.py)"""
+    __tablename__ = "data_versions"
+
+    scope = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class Tombstone(Base):
+    """Deleted applicant or application, so delta sync can tell clients to drop it (see delta_sync.py)"""
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)  # application/applicant
+    entity_id = Column(String(50), nullable=False)
+    created_by = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # changesSince: created_by = ? AND deleted_at > ?; pruning: deleted_at < ?
+    __table_args__ = (
+        Index('ix_tombstones_created_by_deleted_at', 'created_by', 'deleted_at'),
+        Index('ix_tombstones_deleted_at', 'deleted_at'),
+    )
@@ -0,0 +1,103 @@
+"""
+Periodic cleanup of expired OTPs.
+
+Every OTP_SWEEP_INTERVAL seconds expired otp_storage rows are deleted in
+batches of OTP_SWEEP_BATCH (one short transaction each, so the sweep never
+holds a long lock), and idle rate-limit buckets are dropped. The same pass
+drops delta-sync tombstones past their retention and delivered or failed
+outbox emails past EMAIL_RETENTION_DAYS.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+
+from sqlalchemy import select, delete
+
+from database import SessionLocal
+from models import OtpStorage
+from ratelimit import OTP_LIMITERS
+from delta_sync import purge_tombstones
+from email_outbox import purge_finished_emails
+
+OTP_SWEEP_INTERVAL = float(os.environ.get("OTP_SWEEP_INTERVAL", "300"))
+OTP_SWEEP_BATCH = int(os.environ.get("OTP_SWEEP_BATCH", "1000"))
+
+def purge_expired_otps(batch_size: int = OTP_SWEEP_BATCH) -> int:
+    """Delete every expired OTP in batches; returns rows deleted"""
+    now = datetime.utcnow()
+    purged = 0
+    db = SessionLocal()
+    try:
+        while True:
+            batch = select(OtpStorage.id).where(OtpStorage.expires_at < now).limit(batch_size)
+            result = db.execute(delete(OtpStorage).where(OtpStorage.id.in_(batch.scalar_subquery())))
+            db.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                return purged
+    finally:
+        db.close()
+
+class OtpSweeper:
+    """Background task that runs purge_expired_otps on an interval"""
+
+    def __init__(self):
+        self.runs = 0
+        self.purged = 0
+        self.buckets_pruned = 0
+        self.tombstones_purged = 0
+        self.emails_purged = 0
+        self.last_run: datetime | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start sweeping on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sweeping"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def sweep_once(self) -> int:
+        """Purge expired OTPs and idle buckets now; returns OTP rows deleted"""
+        purged = await asyncio.to_thread(purge_expired_otps)
+        self.buckets_pruned += sum(limiter.prune() for limiter in OTP_LIMITERS)
+        self.tombstones_purged += await asyncio.to_thread(purge_tombstones)
+        self.emails_purged += await asyncio.to_thread(purge_finished_emails, OTP_SWEEP_BATCH)
+        self.runs += 1
+        self.purged += purged
+        self.last_run = datetime.utcnow()
+        return purged
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                purged = await self.sweep_once()
+                if purged:
+                    print(f"[INFO] Purged {purged} expired OTP(s)")
+            except Exception as e:
+                print(f"[ERROR] OTP sweeper: {e}")
+            await asyncio.sleep(OTP_SWEEP_INTERVAL)
+
+    def stats(self) -> dict:
+        """Sweep counters for this process"""
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "purged": self.purged,
+            "bucketsPruned": self.buckets_pruned,
+            "tombstonesPurged": self.tombstones_purged,
+            "emailsPurged": self.emails_purged,
+            "lastRun": self.last_run.isoformat() if self.last_run else None,
+        }
+
+otp_sweeper = OtpSweeper()
@@ -0,0 +1,162 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from models import Applicant, IpoName, IpoApplication
+
+# Columns needed to render an application, in the order returned by
+# select_applications(). Reading plain tuples skips the ORM identity map.
+APPLICATION_COLUMNS = (
+    IpoApplication.id,
+    IpoApplication.ipo_name,
+    IpoApplication.user_id,
+    Applicant.id.label("applicant_id"),
+    Applicant.name,
+    Applicant.pan,
+    Applicant.phone,
+    IpoName.amount,
+    IpoApplication.money_sent,
+    IpoApplication.money_received,
+    IpoApplication.allotment_status,
+    IpoApplication.created_at,
+)
+
+def select_applications(user_id: int):
+    """Build one joined, column-only select of a user's applications"""
+    return (
+        select(*APPLICATION_COLUMNS)
+        .select_from(IpoApplication)
+        .outerjoin(Applicant, Applicant.id == IpoApplication.user_id)
+        .outerjoin(IpoName, IpoName.name == IpoApplication.ipo_name)
+        .where(IpoApplication.created_by == user_id)
+    )
+
+# Sortable fields (frontend keys) mapped to the expression rows are ordered by.
+# Joined columns are coalesced to the same fallbacks application_row_to_dict uses.
+SORT_COLUMNS = {
+    "createdAt": IpoApplication.created_at,
+    "ipoName": IpoApplication.ipo_name,
+    "userName": func.coalesce(Applicant.name, "Unknown"),
+    "userPan": func.coalesce(Applicant.pan, ""),
+    "userPhone": func.coalesce(Applicant.phone, ""),
+    "ipoAmount": func.coalesce(IpoName.amount, 0),
+    "moneySent": IpoApplication.money_sent,
+    "moneyReceived": IpoApplication.money_received,
+    "allotmentStatus": IpoApplication.allotment_status,
+}
+
+MAX_PAGE_SIZE = 500
+
+def apply_application_filters(stmt, ipo_name: Optional[str] = None,
+                              allotment_status: Optional[str] = None,
+                              search: Optional[str] = None):
+    """Narrow a select_applications() statement by the dashboard filters"""
+    if ipo_name:
+        stmt = stmt.where(IpoApplication.ipo_name == ipo_name)
+    if allotment_status:
+        stmt = stmt.where(IpoApplication.allotment_status == allotment_status)
+    if search:
+        stmt = stmt.where(
+            Applicant.name.icontains(search, autoescape=True)
+            | Applicant.pan.icontains(search, autoescape=True)
+            | Applicant.phone.icontains(search, autoescape=True)
+            | IpoApplication.ipo_name.icontains(search, autoescape=True)
+        )
+    return stmt
+
+def encode_cursor(sort_field: str, sort_dir: str, values: list) -> str:
+    """Pack the keyset of the last row on a page into an opaque cursor"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps({"f": sort_field, "d": sort_dir, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort_field: str, sort_dir: str) -> list:
+    """Unpack a cursor made by encode_cursor, raising ValueError if it does not fit this query"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = data["v"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if data.get("f") != sort_field or data.get("d") != sort_dir:
+        raise ValueError("Cursor does not match the requested sort")
+    return values
+
+def keyset_columns(sort_field: str) -> list:
+    """Columns that give a total order for sort_field, ending in (created_at, id)"""
+    columns = [SORT_COLUMNS[sort_field]]
+    if sort_field != "createdAt":
+        columns.append(IpoApplication.created_at)
+    columns.append(IpoApplication.id)
+    return columns
+
+def order_applications(stmt, sort_field: str, sort_dir: str):
+    """Order a select_applications() statement by sort_field, then (created_at, id)"""
+    columns = keyset_columns(sort_field)
+    return stmt.order_by(*[c.desc() if sort_dir == "desc" else c.asc() for c in columns])
+
+def paginate_applications(stmt, sort_field: str, sort_dir: str, page_size: int,
+                          cursor: Optional[str] = None):
+    """Order, seek past the cursor and limit a select_applications() statement"""
+    # Keyset columns go after APPLICATION_COLUMNS so the caller can build the next
+    # cursor from the last row; one extra row tells whether another page exists
+    columns = keyset_columns(sort_field)
+    descending = sort_dir == "desc"
+    stmt = stmt.add_columns(*[c.label(f"key_{i}") for i, c in enumerate(columns)])
+    if cursor:
+        values = decode_cursor(cursor, sort_field, sort_dir)
+        if len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        # created_at comes back as an ISO string in the cursor
+        values = [
+            datetime.fromisoformat(v) if c is IpoApplication.created_at and isinstance(v, str) else v
+            for c, v in zip(columns, values)
+        ]
+        key = tuple_(*columns)
+        stmt = stmt.where(key < tuple_(*values) if descending else key > tuple_(*values))
+    return order_applications(stmt, sort_field, sort_dir).limit(page_size + 1)
+
+def application_row_to_dict(row) -> dict:
+    """Convert a row from select_applications() to the application_to_dict shape"""
+    (app_id, ipo_name, user_id, applicant_id, name, pan, phone, amount,
+     money_sent, money_received, allotment_status, created_at) = row[:len(APPLICATION_COLUMNS)]
+    has_applicant = applicant_id is not None
+    return {
+        "id": app_id,
+        "ipoName": ipo_name,
+        "userId": user_id,
+        "userName": name if has_applicant else "Unknown",
+        "userPan": (pan or "") if has_applicant else "",
+        "userPhone": (phone or "") if has_applicant else "",
+        "ipoAmount": amount if amount is not None else 0,
+        "moneySent": money_sent,
+        "moneyReceived": money_received,
+        "allotmentStatus": allotment_status,
+        "createdAt": created_at.isoformat() if created_at else datetime.utcnow().isoformat()
+    }
+
+def dialect_insert(db, model):
+    """INSERT construct for the session's dialect, which supports ON CONFLICT"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+
+def insert_ignoring_conflicts(db, model, rows: list[dict], conflict_columns: list[str],
+                              chunk_size: int = 500) -> list:
+    """Bulk insert rows, skipping any that hit the given unique columns; returns the inserted ids"""
+    inserted = []
+    for start in range(0, len(rows), chunk_size):
+        stmt = (
+            dialect_insert(db, model)
+            .values(rows[start:start + chunk_size])
+            .on_conflict_do_nothing(index_elements=conflict_columns)
+            .returning(model.id)
+        )
+        inserted.extend(db.scalars(stmt))
+    return inserted
@@ -0,0 +1,121 @@
+"""
+In-process token-bucket rate limiting for the OTP endpoints.
+
+Each key (an email address or client IP) gets a bucket of `capacity` tokens
+that refills at one token every `refill_seconds`. Buckets live in a bounded
+LRU, and full (idle) buckets are pruned by the OTP sweeper, so memory stays
+flat under a flood of distinct keys. Limits are per worker process.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets keyed by string"""
+
+    def __init__(self, name: str, capacity: int, refill_seconds: float, maxsize: int = 10000):
+        self.name = name
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.maxsize = maxsize
+        self.allowed = 0
+        self.throttled = 0
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def _refilled(self, key: str, now: float) -> float:
+        """Current tokens for key (caller holds the lock)"""
+        entry = self._buckets.get(key)
+        if entry is None:
+            return float(self.capacity)
+        tokens, updated = entry
+        return min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+
+    def acquire(self, key: str) -> float:
+        """Take one token; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refilled(key, now)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+                while len(self._buckets) > self.maxsize:
+                    self._buckets.popitem(last=False)
+                self.allowed += 1
+                return 0.0
+            self.throttled += 1
+            return (1 - tokens) * self.refill_seconds
+
+    def prune(self) -> int:
+        """Drop buckets that have refilled completely; returns how many"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [k for k in self._buckets if self._refilled(k, now) >= self.capacity]
+            for key in idle:
+                del self._buckets[key]
+            return len(idle)
+
+    def stats(self) -> dict:
+        """Allowed/throttled counters and tracked keys"""
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "throttled": self.throttled,
+                "keys": len(self._buckets),
+                "capacity": self.capacity,
+                "refillSeconds": self.refill_seconds,
+            }
+
+# Requests to any OTP endpoint, per client IP
+otp_ip_limiter = TokenBucketLimiter(
+    "otp_ip",
+    capacity=int(os.environ.get("OTP_IP_BURST", "10")),
+    refill_seconds=float(os.environ.get("OTP_IP_REFILL_SECONDS", "30")),
+)
+# OTP emails sent, per address
+otp_send_limiter = TokenBucketLimiter(
+    "otp_send",
+    capacity=int(os.environ.get("OTP_SEND_BURST", "3")),
+    refill_seconds=float(os.environ.get("OTP_SEND_REFILL_SECONDS", "120")),
+)
+# OTP guesses, per address
+otp_verify_limiter = TokenBucketLimiter(
+    "otp_verify",
+    capacity=int(os.environ.get("OTP_VERIFY_BURST", "5")),
+    refill_seconds=float(os.environ.get("OTP_VERIFY_REFILL_SECONDS", "60")),
+)
+
+OTP_LIMITERS = (otp_ip_limiter, otp_send_limiter, otp_verify_limiter)
+
+# Behind a reverse proxy (e.g. Render) the socket peer is the proxy itself.
+# Each proxy appends the address it saw, so the client is TRUSTED_PROXY_HOPS
+# entries from the right; anything further left was sent by the client and can be forged.
+TRUST_PROXY_HEADERS = os.environ.get("TRUST_PROXY_HEADERS", "false").lower() == "true"
+TRUSTED_PROXY_HOPS = max(1, int(os.environ.get("TRUSTED_PROXY_HOPS", "1")))
+
+def client_ip(request: Request) -> str:
+    """Best-effort client address for rate limiting"""
+    if TRUST_PROXY_HEADERS:
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if hops:
+            return hops[max(len(hops) - TRUSTED_PROXY_HOPS, 0)]
+    return request.client.host if request.client else "unknown"
+
+def enforce_otp_limits(request: Request, email: str, limiter: TokenBucketLimiter) -> None:
+    """Raise 429 with Retry-After if the client IP or the email is over its limit"""
+    for bucket, key in ((otp_ip_limiter, client_ip(request)), (limiter, email.strip().lower())):
+        wait = bucket.acquire(key)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(max(1, int(wait + 0.999)))},
+            )
+
+def otp_limit_stats() -> dict:
+    """Stats of every OTP limiter by name"""
+    return {limiter.name: limiter.stats() for limiter in OTP_LIMITERS}
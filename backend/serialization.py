@@ -0,0 +1,180 @@
+"""
+Fast JSON encoding for the large /api responses.
+
+FastAPI's default path runs every returned value through jsonable_encoder
+and then the stdlib json module; for a few thousand application rows that
+walk costs far more than the query. Here rows are turned into dicts in one
+comprehension straight from the select_applications() tuples and encoded in
+a single orjson call, which also writes datetimes natively. The opt-in
+format=columnar encoding (below) trades the row objects for per-field arrays.
+
+orjson is optional: without it the same functions fall back to the stdlib
+encoder with the settings JSONResponse uses, so the bytes only differ in
+float formatting corner cases.
+"""
+
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Encode the non-JSON types the stdlib encoder meets in our rows"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+_stdlib_encode = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+).encode
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _stdlib_encode(value).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# ==================== Application rows ====================
+
+def application_dicts(rows: Iterable) -> list[dict]:
+    """select_applications() rows in the application_row_to_dict shape, datetimes left as is"""
+    # Kept in step with queries.application_row_to_dict; unpacking the tuple
+    # in the comprehension avoids a function call and a slice per row
+    now = datetime.utcnow()
+    return [
+        {
+            "id": app_id,
+            "ipoName": ipo_name,
+            "userId": user_id,
+            "userName": name if applicant_id is not None else "Unknown",
+            "userPan": (pan or "") if applicant_id is not None else "",
+            "userPhone": (phone or "") if applicant_id is not None else "",
+            "ipoAmount": amount if amount is not None else 0,
+            "moneySent": money_sent,
+            "moneyReceived": money_received,
+            "allotmentStatus": allotment_status,
+            "createdAt": created_at or now,
+        }
+        for (app_id, ipo_name, user_id, applicant_id, name, pan, phone, amount,
+             money_sent, money_received, allotment_status, created_at, *_) in rows
+    ]
+
+def encode_applications(rows: Iterable) -> bytes:
+    """select_applications() rows as a JSON array"""
+    return dumps(application_dicts(rows))
+
+def iter_applications_json(rows: Iterable, chunk_size: int = 500) -> Iterator[bytes]:
+    """Encode rows as a JSON array, yielding one chunk per chunk_size rows"""
+    yield b"["
+    separator = b""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            # Each chunk is encoded as an array and emitted without its brackets
+            yield separator + encode_applications(chunk)[1:-1]
+            separator = b","
+            chunk = []
+    if chunk:
+        yield separator + encode_applications(chunk)[1:-1]
+    yield b"]"
+
+# ==================== Columnar format ====================
+
+# format=columnar: one array per field instead of one object per row. Fields
+# with few distinct values (IPO, status, and the applicant fields, keyed by
+# userId) are sent once in `dictionaries` and referenced by index; booleans
+# are packed eight to a byte (bit i&7 of byte i>>3, base64); createdAt is
+# microseconds since the epoch, each row as the difference from the previous
+# one; the prefix every id shares is sent once. ApiClient.decodeColumnar
+# rebuilds the row objects. NULL booleans read as false.
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def pack_booleans(values: list) -> str:
+    """Base64 bitmap of values, least significant bit first"""
+    if not values:
+        return ""
+    bits = "".join("1" if value else "0" for value in reversed(values))
+    return base64.b64encode(int(bits, 2).to_bytes((len(values) + 7) // 8, "little")).decode("ascii")
+
+def columnar_applications(rows: Iterable) -> dict:
+    """select_applications() rows in the columnar format"""
+    ipo_index: dict = {}
+    status_index: dict = {}
+    user_index: dict = {}
+    dictionaries = {
+        "ipoName": [], "ipoAmount": [], "allotmentStatus": [],
+        "userId": [], "userName": [], "userPan": [], "userPhone": [],
+    }
+    ids, ipos, users, statuses, sent, received, created = [], [], [], [], [], [], []
+    now = (datetime.utcnow() - _EPOCH) // _MICROSECOND
+    previous = 0
+
+    for (app_id, ipo_name, user_id, applicant_id, name, pan, phone, amount,
+         money_sent, money_received, allotment_status, created_at, *_) in rows:
+        ids.append(app_id)
+
+        index = ipo_index.get(ipo_name)
+        if index is None:
+            index = ipo_index[ipo_name] = len(ipo_index)
+            dictionaries["ipoName"].append(ipo_name)
+            dictionaries["ipoAmount"].append(amount if amount is not None else 0)
+        ipos.append(index)
+
+        index = user_index.get(user_id)
+        if index is None:
+            index = user_index[user_id] = len(user_index)
+            has_applicant = applicant_id is not None
+            dictionaries["userId"].append(user_id)
+            dictionaries["userName"].append(name if has_applicant else "Unknown")
+            dictionaries["userPan"].append((pan or "") if has_applicant else "")
+            dictionaries["userPhone"].append((phone or "") if has_applicant else "")
+        users.append(index)
+
+        index = status_index.get(allotment_status)
+        if index is None:
+            index = status_index[allotment_status] = len(status_index)
+            dictionaries["allotmentStatus"].append(allotment_status)
+        statuses.append(index)
+
+        sent.append(money_sent)
+        received.append(money_received)
+        micros = (created_at - _EPOCH) // _MICROSECOND if created_at else now
+        created.append(micros - previous)
+        previous = micros
+
+    id_prefix = os.path.commonprefix(ids) if len(ids) > 1 else ""
+    if id_prefix:
+        ids = [app_id[len(id_prefix):] for app_id in ids]
+
+    return {
+        "format": "columnar",
+        "count": len(ids),
+        "idPrefix": id_prefix,
+        "dictionaries": dictionaries,
+        "columns": {
+            "id": ids,
+            "ipo": ipos,
+            "user": users,
+            "allotmentStatus": statuses,
+            "moneySent": pack_booleans(sent),
+            "moneyReceived": pack_booleans(received),
+            "createdAt": created,
+        },
+    }
@@ -0,0 +1,153 @@
+"""
+Startup work that should cost nothing on a warm boot.
+
+- Schema: Base.metadata.create_all only runs when the models' DDL
+  fingerprint differs from the one recorded in app_meta.
+- Versioned migrations (migrations.py) run once each; on a warm boot this
+  is a single read of schema_migrations. MIGRATE_ON_STARTUP=false leaves
+  them to `python migrations.py up`.
+- Default users are created if missing; Unnayan's password is only rehashed
+  when the stored hash is no longer the one this code last set.
+
+Each phase is timed; the breakdown is printed and served by /health.
+"""
+
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from database import Base
+from models import AppMeta, User
+from auth import get_password_hash, verify_password, hash_needs_upgrade
+from counters import ensure_counters
+from migrations import get_meta, set_meta, run_migrations, pending_migrations
+
+MIGRATE_ON_STARTUP = os.environ.get("MIGRATE_ON_STARTUP", "true").lower() == "true"
+
+SCHEMA_FINGERPRINT_KEY = "schema_fingerprint"
+UNNAYAN_HASH_KEY = "unnayan_password_hash"
+
+# ==================== Timing ====================
+
+class StartupTimer:
+    """Wall time of each named startup phase"""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.finished_at: datetime | None = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as one phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self) -> str:
+        """One-line breakdown, e.g. 'schema 3ms, users 1ms (total 4ms)'"""
+        self.finished_at = datetime.utcnow()
+        parts = [f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items()]
+        return f"{', '.join(parts)} (total {sum(self.phases.values()) * 1000:.0f}ms)"
+
+    def stats(self) -> dict:
+        """Phase timings in milliseconds"""
+        return {
+            "phasesMs": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            "totalMs": round(sum(self.phases.values()) * 1000, 1),
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+startup_timer = StartupTimer()
+
+# ==================== Schema ====================
+
+def schema_fingerprint(engine) -> str:
+    """Hash of the DDL the models compile to on this engine's dialect"""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    return digest.hexdigest()
+
+def ensure_schema(engine) -> bool:
+    """Create missing tables and indexes if the models changed; returns True if create_all ran"""
+    fingerprint = schema_fingerprint(engine)
+    try:
+        with engine.connect() as conn:
+            stored = conn.execute(
+                select(AppMeta.value).where(AppMeta.key == SCHEMA_FINGERPRINT_KEY)
+            ).scalar()
+    except DBAPIError:
+        # app_meta itself does not exist yet
+        stored = None
+    if stored == fingerprint:
+        return False
+
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        set_meta(db, SCHEMA_FINGERPRINT_KEY, fingerprint)
+        db.commit()
+    return True
+
+# ==================== Default users ====================
+
+def ensure_default_users(db: Session) -> User:
+    """Create admin and Unnayan if missing and keep Unnayan's password at 1234; returns Unnayan"""
+    if db.execute(select(User.id).where(User.username == "admin")).first() is None:
+        db.add(User(username="admin", hashed_password=get_password_hash("admin123"), is_verified=True))
+        print("Default admin user created (username: admin, password: admin123)")
+
+    unnayan = db.query(User).filter(User.username == "Unnayan").first()
+    if not unnayan:
+        unnayan = User(username="Unnayan", hashed_password=get_password_hash("1234"), is_verified=True)
+        db.add(unnayan)
+        print("Unnayan user created (username: Unnayan, password: 1234)")
+    elif unnayan.hashed_password != get_meta(db, UNNAYAN_HASH_KEY) and (
+        hash_needs_upgrade(unnayan.hashed_password) or not verify_password("1234", unnayan.hashed_password)
+    ):
+        # Only when the password was changed since we last set it
+        unnayan.hashed_password = get_password_hash("1234")
+        print("Unnayan user password reset to 1234")
+    unnayan.is_verified = True
+
+    db.flush()
+    set_meta(db, UNNAYAN_HASH_KEY, unnayan.hashed_password)
+    db.commit()
+    return unnayan
+
+# ==================== Entry point ====================
+
+def prepare_database(engine, session_factory, timer: StartupTimer = startup_timer) -> None:
+    """Schema, default users, migrations and counters, each timed"""
+    with timer.phase("schema"):
+        created = ensure_schema(engine)
+    if created:
+        print("[INFO] Schema changed, ran create_all")
+
+    db = session_factory()
+    try:
+        with timer.phase("users"):
+            ensure_default_users(db)
+        with timer.phase("migrations"):
+            if MIGRATE_ON_STARTUP:
+                run_migrations(engine)
+            else:
+                pending = pending_migrations(engine)
+                if pending:
+                    print(f"[WARN] {len(pending)} pending migration(s); run: python migrations.py up")
+        with timer.phase("counters"):
+            ensure_counters(db)
+    finally:
+        db.close()
+
+    print(f"[INFO] Startup: {timer.report()}")
@@ -0,0 +1,74 @@
+"""
+Dashboard summary figures, read from the ipo_counters table and cached per user.
+
+The cached value holds every IPO for the user plus the overall totals, so
+switching the IPO filter never goes back to the database. Writes call
+invalidate_summary(); the TTL only bounds staleness from writes made by
+other processes.
+"""
+
+import os
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from cache import TTLCache
+from models import IpoName, IpoCounter
+
+SUMMARY_CACHE_SIZE = int(os.environ.get("SUMMARY_CACHE_SIZE", "1024"))
+SUMMARY_CACHE_TTL = float(os.environ.get("SUMMARY_CACHE_TTL", "300"))
+
+# user id -> {"overall": {...}, "byIpo": {ipo name: {...}}}
+summary_cache = TTLCache(maxsize=SUMMARY_CACHE_SIZE, ttl=SUMMARY_CACHE_TTL)
+
+SUMMARY_FIELDS = (
+    "applications", "totalAmount", "pending", "allotted",
+    "notAllotted", "moneySent", "pendingRefund"
+)
+
+def empty_summary() -> dict:
+    """Summary for an IPO (or user) with no applications"""
+    return {field: 0 for field in SUMMARY_FIELDS}
+
+def compute_summary(db: Session, user_id: int) -> dict:
+    """Per-IPO and overall figures for user_id, read from one counter row per IPO"""
+    stmt = (
+        select(IpoCounter, func.coalesce(IpoName.amount, 0))
+        .outerjoin(IpoName, IpoCounter.ipo_name == IpoName.name)
+        .where(IpoCounter.created_by == user_id, IpoCounter.applications > 0)
+    )
+
+    overall = empty_summary()
+    by_ipo = {}
+    for counter, amount in db.execute(stmt):
+        figures = {
+            "applications": counter.applications,
+            "totalAmount": counter.applications * amount,
+            "pending": counter.pending,
+            "allotted": counter.allotted,
+            "notAllotted": counter.not_allotted,
+            "moneySent": counter.money_sent,
+            "pendingRefund": counter.pending_refund
+        }
+        by_ipo[counter.ipo_name] = figures
+        for field in SUMMARY_FIELDS:
+            overall[field] += figures[field]
+
+    return {"overall": overall, "byIpo": by_ipo}
+
+def get_summary(db: Session, user_id: int, ipo_name: str | None = None) -> dict:
+    """Summary for one IPO, or across every IPO when ipo_name is empty"""
+    summary = summary_cache.get(user_id)
+    if summary is None:
+        summary = compute_summary(db, user_id)
+        summary_cache.set(user_id, summary)
+
+    if ipo_name:
+        figures = summary["byIpo"].get(ipo_name, empty_summary())
+    else:
+        figures = summary["overall"]
+    return {"ipoName": ipo_name or None, **figures}
+
+def invalidate_summary(user_id: int) -> None:
+    """Drop the cached summary after user_id's applications change"""
+    summary_cache.pop(user_id)
@@ -0,0 +1,63 @@
+"""
+Shared fixtures: the app on a scratch SQLite database, and a fresh login
+user per test so every test sees only its own applications.
+"""
+
+import os
+import secrets
+import tempfile
+
+import pytest
+
+# database.py reads these at import time, so set them before any app import
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='ipo-tests-'), 'test.db')}"
+os.environ["EMAIL_SINK"] = "stdout"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from fastapi.testclient import TestClient
+
+import main
+from database import SessionLocal
+from models import User
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient with the app's startup and shutdown run once for the session"""
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.fixture
+def db():
+    """Session on the test database"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def auth(client, db) -> dict:
+    """Auth header of a new verified user"""
+    token = secrets.token_urlsafe(16)
+    db.add(User(username=f"user-{token}", hashed_password="-", token=token, is_verified=True))
+    db.commit()
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def ipo(client, auth) -> str:
+    """Name of a new IPO"""
+    name = f"IPO {secrets.token_hex(4)}"
+    response = client.post("/api", json={"action": "addIpo", "ipoName": name, "amount": 15000}, headers=auth)
+    assert response.status_code == 200
+    return name
+
+def import_csv(client, auth, lines: list[str], **params):
+    """POST a CSV built from lines to /api/import"""
+    body = "\n".join(lines).encode()
+    return client.post("/api/import", params=params, files={"file": ("import.csv", body)}, headers=auth)
+
+def list_applications(client, auth, ipo_name: str) -> list[dict]:
+    """Every application of an IPO, as the full list returns them"""
+    response = client.get("/api", params={"action": "list", "ipoName": ipo_name}, headers=auth)
+    assert response.status_code == 200
+    return response.json()
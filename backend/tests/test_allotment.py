@@ -0,0 +1,73 @@
+"""Registrar allotment files: matching by PAN, dry runs and counter upkeep"""
+
+import pytest
+
+from conftest import import_csv, list_applications
+from counters import check_counters
+
+@pytest.fixture
+def applications(client, auth, ipo) -> dict[str, dict]:
+    """Six pending applications with money received, by PAN"""
+    lines = ["Name,PAN,IPO Name,Money Sent,Money Received"]
+    lines += [f"Applicant {i},ABCDE{i:04d}F,{ipo},yes,yes" for i in range(6)]
+    assert import_csv(client, auth, lines).json()["imported"] == 6
+    return {row["userPan"]: row for row in list_applications(client, auth, ipo)}
+
+def upload(client, auth, ipo: str, text: str, **params):
+    """POST a registrar file to /api/allotment"""
+    return client.post("/api/allotment", params={"ipoName": ipo, **params},
+                       files={"file": ("results.txt", text.encode())}, headers=auth)
+
+def statuses(client, auth, ipo: str) -> dict[str, tuple[str, bool]]:
+    """PAN -> (allotment status, money received)"""
+    return {row["userPan"]: (row["allotmentStatus"], row["moneyReceived"])
+            for row in list_applications(client, auth, ipo)}
+
+def test_csv_results_are_applied(client, auth, db, ipo, applications):
+    response = upload(client, auth, ipo, "\n".join([
+        "Sr,PAN,Shares Allotted",
+        "1,ABCDE0000F,15",
+        "2,abcde0001f,0",
+        "3,ABCDE0002F,Allotted",
+        "4,ZZZZZ9999Z,15",
+        "5,not a pan,15",
+        "6,ABCDE0003F,maybe",
+    ]))
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["lines"], report["matched"], report["allotted"], report["notAllotted"]) == (6, 3, 2, 1)
+    assert report["applicationsWithoutResult"] == 3
+    assert (report["unmatchedCount"], report["unmatchedPans"]) == (1, ["ZZZZZ9999Z"])
+    assert report["invalidLines"] == [
+        {"line": 6, "message": "No PAN found"}, {"line": 7, "message": "Unrecognised status"}
+    ]
+
+    result = statuses(client, auth, ipo)
+    assert result["ABCDE0000F"] == ("Allotted", True)
+    # Not Allotted never keeps money received
+    assert result["ABCDE0001F"] == ("Not Allotted", False)
+    assert result["ABCDE0003F"] == ("Pending", True)
+    assert check_counters(db) == []
+
+def test_plain_text_lines(client, auth, db, ipo, applications):
+    report = upload(client, auth, ipo, "ABCDE0004F\nABCDE0005F - Not Allotted\n").json()
+    assert (report["allotted"], report["notAllotted"]) == (1, 1)
+    result = statuses(client, auth, ipo)
+    assert (result["ABCDE0004F"][0], result["ABCDE0005F"][0]) == ("Allotted", "Not Allotted")
+    assert check_counters(db) == []
+
+def test_dry_run_changes_nothing(client, auth, db, ipo, applications):
+    summary = client.get("/api", params={"action": "summary", "ipoName": ipo}, headers=auth)
+    etag = summary.headers["ETag"]
+
+    report = upload(client, auth, ipo, "PAN,Status\nABCDE0000F,Allotted\n", dryRun="true").json()
+    assert (report["dryRun"], report["matched"], report["allotted"]) == (True, 1, 1)
+    assert statuses(client, auth, ipo)["ABCDE0000F"] == ("Pending", True)
+    # Nothing was written, so cached copies stay valid
+    again = client.get("/api", params={"action": "summary", "ipoName": ipo},
+                       headers={**auth, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert check_counters(db) == []
+
+def test_unknown_ipo_is_rejected(client, auth):
+    assert upload(client, auth, "No such IPO", "ABCDE0000F\n").status_code == 400
@@ -0,0 +1,77 @@
+"""Set-based updateRows and deleteRows: results, validation and counter upkeep"""
+
+import pytest
+
+import batch
+from conftest import import_csv, list_applications
+from counters import check_counters
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    """Split id lists into several slices even for a handful of rows"""
+    monkeypatch.setattr(batch, "ID_CHUNK_SIZE", 3)
+
+@pytest.fixture
+def applications(client, auth, ipo) -> list[dict]:
+    """Ten pending applications, half with money sent"""
+    lines = ["Name,PAN,IPO Name,Money Sent,Money Received"]
+    lines += [f"Applicant {i},ABCDE{i:04d}F,{ipo},{'yes' if i % 2 else 'no'},no" for i in range(10)]
+    assert import_csv(client, auth, lines).json()["imported"] == 10
+    return list_applications(client, auth, ipo)
+
+def post(client, auth, payload: dict):
+    """POST an /api action"""
+    return client.post("/api", json=payload, headers=auth)
+
+def test_update_rows_by_ids(client, auth, db, ipo, applications):
+    ids = [row["id"] for row in applications[:7]]
+    response = post(client, auth, {"action": "updateRows", "ids": ids + ["app-missing", ids[0]],
+                                   "data": {"allotmentStatus": "Allotted", "moneyReceived": True}})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 7
+    assert sorted(row["id"] for row in body["rows"]) == sorted(ids)
+    assert all(row["allotmentStatus"] == "Allotted" and row["moneyReceived"] for row in body["rows"])
+    assert check_counters(db) == []
+
+    summary = client.get("/api", params={"action": "summary", "ipoName": ipo}, headers=auth).json()
+    assert (summary["allotted"], summary["pending"]) == (7, 3)
+
+def test_not_allotted_clears_money_received(client, auth, db, ipo, applications):
+    ids = [row["id"] for row in applications]
+    post(client, auth, {"action": "updateRows", "ids": ids, "data": {"moneyReceived": True}})
+    post(client, auth, {"action": "updateRows", "ids": ids[:4], "data": {"allotmentStatus": "Not Allotted"}})
+    # Setting money received again must leave the Not Allotted rows alone
+    body = post(client, auth, {"action": "updateRows", "ids": ids, "data": {"moneyReceived": True}}).json()
+    received = {row["id"]: row["moneyReceived"] for row in body["rows"]}
+    assert [received[i] for i in ids] == [False] * 4 + [True] * 6
+    assert check_counters(db) == []
+
+def test_update_rows_by_filter(client, auth, db, ipo, applications):
+    response = post(client, auth, {"action": "updateRows", "filter": {"ipoName": ipo, "search": "Applicant 1"},
+                                   "data": {"allotmentStatus": "Not Allotted"}})
+    assert response.json()["updated"] == 1
+    assert check_counters(db) == []
+
+def test_delete_rows_by_ids_and_filter(client, auth, db, ipo, applications):
+    ids = [row["id"] for row in applications[:5]]
+    body = post(client, auth, {"action": "deleteRows", "ids": ids}).json()
+    assert (body["deleted"], sorted(body["ids"])) == (5, sorted(ids))
+    assert check_counters(db) == []
+
+    body = post(client, auth, {"action": "deleteRows", "filter": {"ipoName": ipo}}).json()
+    assert body["deleted"] == 5
+    assert list_applications(client, auth, ipo) == []
+    assert check_counters(db) == []
+
+@pytest.mark.parametrize("payload", [
+    {"action": "updateRows", "ids": [], "data": {}},
+    {"action": "updateRows", "ids": [], "data": {"allotmentStatus": "Maybe"}},
+    {"action": "updateRows", "data": {"moneySent": True}},
+    {"action": "updateRows", "ids": [], "filter": {"ipoName": "x"}, "data": {"moneySent": True}},
+    {"action": "deleteRows", "filter": {"unknown": "x"}},
+    {"action": "deleteRows", "ids": "app-1"},
+])
+def test_invalid_requests_are_rejected(client, auth, db, applications, payload):
+    assert post(client, auth, payload).status_code == 400
+    assert check_counters(db) == []
@@ -0,0 +1,82 @@
+"""Server-side CSV import: error reporting and counter upkeep"""
+
+from conftest import import_csv, list_applications
+import csv_import
+from counters import check_counters
+
+HEADER = "Name,PAN,Phone,IPO Name,Allotment Status,Money Sent,Money Received"
+
+def test_valid_rows_are_imported(client, auth, db, ipo):
+    response = import_csv(client, auth, [
+        HEADER,
+        f"Asha,abcde1234f,9000000001,{ipo},Allotted,yes,yes",
+        f"Ravi,ABCDE1235F,,{ipo},,no,no",
+    ])
+    assert response.status_code == 200
+    report = response.json()
+    assert report["success"] is True
+    assert (report["rows"], report["imported"], report["applicantsCreated"]) == (2, 2, 2)
+    assert report["errors"] == []
+
+    rows = {row["userPan"]: row for row in list_applications(client, auth, ipo)}
+    assert rows["ABCDE1234F"]["allotmentStatus"] == "Allotted"
+    assert rows["ABCDE1234F"]["moneyReceived"] is True
+    assert rows["ABCDE1235F"]["allotmentStatus"] == "Pending"
+    assert check_counters(db) == []
+
+def test_invalid_cells_are_reported_by_line_and_field(client, auth, db, ipo):
+    response = import_csv(client, auth, [
+        HEADER,
+        f"Asha,ABCDE1234F,,{ipo},Pending,no,no",
+        f",BADPAN,,{ipo},Pending,no,no",
+        "",
+        f"Ravi,ABCDE1235F,,No such IPO,Maybe,perhaps,no",
+    ])
+    report = response.json()
+    assert report["success"] is False
+    assert (report["rows"], report["imported"], report["errorCount"]) == (3, 1, 5)
+    assert [(e["row"], e["field"]) for e in report["errors"]] == [
+        (3, "Name"), (3, "PAN"), (5, "IPO Name"), (5, "Allotment Status"), (5, "Money Sent"),
+    ]
+    assert len(list_applications(client, auth, ipo)) == 1
+    assert check_counters(db) == []
+
+def test_missing_columns_stop_the_import(client, auth, ipo):
+    report = import_csv(client, auth, ["Name,Phone", "Asha,9000000001"]).json()
+    assert report["imported"] == 0
+    assert report["errors"] == [
+        {"row": 1, "field": "Header", "message": "Missing column(s): pan, ipo name"}
+    ]
+
+def test_empty_file_is_reported(client, auth):
+    report = import_csv(client, auth, []).json()
+    assert report["errors"] == [{"row": 1, "field": "File", "message": "CSV file is empty"}]
+
+def test_unreadable_bytes_keep_earlier_batches(client, auth, db, ipo):
+    lines = [HEADER] + [f"Asha,ABCDE{i:04d}F,,{ipo},Pending,no,no" for i in range(50)]
+    body = "\n".join(lines).encode() + b"\n\xff\xfe,broken\n"
+    response = client.post("/api/import", params={"batchSize": 10},
+                           files={"file": ("import.csv", body)}, headers=auth)
+    report = response.json()
+    assert [e["field"] for e in report["errors"]] == ["File"]
+    assert report["errors"][0]["message"].startswith("Could not read CSV")
+    # Whole batches read before the bad bytes stay committed; the partial one is rolled back
+    assert report["imported"] > 0
+    assert report["imported"] % 10 == 0
+    assert len(list_applications(client, auth, ipo)) == report["imported"]
+    assert check_counters(db) == []
+
+def test_errors_beyond_the_limit_are_only_counted(client, auth, ipo, monkeypatch):
+    monkeypatch.setattr(csv_import, "MAX_REPORTED_ERRORS", 2)
+    report = import_csv(client, auth, [HEADER] + [f"Asha,BAD{i},,{ipo},,no,no" for i in range(5)]).json()
+    assert report["errorCount"] == 5
+    assert len(report["errors"]) == 2
+
+def test_reimport_skips_existing_applications(client, auth, db, ipo):
+    lines = [HEADER, f"Asha,ABCDE1234F,9000000001,{ipo},Pending,no,no"]
+    import_csv(client, auth, lines)
+    report = import_csv(client, auth, [HEADER, f"Asha K,ABCDE1234F,9000000002,{ipo},Pending,no,no"]).json()
+    assert (report["imported"], report["skipped"], report["applicantsUpdated"]) == (0, 1, 1)
+    [row] = list_applications(client, auth, ipo)
+    assert (row["userName"], row["userPhone"]) == ("Asha K", "9000000002")
+    assert check_counters(db) == []
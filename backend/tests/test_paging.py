@@ -0,0 +1,56 @@
+"""Cursor paging of action=list over every sort field and direction"""
+
+import pytest
+
+from conftest import import_csv
+from queries import SORT_COLUMNS
+
+@pytest.fixture
+def applications(client, auth, ipo) -> list[str]:
+    """Ids of applications with many ties on every sort field"""
+    lines = ["Name,PAN,Phone,IPO Name,Allotment Status,Money Sent,Money Received"]
+    statuses = ("Pending", "Allotted", "Not Allotted")
+    for i in range(23):
+        # Names, phones, statuses and money flags repeat so pages split runs of equal values
+        lines.append(f"Applicant {i % 4},ABCDE{i:04d}F,98{i % 3},{ipo},{statuses[i % 3]},"
+                     f"{'yes' if i % 2 else 'no'},{'yes' if i % 5 == 0 else 'no'}")
+    response = import_csv(client, auth, lines, batchSize=5)
+    assert response.json()["imported"] == 23
+    page = client.get("/api", params={"action": "list", "ipoName": ipo, "pageSize": 100}, headers=auth).json()
+    return [item["id"] for item in page["items"]]
+
+def page_through(client, auth, ipo: str, sort_field: str, sort_dir: str, page_size: int) -> list[str]:
+    """Follow nextCursor to the end; returns the ids in the order they arrived"""
+    params = {"action": "list", "ipoName": ipo, "sortField": sort_field, "sortDir": sort_dir,
+              "pageSize": page_size}
+    ids, total = [], None
+    while True:
+        response = client.get("/api", params=params, headers=auth)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        if total is None:
+            total = body["total"]
+        else:
+            assert body["total"] is None
+        ids += [item["id"] for item in body["items"]]
+        if body["nextCursor"] is None:
+            assert total == len(ids)
+            return ids
+        params["cursor"] = body["nextCursor"]
+
+@pytest.mark.parametrize("sort_dir", ["asc", "desc"])
+@pytest.mark.parametrize("sort_field", list(SORT_COLUMNS))
+def test_pages_match_one_big_page(client, auth, ipo, applications, sort_field, sort_dir):
+    expected = page_through(client, auth, ipo, sort_field, sort_dir, 100)
+    assert sorted(expected) == sorted(applications)
+    assert page_through(client, auth, ipo, sort_field, sort_dir, 4) == expected
+
+def test_cursor_for_another_sort_is_rejected(client, auth, ipo, applications):
+    params = {"action": "list", "ipoName": ipo, "sortField": "userName", "sortDir": "asc", "pageSize": 5}
+    cursor = client.get("/api", params=params, headers=auth).json()["nextCursor"]
+    response = client.get("/api", params={**params, "sortDir": "desc", "cursor": cursor}, headers=auth)
+    assert response.status_code == 400
+
+def test_unknown_sort_field_is_rejected(client, auth, ipo):
+    params = {"action": "list", "ipoName": ipo, "sortField": "password", "pageSize": 5}
+    assert client.get("/api", params=params, headers=auth).status_code == 400
@@ -9,6 +9,7 @@ import { EditApplicationModal } from './components/EditApplicationModal';
 import { AddApplicationsModal } from './components/AddApplicationsModal';
 import { UserManagementModal } from './components/UserManagementModal';
 import { DeleteConfirmModal } from './components/DeleteConfirmModal';
+import { CsvImportExport } from './components/CsvImportExport';
 import { Toast } from './components/Toast';
 import { LoginPage } from './components/LoginPage';
 import { AdminPage } from './components/AdminPage';
@@ -16,8 +17,11 @@ import { AuthProvider, useAuth } from './contexts/AuthContext';
 import { useFetchRows } from './hooks/useFetchRows';
 import { useIpoList } from './hooks/useIpoList';
 import { usePagination } from './hooks/usePagination';
+import { useServerRows } from './hooks/useServerRows';
+import { useSummary } from './hooks/useSummary';
 import { useApi } from './hooks/useApi';
-import type { IpoApplication, IpoApplicationInput, Applicant, ApplicantInput, FilterState, SortState } from './types';
+import { SERVER_PAGINATION } from './config';
+import type { IpoApplication, IpoApplicationInput, Applicant, ApplicantInput, FilterState, SortState, ImportResult, ChangeSet } from './types';
 import { LogOut } from 'lucide-react';
 
 interface ToastState {
@@ -27,13 +31,29 @@ interface ToastState {
 
 function MainApp() {
   const { logout, username } = useAuth();
-  const { rows, loading, error, lastSync, refresh, setRows } = useFetchRows();
-  const { ipos, addIpo, refresh: refreshIpos } = useIpoList();
-  const api = useApi();
 
   // Users state
   const [users, setUsers] = useState<Applicant[]>([]);
 
+  // Applicant changes arrive with each incremental row sync
+  const mergeUserChanges = useCallback((changes: ChangeSet) => {
+    const deleted = new Set(changes.deleted?.applicants ?? []);
+    const changed = changes.applicants ?? [];
+    if (deleted.size === 0 && changed.length === 0) return;
+
+    setUsers(prev => {
+      const byId = new Map(prev.filter(user => !deleted.has(user.id)).map(user => [user.id, user]));
+      changed.forEach(user => byId.set(user.id, user));
+      return [...byId.values()].sort((a, b) => a.name.localeCompare(b.name));
+    });
+  }, []);
+
+  // With server-side pagination the full list is never downloaded; useServerRows below fetches pages
+  const fullList = useFetchRows({ onChanges: mergeUserChanges, enabled: !SERVER_PAGINATION });
+  const { rows, refresh, setRows } = fullList;
+  const { ipos, addIpo, refresh: refreshIpos } = useIpoList();
+  const api = useApi();
+
   const [filters, setFilters] = useState<FilterState>({
     ipoName: '',
     allotmentStatus: '',
@@ -126,6 +146,29 @@ function MainApp() {
   const { paginatedItems, pagination, totalPages, goToPage, setPageSize } =
     usePagination(filteredAndSortedRows, 10);
 
+  // Server-side pagination replaces the in-memory filter/sort/page above
+  const serverRows = useServerRows(filters, sortState, SERVER_PAGINATION, 10);
+  const tableRows = SERVER_PAGINATION ? serverRows.rows : paginatedItems;
+  const { summary, refresh: refreshSummary } = useSummary(filters.ipoName);
+  const applicationCount = SERVER_PAGINATION
+    ? serverRows.pagination.totalItems
+    : filteredAndSortedRows.length;
+  // Only the first page blocks the screen; later page loads keep the table up
+  const loading = SERVER_PAGINATION ? serverRows.loading && serverRows.lastSync === null : fullList.loading;
+  const error = SERVER_PAGINATION ? serverRows.error : fullList.error;
+  const lastSync = SERVER_PAGINATION ? serverRows.lastSync : fullList.lastSync;
+
+  // Reload rows and applicants; paged mode has no delta sync to carry applicant changes
+  const refreshServerRows = serverRows.refresh;
+  const syncRows = useCallback(async () => {
+    if (SERVER_PAGINATION) {
+      refreshServerRows();
+      await fetchUsers();
+    } else {
+      await refresh();
+    }
+  }, [refreshServerRows, fetchUsers, refresh]);
+
   const handleSort = (field: keyof IpoApplication) => {
     setSortState(prev => ({
       field,
@@ -135,7 +178,9 @@ function MainApp() {
 
   const handleRefresh = async () => {
     setIsRefreshing(true);
-    await Promise.all([refresh(), refreshIpos(), fetchUsers()]);
+    // Rows and applicants sync incrementally
+    await Promise.all([syncRows(), refreshIpos()]);
+    refreshSummary();
     setIsRefreshing(false);
     showToast('Data refreshed successfully', 'success');
   };
@@ -154,6 +199,8 @@ function MainApp() {
     const response = await api.addBulkApplications(ipoName, userIds);
     if (response.success) {
       await refresh();
+      serverRows.refresh();
+      refreshSummary();
       showToast(`${response.data?.created || userIds.length} application(s) added successfully`, 'success');
     } else {
       showToast(response.error || 'Failed to add applications', 'error');
@@ -170,6 +217,8 @@ function MainApp() {
     const response = await api.updateRow(id, data);
     if (response.success && response.data) {
       setRows(prev => prev.map(row => (row.id === id ? response.data! : row)));
+      serverRows.setRows(prev => prev.map(row => (row.id === id ? response.data! : row)));
+      refreshSummary();
       showToast('Application updated successfully', 'success');
     } else {
       showToast(response.error || 'Failed to update application', 'error');
@@ -193,6 +242,8 @@ function MainApp() {
     const response = await api.deleteRow(deletingApplication.id);
     if (response.success) {
       setRows(prev => prev.filter(row => row.id !== deletingApplication.id));
+      serverRows.refresh();
+      refreshSummary();
       showToast('Application deleted successfully', 'success');
     } else {
       showToast(response.error || 'Failed to delete application', 'error');
@@ -202,6 +253,17 @@ function MainApp() {
     setDeletingApplication(null);
   };
 
+  const handleImported = async (result: ImportResult) => {
+    if (result.imported > 0 || result.applicantsCreated > 0 || result.applicantsUpdated > 0) {
+      await syncRows();
+      refreshSummary();
+    }
+    showToast(
+      `Imported ${result.imported} application(s)${result.errorCount > 0 ? `, ${result.errorCount} row error(s)` : ''}`,
+      result.errorCount > 0 ? 'info' : 'success'
+    );
+  };
+
   // User management handlers
   const handleAddUser = async (data: ApplicantInput) => {
     const response = await api.addUser(data);
@@ -254,7 +316,7 @@ function MainApp() {
             Please check if the backend server is running on port 9000.
           </p>
           <button
-            onClick={refresh}
+            onClick={syncRows}
             className="w-full px-4 py-2 text-sm font-medium text-white bg-blue-600 rounded-lg hover:bg-blue-700 transition-colors"
           >
             Retry Connection
@@ -300,26 +362,37 @@ function MainApp() {
           <div className="lg:col-span-3 space-y-6">
             <div className="flex items-center justify-between">
               <h2 className="text-lg font-semibold text-gray-900">
-                {filteredAndSortedRows.length} Application{filteredAndSortedRows.length !== 1 ? 's' : ''}
+                {applicationCount} Application{applicationCount !== 1 ? 's' : ''}
               </h2>
+              <CsvImportExport filters={filters} sortState={sortState} onImported={handleImported} />
             </div>
 
-            <SummaryCard rows={filteredAndSortedRows} selectedIpo={filters.ipoName} />
+            <SummaryCard summary={summary} selectedIpo={filters.ipoName} />
 
             <ApplicantsTable
-              rows={paginatedItems}
+              rows={tableRows}
               onEdit={handleEdit}
               onDelete={handleDelete}
               sortState={sortState}
               onSort={handleSort}
             />
 
-            <Pagination
-              pagination={pagination}
-              totalPages={totalPages}
-              onPageChange={goToPage}
-              onPageSizeChange={setPageSize}
-            />
+            {SERVER_PAGINATION ? (
+              <Pagination
+                pagination={serverRows.pagination}
+                totalPages={serverRows.totalPages}
+                onPageChange={serverRows.goToPage}
+                onPageSizeChange={serverRows.setPageSize}
+                hasNextPage={serverRows.hasNextPage}
+              />
+            ) : (
+              <Pagination
+                pagination={pagination}
+                totalPages={totalPages}
+                onPageChange={goToPage}
+                onPageSizeChange={setPageSize}
+              />
+            )}
           </div>
         </div>
       </main>
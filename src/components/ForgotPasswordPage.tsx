@@ -59,7 +59,7 @@ export function ForgotPasswordPage({ onBackToLogin }: ForgotPasswordPageProps) {
 
       if (data.success) {
         setStep('success');
-        setSuccess('New password has been sent to your email.');
+        setSuccess('New password will be sent to your email.');
       } else {
         setError(data.error || 'Invalid OTP');
       }
@@ -249,7 +249,7 @@ export function ForgotPasswordPage({ onBackToLogin }: ForgotPasswordPageProps) {
               <div>
                 <h3 className="text-lg font-semibold text-gray-900 mb-2">Password Reset Successful</h3>
                 <p className="text-gray-600">
-                  A new password has been sent to <span className="font-medium">{email}</span>.
+                  A new password will be sent to <span className="font-medium">{email}</span>.
                   Please check your inbox and use the new password to login.
                 </p>
               </div>
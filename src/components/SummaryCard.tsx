@@ -1,25 +1,18 @@
 import { TrendingUp, Users, DollarSign, CheckCircle, Clock, XCircle } from 'lucide-react';
-import type { IpoApplication } from '../types';
+import type { ApplicationSummary } from '../types';
 
 interface SummaryCardProps {
-  rows: IpoApplication[];
+  summary: ApplicationSummary | null;
   selectedIpo: string;
 }
 
-export function SummaryCard({ rows, selectedIpo }: SummaryCardProps) {
-  const filteredRows = selectedIpo ? rows.filter(r => r.ipoName === selectedIpo) : rows;
-
-  const totalApplicants = filteredRows.length;
-  const totalAmount = filteredRows.reduce((sum, row) => sum + row.ipoAmount, 0);
-
-  // Count by status
-  const pendingCount = filteredRows.filter(r => r.allotmentStatus === 'Pending').length;
-  const allottedCount = filteredRows.filter(r => r.allotmentStatus === 'Allotted').length;
-  const notAllottedCount = filteredRows.filter(r => r.allotmentStatus === 'Not Allotted').length;
-
-  // Money tracking
-  const moneySentCount = filteredRows.filter(r => r.moneySent).length;
-  const pendingRefundCount = filteredRows.filter(r => r.allotmentStatus === 'Not Allotted' && !r.moneyReceived).length;
+export function SummaryCard({ summary, selectedIpo }: SummaryCardProps) {
+  const totalApplicants = summary?.applications ?? 0;
+  const totalAmount = summary?.totalAmount ?? 0;
+  const pendingCount = summary?.pending ?? 0;
+  const allottedCount = summary?.allotted ?? 0;
+  const notAllottedCount = summary?.notAllotted ?? 0;
+  const pendingRefundCount = summary?.pendingRefund ?? 0;
 
   const formatCurrency = (amount: number) => {
     return new Intl.NumberFormat('en-IN', {
@@ -9,3 +9,10 @@ export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL ||
 
 export const USE_MOCK = import.meta.env.VITE_USE_MOCK === 'true';
 export const DEBUG = import.meta.env.VITE_DEBUG === 'true';
+
+// Let the server filter, sort and paginate the application list
+export const SERVER_PAGINATION = import.meta.env.VITE_SERVER_PAGINATION === 'true';
+
+// Ask for the compact format=columnar list. Off by default: the server builds a
+// columnar full list in memory, while the default row format is streamed.
+export const COLUMNAR_LIST = import.meta.env.VITE_COLUMNAR_LIST === 'true';
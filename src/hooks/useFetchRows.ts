@@ -1,22 +1,56 @@
-import { useState, useEffect, useCallback } from 'react';
-import type { IpoApplication } from '../types';
+import { useState, useEffect, useCallback, useRef } from 'react';
+import type { IpoApplication, ChangeSet } from '../types';
 import { useApi } from './useApi';
 
-export function useFetchRows() {
+// Apply a change set to the full list: drop deleted ids, replace changed rows, add new ones first
+export function mergeChanges(rows: IpoApplication[], changes: ChangeSet): IpoApplication[] {
+  const deleted = new Set(changes.deleted?.applications ?? []);
+  const changed = new Map((changes.applications ?? []).map(row => [row.id, row]));
+  if (deleted.size === 0 && changed.size === 0) {
+    return rows;
+  }
+
+  const merged: IpoApplication[] = [];
+  for (const row of rows) {
+    if (deleted.has(row.id)) continue;
+    const update = changed.get(row.id);
+    if (update) {
+      merged.push(update);
+      changed.delete(row.id);
+    } else {
+      merged.push(row);
+    }
+  }
+  // Whatever is left was created since the last sync
+  return [...changed.values(), ...merged];
+}
+
+interface FetchRowsOptions {
+  // Called with every incremental change set (e.g. to merge applicants too)
+  onChanges?: (changes: ChangeSet) => void;
+  // When false (server-side pagination) the full list is never downloaded
+  enabled?: boolean;
+}
+
+export function useFetchRows({ onChanges, enabled = true }: FetchRowsOptions = {}) {
   const [rows, setRows] = useState<IpoApplication[]>([]);
-  const [loading, setLoading] = useState(true);
+  const [loading, setLoading] = useState(enabled);
   const [error, setError] = useState<string | null>(null);
   const [lastSync, setLastSync] = useState<Date | null>(null);
+  const versionRef = useRef<number | null>(null);
+  const onChangesRef = useRef(onChanges);
+  onChangesRef.current = onChanges;
   const api = useApi();
 
   const fetchRows = useCallback(async () => {
     setLoading(true);
     setError(null);
 
-    const response = await api.listRows();
+    const response = await api.listRowsVersioned();
 
     if (response.success && response.data) {
-      setRows(response.data);
+      setRows(response.data.rows);
+      versionRef.current = response.data.version;
       setLastSync(new Date());
     } else {
       setError(response.error || 'Failed to fetch rows');
@@ -25,13 +59,38 @@ export function useFetchRows() {
     setLoading(false);
   }, [api]);
 
+  // Fetch only what changed since the last sync; falls back to a full load
+  const syncRows = useCallback(async () => {
+    if (!enabled) return;
+    const version = versionRef.current;
+    if (version === null) {
+      return fetchRows();
+    }
+
+    const response = await api.getChangesSince(version);
+    if (!response.success || !response.data) {
+      return fetchRows();
+    }
+    if (response.data.full) {
+      return fetchRows();
+    }
+
+    const changes = response.data;
+    versionRef.current = changes.version;
+    setRows(prev => mergeChanges(prev, changes));
+    setLastSync(new Date());
+    onChangesRef.current?.(changes);
+  }, [api, enabled, fetchRows]);
+
   useEffect(() => {
-    fetchRows();
-  }, [fetchRows]);
+    if (enabled) {
+      fetchRows();
+    }
+  }, [enabled, fetchRows]);
 
   const refresh = useCallback(() => {
-    fetchRows();
-  }, [fetchRows]);
+    return syncRows();
+  }, [syncRows]);
 
-  return { rows, loading, error, lastSync, refresh, setRows };
+  return { rows, loading, error, lastSync, refresh, reload: fetchRows, setRows };
 }
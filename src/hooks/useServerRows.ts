@@ -0,0 +1,117 @@
+import { useState, useEffect, useCallback } from 'react';
+import type { IpoApplication, FilterState, SortState, PaginationState } from '../types';
+import { useApi } from './useApi';
+
+// Fetches one page at a time from the server. Pages are addressed by keyset
+// cursors, so we keep the cursor that opened each visited page to go back.
+export function useServerRows(filters: FilterState, sortState: SortState, enabled: boolean, initialPageSize = 10) {
+  const [rows, setRows] = useState<IpoApplication[]>([]);
+  const [pageSize, setPageSizeState] = useState(initialPageSize);
+  const [cursorState, setCursorState] = useState<{ key: string; cursors: (string | null)[] }>({
+    key: '',
+    cursors: [null],
+  });
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [totalItems, setTotalItems] = useState(0);
+  const [loading, setLoading] = useState(enabled);
+  const [error, setError] = useState<string | null>(null);
+  const [lastSync, setLastSync] = useState<Date | null>(null);
+  const [reloadKey, setReloadKey] = useState(0);
+  const api = useApi();
+
+  // Any change to filters, sort or page size starts again from page 1
+  const queryKey = JSON.stringify([filters, sortState, pageSize]);
+  const cursors = cursorState.key === queryKey ? cursorState.cursors : [null];
+  const currentCursor = cursors[cursors.length - 1];
+
+  useEffect(() => {
+    if (!enabled) return;
+    let cancelled = false;
+
+    const fetchPage = async () => {
+      setLoading(true);
+      setError(null);
+
+      const response = await api.listRowsPage({
+        ipoName: filters.ipoName,
+        allotmentStatus: filters.allotmentStatus,
+        search: filters.searchQuery,
+        sortField: sortState.field ?? 'createdAt',
+        sortDir: sortState.direction,
+        pageSize,
+        cursor: currentCursor,
+      });
+
+      if (cancelled) return;
+
+      if (response.success && response.data) {
+        setRows(response.data.items);
+        setNextCursor(response.data.nextCursor);
+        if (response.data.total !== null) {
+          setTotalItems(response.data.total);
+        }
+        setLastSync(new Date());
+      } else {
+        setError(response.error || 'Failed to fetch rows');
+      }
+
+      setLoading(false);
+    };
+
+    fetchPage();
+    return () => {
+      cancelled = true;
+    };
+  }, [api, enabled, filters, sortState, pageSize, currentCursor, reloadKey]);
+
+  const nextPage = useCallback(() => {
+    if (nextCursor) {
+      setCursorState({ key: queryKey, cursors: [...cursors, nextCursor] });
+    }
+  }, [queryKey, cursors, nextCursor]);
+
+  const prevPage = useCallback(() => {
+    if (cursors.length > 1) {
+      setCursorState({ key: queryKey, cursors: cursors.slice(0, -1) });
+    }
+  }, [queryKey, cursors]);
+
+  const goToPage = useCallback(
+    (page: number) => {
+      if (page === cursors.length + 1) {
+        nextPage();
+      } else if (page === cursors.length - 1) {
+        prevPage();
+      }
+    },
+    [cursors.length, nextPage, prevPage]
+  );
+
+  const setPageSize = useCallback((size: number) => {
+    setPageSizeState(size);
+  }, []);
+
+  const refresh = useCallback(() => {
+    setReloadKey(key => key + 1);
+  }, []);
+
+  const pagination: PaginationState = {
+    currentPage: cursors.length,
+    pageSize,
+    totalItems,
+  };
+
+  return {
+    rows,
+    setRows,
+    loading,
+    error,
+    lastSync,
+    pagination,
+    totalPages: Math.max(1, Math.ceil(totalItems / pageSize)),
+    hasNextPage: nextCursor !== null,
+    goToPage,
+    setPageSize,
+    refresh,
+  };
+}
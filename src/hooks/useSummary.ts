@@ -0,0 +1,32 @@
+import { useState, useEffect, useCallback } from 'react';
+import { useApi } from './useApi';
+import type { ApplicationSummary } from '../types';
+
+// Dashboard totals computed by the server for one IPO, or all when ipoName is empty
+export function useSummary(ipoName: string) {
+  const [summary, setSummary] = useState<ApplicationSummary | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState<string | null>(null);
+  const api = useApi();
+
+  const fetchSummary = useCallback(async () => {
+    setLoading(true);
+    setError(null);
+
+    const response = await api.getSummary(ipoName);
+
+    if (response.success && response.data) {
+      setSummary(response.data);
+    } else {
+      setError(response.error || 'Failed to fetch summary');
+    }
+
+    setLoading(false);
+  }, [api, ipoName]);
+
+  useEffect(() => {
+    fetchSummary();
+  }, [fetchSummary]);
+
+  return { summary, loading, error, refresh: fetchSummary };
+}
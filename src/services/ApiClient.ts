@@ -1,5 +1,10 @@
-import type { IpoApplication, IpoApplicationInput, Applicant, ApplicantInput, Ipo, ApiResponse } from '../types';
-import { DEBUG } from '../config';
+import type {
+  IpoApplication, IpoApplicationInput, Applicant, ApplicantInput, Ipo, ApiResponse,
+  ListQuery, ApplicationPage, ImportResult, ExportQuery, ExportFile, ApplicationSummary,
+  BatchTarget, BatchUpdateResult, BatchDeleteResult, AllotmentResult, VersionedRows, ChangeSet,
+  ColumnarApplications,
+} from '../types';
+import { DEBUG, COLUMNAR_LIST } from '../config';
 
 interface RetryConfig {
   maxRetries: number;
@@ -13,6 +18,87 @@ const DEFAULT_RETRY_CONFIG: RetryConfig = {
   maxDelay: 10000,
 };
 
+interface CachedResponse {
+  etag: string;
+  body: string;
+  contentType: string;
+  dataVersion: string | null;
+}
+
+// GET responses kept for If-None-Match revalidation (oldest dropped first),
+// shared by every ApiClient instance
+const ETAG_CACHE_SIZE = 50;
+const etagCache = new Map<string, CachedResponse>();
+
+// ==================== Columnar decoding ====================
+
+function unpackBooleans(packed: string, count: number): Uint8Array {
+  const bytes = Uint8Array.from(atob(packed), c => c.charCodeAt(0));
+  const values = new Uint8Array(count);
+  for (let i = 0; i < count; i++) {
+    values[i] = (bytes[i >> 3] >> (i & 7)) & 1;
+  }
+  return values;
+}
+
+// Python's datetime.isoformat() of a naive UTC time: microseconds only when non-zero
+function isoFromMicros(micros: number): string {
+  const seconds = new Date(Math.floor(micros / 1000)).toISOString().slice(0, 19);
+  const fraction = micros % 1e6;
+  return fraction ? `${seconds}.${String(fraction).padStart(6, '0')}` : seconds;
+}
+
+// Rows of a format=columnar response. The result is a real array (map, filter,
+// spread and for..of all work) but each IpoApplication is only built the first
+// time its index is read, then kept.
+export function decodeColumnar(data: ColumnarApplications): IpoApplication[] {
+  const { count, idPrefix, dictionaries: dict, columns } = data;
+  const moneySent = unpackBooleans(columns.moneySent, count);
+  const moneyReceived = unpackBooleans(columns.moneyReceived, count);
+  const createdAt = new Float64Array(count);
+  let micros = 0;
+  for (let i = 0; i < count; i++) {
+    micros += columns.createdAt[i];
+    createdAt[i] = micros;
+  }
+
+  const build = (i: number): IpoApplication => {
+    const ipo = columns.ipo[i];
+    const user = columns.user[i];
+    return {
+      id: idPrefix + columns.id[i],
+      ipoName: dict.ipoName[ipo],
+      userId: dict.userId[user],
+      userName: dict.userName[user],
+      userPan: dict.userPan[user],
+      userPhone: dict.userPhone[user],
+      ipoAmount: dict.ipoAmount[ipo],
+      moneySent: moneySent[i] === 1,
+      moneyReceived: moneyReceived[i] === 1,
+      allotmentStatus: dict.allotmentStatus[columns.allotmentStatus[i]],
+      createdAt: isoFromMicros(createdAt[i]),
+    };
+  };
+
+  // Filled with undefined rather than left sparse, so array methods visit every index
+  const rows: (IpoApplication | undefined)[] = new Array(count).fill(undefined);
+  return new Proxy(rows, {
+    get(target, prop, receiver) {
+      if (typeof prop === 'string') {
+        const i = Number(prop);
+        if (Number.isInteger(i) && i >= 0 && i < count && target[i] === undefined) {
+          target[i] = build(i);
+        }
+      }
+      return Reflect.get(target, prop, receiver);
+    },
+  }) as IpoApplication[];
+}
+
+function isColumnar(data: unknown): data is ColumnarApplications {
+  return typeof data === 'object' && data !== null && (data as { format?: unknown }).format === 'columnar';
+}
+
 class ApiClient {
   private baseUrl: string;
   private retryConfig: RetryConfig;
@@ -50,6 +136,8 @@ class ApiClient {
     options: RequestInit,
     attempt = 0
   ): Promise<Response> {
+    const isGet = (options.method || 'GET') === 'GET';
+    const cached = isGet ? etagCache.get(url) : undefined;
     try {
       this.log(`Attempt ${attempt + 1}: ${options.method || 'GET'} ${url}`);
       const optionsWithAuth = {
@@ -57,11 +145,26 @@ class ApiClient {
         headers: {
           ...options.headers,
           ...this.getAuthHeaders(),
+          ...(cached ? { 'If-None-Match': cached.etag } : {}),
         },
       };
       const response = await fetch(url, optionsWithAuth);
 
+      // Unchanged since our copy: replay the cached body
+      if (response.status === 304 && cached) {
+        this.log(`Not modified: ${url}`);
+        etagCache.delete(url);
+        etagCache.set(url, cached);
+        const headers: Record<string, string> = { 'Content-Type': cached.contentType, 'ETag': cached.etag };
+        if (cached.dataVersion) headers['X-Data-Version'] = cached.dataVersion;
+        return new Response(cached.body, { status: 200, headers });
+      }
+
       if (response.ok) {
+        const etag = response.headers.get('ETag');
+        if (isGet && etag) {
+          await this.cacheResponse(url, etag, response.clone());
+        }
         return response;
       }
 
@@ -84,6 +187,22 @@ class ApiClient {
     }
   }
 
+  private async cacheResponse(url: string, etag: string, response: Response): Promise<void> {
+    const body = await response.text();
+    etagCache.delete(url);
+    etagCache.set(url, {
+      etag,
+      body,
+      contentType: response.headers.get('Content-Type') || 'application/json',
+      dataVersion: response.headers.get('X-Data-Version'),
+    });
+    while (etagCache.size > ETAG_CACHE_SIZE) {
+      const oldest = etagCache.keys().next().value;
+      if (oldest === undefined) break;
+      etagCache.delete(oldest);
+    }
+  }
+
   private async postJson(payload: Record<string, unknown>): Promise<Response> {
     return this.fetchWithRetry(this.baseUrl, {
       method: 'POST',
@@ -97,8 +216,16 @@ class ApiClient {
   // ==================== Applications ====================
 
   async listRows(): Promise<ApiResponse<IpoApplication[]>> {
+    const response = await this.listRowsVersioned();
+    if (!response.success || !response.data) {
+      return { success: false, error: response.error };
+    }
+    return { success: true, data: response.data.rows };
+  }
+
+  async listRowsVersioned(): Promise<ApiResponse<VersionedRows>> {
     try {
-      const url = `${this.baseUrl}?action=list`;
+      const url = `${this.baseUrl}?action=list${COLUMNAR_LIST ? '&format=columnar' : ''}`;
       const response = await this.fetchWithRetry(url, { method: 'GET' });
 
       if (!response.ok) {
@@ -106,7 +233,12 @@ class ApiClient {
       }
 
       const data = await response.json();
-      return { success: true, data: Array.isArray(data) ? data : [] };
+      const version = response.headers.get('X-Data-Version');
+      const rows = isColumnar(data) ? decodeColumnar(data) : Array.isArray(data) ? data : [];
+      return {
+        success: true,
+        data: { rows, version: version ? Number(version) : null },
+      };
     } catch (error) {
       this.log('Error in listRows:', error);
       return {
@@ -116,6 +248,85 @@ class ApiClient {
     }
   }
 
+  async getChangesSince(version: number): Promise<ApiResponse<ChangeSet>> {
+    try {
+      const url = `${this.baseUrl}?action=changesSince&version=${version}`;
+      const response = await this.fetchWithRetry(url, { method: 'GET' });
+
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+
+      const data = await response.json();
+      return { success: true, data };
+    } catch (error) {
+      this.log('Error in getChangesSince:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to fetch changes',
+      };
+    }
+  }
+
+  async listRowsPage(query: ListQuery): Promise<ApiResponse<ApplicationPage>> {
+    try {
+      const params = new URLSearchParams({ action: 'list', pageSize: String(query.pageSize) });
+      if (COLUMNAR_LIST) params.set('format', 'columnar');
+      if (query.ipoName) params.set('ipoName', query.ipoName);
+      if (query.allotmentStatus) params.set('allotmentStatus', query.allotmentStatus);
+      if (query.search) params.set('search', query.search);
+      if (query.sortField) params.set('sortField', query.sortField);
+      if (query.sortDir) params.set('sortDir', query.sortDir);
+      if (query.cursor) params.set('cursor', query.cursor);
+
+      const url = `${this.baseUrl}?${params.toString()}`;
+      const response = await this.fetchWithRetry(url, { method: 'GET' });
+
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+
+      const data = await response.json();
+      return {
+        success: true,
+        data: {
+          items: isColumnar(data.items) ? decodeColumnar(data.items) : Array.isArray(data.items) ? data.items : [],
+          nextCursor: data.nextCursor ?? null,
+          total: data.total ?? null,
+        },
+      };
+    } catch (error) {
+      this.log('Error in listRowsPage:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to fetch applications',
+      };
+    }
+  }
+
+  async getSummary(ipoName?: string): Promise<ApiResponse<ApplicationSummary>> {
+    try {
+      const params = new URLSearchParams({ action: 'summary' });
+      if (ipoName) params.set('ipoName', ipoName);
+
+      const url = `${this.baseUrl}?${params.toString()}`;
+      const response = await this.fetchWithRetry(url, { method: 'GET' });
+
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+
+      const data = await response.json();
+      return { success: true, data };
+    } catch (error) {
+      this.log('Error in getSummary:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to fetch summary',
+      };
+    }
+  }
+
   async updateRow(id: string, rowData: Partial<IpoApplicationInput>): Promise<ApiResponse<IpoApplication>> {
     try {
       const payload = { action: 'updateRow', id, data: rowData };
@@ -157,6 +368,133 @@ class ApiClient {
     }
   }
 
+  async updateRows(
+    target: BatchTarget,
+    rowData: Partial<IpoApplicationInput>
+  ): Promise<ApiResponse<BatchUpdateResult>> {
+    try {
+      const payload = { action: 'updateRows', ...target, data: rowData };
+      const response = await this.postJson(payload);
+
+      if (!response.ok) {
+        const errorText = await response.text();
+        throw new Error(`HTTP ${response.status}: ${errorText || response.statusText}`);
+      }
+
+      const data = await response.json();
+      return { success: true, data };
+    } catch (error) {
+      this.log('Error in updateRows:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to update applications',
+      };
+    }
+  }
+
+  async deleteRows(target: BatchTarget): Promise<ApiResponse<BatchDeleteResult>> {
+    try {
+      const payload = { action: 'deleteRows', ...target };
+      const response = await this.postJson(payload);
+
+      if (!response.ok) {
+        const errorText = await response.text();
+        throw new Error(`HTTP ${response.status}: ${errorText || response.statusText}`);
+      }
+
+      const data = await response.json();
+      return { success: true, data };
+    } catch (error) {
+      this.log('Error in deleteRows:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to delete applications',
+      };
+    }
+  }
+
+  async importCsv(file: File): Promise<ApiResponse<ImportResult>> {
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+      const response = await this.fetchWithRetry(`${this.baseUrl}/import`, {
+        method: 'POST',
+        body: formData,
+      });
+
+      if (!response.ok) {
+        const errorText = await response.text();
+        throw new Error(`HTTP ${response.status}: ${errorText || response.statusText}`);
+      }
+
+      const data = await response.json();
+      return { success: true, data };
+    } catch (error) {
+      this.log('Error in importCsv:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to import CSV',
+      };
+    }
+  }
+
+  async exportApplications(query: ExportQuery): Promise<ApiResponse<ExportFile>> {
+    try {
+      const params = new URLSearchParams({ format: query.format });
+      if (query.ipoName) params.set('ipoName', query.ipoName);
+      if (query.allotmentStatus) params.set('allotmentStatus', query.allotmentStatus);
+      if (query.search) params.set('search', query.search);
+      if (query.sortField) params.set('sortField', query.sortField);
+      if (query.sortDir) params.set('sortDir', query.sortDir);
+
+      const url = `${this.baseUrl}/export?${params.toString()}`;
+      const response = await this.fetchWithRetry(url, { method: 'GET' });
+
+      if (!response.ok) {
+        const errorText = await response.text();
+        throw new Error(`HTTP ${response.status}: ${errorText || response.statusText}`);
+      }
+
+      const disposition = response.headers.get('Content-Disposition') || '';
+      const match = disposition.match(/filename="([^"]+)"/);
+      const filename = match ? match[1] : `ipo-applications.${query.format}`;
+      const blob = await response.blob();
+      return { success: true, data: { blob, filename } };
+    } catch (error) {
+      this.log('Error in exportApplications:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to export applications',
+      };
+    }
+  }
+
+  async importAllotment(ipoName: string, file: File, dryRun = false): Promise<ApiResponse<AllotmentResult>> {
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+      const params = new URLSearchParams({ ipoName, dryRun: String(dryRun) });
+      const response = await this.fetchWithRetry(`${this.baseUrl}/allotment?${params.toString()}`, {
+        method: 'POST',
+        body: formData,
+      });
+
+      if (!response.ok) {
+        const errorText = await response.text();
+        throw new Error(`HTTP ${response.status}: ${errorText || response.statusText}`);
+      }
+
+      const data = await response.json();
+      return { success: true, data };
+    } catch (error) {
+      this.log('Error in importAllotment:', error);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Failed to import allotment file',
+      };
+    }
+  }
+
   // ==================== IPOs ====================
 
   async listIpos(): Promise<ApiResponse<Ipo[]>> {
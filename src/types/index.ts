@@ -28,6 +28,53 @@ export interface IpoApplication {
   createdAt: string;
 }
 
+// Application list as sent with format=columnar: one array per field, repeated
+// values sent once in `dictionaries` and referenced by index, booleans as
+// base64 bitmaps and createdAt as microsecond deltas. See decodeColumnar.
+export interface ColumnarApplications {
+  format: 'columnar';
+  count: number;
+  idPrefix: string;
+  dictionaries: {
+    ipoName: string[];
+    ipoAmount: number[];
+    allotmentStatus: IpoApplication['allotmentStatus'][];
+    userId: string[];
+    userName: string[];
+    userPan: string[];
+    userPhone: string[];
+  };
+  columns: {
+    id: string[];
+    ipo: number[];
+    user: number[];
+    allotmentStatus: number[];
+    moneySent: string;
+    moneyReceived: string;
+    createdAt: number[];
+  };
+}
+
+// Full application list plus the sync version it was read at (X-Data-Version)
+export interface VersionedRows {
+  rows: IpoApplication[];
+  version: number | null;
+}
+
+// Rows created, changed or deleted since a sync version (action=changesSince).
+// full=true means the version is too old and the list must be reloaded.
+export interface ChangeSet {
+  version: number;
+  full: boolean;
+  applications?: IpoApplication[];
+  applicants?: Applicant[];
+  ipos?: Ipo[];
+  deleted?: {
+    applications: string[];
+    applicants: string[];
+  };
+}
+
 // Input for updating application
 export interface IpoApplicationInput {
   moneySent?: boolean;
@@ -69,6 +116,98 @@ export interface SortState {
   direction: 'asc' | 'desc';
 }
 
+// Server-side list query (keyset pagination)
+export interface ListQuery {
+  ipoName?: string;
+  allotmentStatus?: string;
+  search?: string;
+  sortField?: keyof IpoApplication;
+  sortDir?: 'asc' | 'desc';
+  pageSize: number;
+  cursor?: string | null;
+}
+
+// Server-side export of the filtered, sorted applications
+export type ExportFormat = 'csv' | 'xlsx';
+
+export type ExportQuery = Omit<ListQuery, 'pageSize' | 'cursor'> & { format: ExportFormat };
+
+export interface ExportFile {
+  blob: Blob;
+  filename: string;
+}
+
+// One page of applications from the server
+export interface ApplicationPage {
+  items: IpoApplication[];
+  nextCursor: string | null;
+  total: number | null;
+}
+
+// Per-row problem reported by the CSV import endpoint
+export interface ImportError {
+  row: number;
+  field: string;
+  message: string;
+}
+
+// Result of a server-side CSV import
+export interface ImportResult {
+  success: boolean;
+  rows: number;
+  imported: number;
+  skipped: number;
+  applicantsCreated: number;
+  applicantsUpdated: number;
+  errorCount: number;
+  errors: ImportError[];
+}
+
+// Result of applying a registrar allotment file
+export interface AllotmentResult {
+  success: boolean;
+  dryRun: boolean;
+  ipoName: string;
+  lines: number;
+  matched: number;
+  allotted: number;
+  notAllotted: number;
+  applicationsWithoutResult: number;
+  unmatchedCount: number;
+  unmatchedPans: string[];
+  invalidCount: number;
+  invalidLines: { line: number; message: string }[];
+}
+
+// Rows targeted by updateRows/deleteRows: explicit ids, or every row matching a filter
+export type BatchTarget =
+  | { ids: string[] }
+  | { filter: { ipoName?: string; allotmentStatus?: string; search?: string } };
+
+export interface BatchUpdateResult {
+  success: boolean;
+  updated: number;
+  rows: IpoApplication[];
+}
+
+export interface BatchDeleteResult {
+  success: boolean;
+  deleted: number;
+  ids: string[];
+}
+
+// Dashboard totals from action=summary
+export interface ApplicationSummary {
+  ipoName: string | null;
+  applications: number;
+  totalAmount: number;
+  pending: number;
+  allotted: number;
+  notAllotted: number;
+  moneySent: number;
+  pendingRefund: number;
+}
+
 // Legacy types for backward compatibility (will be removed)
 export interface IpoRow extends IpoApplication {}
 export interface IpoRowInput extends IpoApplicationInput {}